@@ -1,6 +1,23 @@
-from django.contrib import admin
+import io
+import tempfile
+
+from django import forms
+from django.contrib import admin, messages
 from django.contrib.auth.admin import UserAdmin
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.shortcuts import redirect
+from django.template.response import TemplateResponse
+from django.urls import path
+from django.utils import timezone
 from .models import User, Client, Influencer
+from .onboarding import BATCH_SIZE, detect_format, import_influencers
+from .status import bulk_set_status
+
+
+class InfluencerImportForm(forms.Form):
+    file = forms.FileField(help_text="CSV with a header row, or JSONL (one object per line).")
+    batch_size = forms.IntegerField(min_value=1, max_value=10000, initial=BATCH_SIZE)
 
 @admin.register(User)
 class CustomUserAdmin(UserAdmin):
@@ -30,6 +47,54 @@ class InfluencerAdmin(admin.ModelAdmin):
     list_filter = ('status',)
     search_fields = ('user__username', 'user__email', 'iban')
     raw_id_fields = ('user',)
+    actions = ['approve_selected', 'reject_selected']
+    change_list_template = 'admin/authentication/influencer/change_list.html'
+
+    def get_urls(self):
+        return [
+            path('import/', self.admin_site.admin_view(self.import_view), name='authentication_influencer_import'),
+        ] + super().get_urls()
+
+    def import_view(self, request):
+        if not self.has_add_permission(request):
+            return redirect('admin:authentication_influencer_changelist')
+        form = InfluencerImportForm(request.POST or None, request.FILES or None)
+        if request.method == 'POST' and form.is_valid():
+            upload = form.cleaned_data['file']
+            # the report is spooled to disk as it is written, then stored for download
+            with tempfile.TemporaryFile() as spool:
+                report = io.TextIOWrapper(spool, encoding='utf-8', newline='')
+                result = import_influencers(upload.file, detect_format(upload.name), report=report,
+                                            batch_size=form.cleaned_data['batch_size'])
+                report.flush()
+                report.detach()
+                spool.seek(0)
+                if result.failed:
+                    name = default_storage.save(
+                        f"onboarding_reports/import-{timezone.now():%Y%m%d-%H%M%S}.csv", File(spool))
+            if result.failed:
+                self.message_user(request, f"Imported {result.created} of {result.rows} row(s); {result.failed} "
+                                           f"rejected, see {default_storage.url(name)}", messages.WARNING)
+            else:
+                self.message_user(request, f"Imported {result.created} influencer(s).", messages.SUCCESS)
+            return redirect('admin:authentication_influencer_changelist')
+
+        return TemplateResponse(request, 'admin/authentication/influencer/import.html', {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'form': form,
+            'title': 'Import influencers',
+        })
+
+    @admin.action(description='Approve selected influencers')
+    def approve_selected(self, request, queryset):
+        changed = bulk_set_status(queryset, 'approved')
+        self.message_user(request, f"Approved {len(changed)} influencer(s); notifications queued.", messages.SUCCESS)
+
+    @admin.action(description='Reject selected influencers')
+    def reject_selected(self, request, queryset):
+        changed = bulk_set_status(queryset, 'rejected')
+        self.message_user(request, f"Rejected {len(changed)} influencer(s); notifications queued.", messages.SUCCESS)
 
     def get_username(self, obj):
         return obj.user.username
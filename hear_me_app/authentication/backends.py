@@ -0,0 +1,54 @@
+"""
+JWT authentication that resolves the user from the cache.
+
+The stock JWTAuthentication loads the User row on every request, and views
+reading ``user.influencer_profile`` / ``user.client_profile`` pay a second
+query. CachedJWTAuthentication loads the user together with both role
+profiles once and keeps the result for AUTH_USER_CACHE_TIMEOUT seconds under
+a per-user version (see caching.invalidate_users), so a cache hit makes no
+queries at all.
+
+Another worker's change reaches this cache only through that version, so
+treat the cached profiles as read-only: code that writes an Influencer or
+Client loads the row again, or saves just the fields it sets.
+"""
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from core.cache import get_or_build
+
+from . import caching
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    def load_user(self, user_id):
+        try:
+            # reverse one-to-ones are cached as missing too, so hasattr() checks stay query-free
+            return self.user_model.objects.select_related('influencer_profile', 'client_profile').get(
+                **{api_settings.USER_ID_FIELD: user_id}
+            )
+        except self.user_model.DoesNotExist as e:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found") from e
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(_("Token contained no recognizable user identification")) from e
+
+        # unknown users raise inside the builder and are never cached
+        user, _hit = get_or_build(
+            caching.auth_user_key(user_id), lambda: self.load_user(user_id), caching.auth_user_timeout(),
+        )
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+
+        return user
@@ -0,0 +1,64 @@
+"""
+Cache keys and invalidation for influencer reads and authenticated users.
+
+Each influencer has its own version namespace and all list pages share one,
+so a change to an influencer invalidates exactly its profile plus, if a
+field the list shows or filters on changed, the list pages (which may
+contain it), without scanning or deleting keys. Users
+resolved by CachedJWTAuthentication are versioned per user the same way.
+"""
+import hashlib
+
+from django.conf import settings
+from django.db import transaction
+
+from core.cache import bump_version, versioned_key
+
+LIST_NAMESPACE = 'influencer-list'
+# Influencer fields that InfluencerListView returns or filters on
+LIST_FIELDS = frozenset({
+    'full_name', 'biography', 'category', 'profile_picture', 'profile_picture_variants', 'bio_videos',
+    'daily_price', 'weekly_price', 'instagram_acc_link', 'tiktok_acc_link', 'snapchat_acc_link',
+    'youtube_acc_link', 'status',
+})
+
+
+def profile_timeout():
+    return getattr(settings, 'INFLUENCER_PROFILE_CACHE_TIMEOUT', 300)
+
+
+def list_timeout():
+    return getattr(settings, 'INFLUENCER_LIST_CACHE_TIMEOUT', 60)
+
+
+def auth_user_timeout():
+    return getattr(settings, 'AUTH_USER_CACHE_TIMEOUT', 60)
+
+
+def profile_key(influencer_id, host):
+    # payloads hold absolute URLs, so they are cached per host
+    return versioned_key(f'influencer:{influencer_id}', host)
+
+
+def list_key(host, params):
+    query = '&'.join(f'{key}={value}' for key, value in sorted(params.items()))
+    return versioned_key(LIST_NAMESPACE, hashlib.md5(f'{host}?{query}'.encode()).hexdigest())
+
+
+def invalidate_influencers(influencer_ids, lists=True):
+    """
+    Drop cached profiles of `influencer_ids`, and every cached list page
+    unless lists=False, once the transaction commits.
+    """
+    namespaces = [f'influencer:{pk}' for pk in influencer_ids] + ([LIST_NAMESPACE] if lists else [])
+    transaction.on_commit(lambda: bump_version(*namespaces))
+
+
+def auth_user_key(user_id):
+    return versioned_key(f'auth-user:{user_id}', 'user')
+
+
+def invalidate_users(user_ids):
+    """Drop cached authenticated users (with their role profiles) once the transaction commits."""
+    namespaces = [f'auth-user:{pk}' for pk in user_ids]
+    transaction.on_commit(lambda: bump_version(*namespaces))
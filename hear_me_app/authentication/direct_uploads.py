@@ -0,0 +1,210 @@
+"""
+Direct uploads: media bytes go to storage without passing through the API.
+
+1. ``POST api/uploads/direct/`` returns a ticket: a short-lived token signed
+   with django.core.signing that names the object key, the kind of upload,
+   the declared size (the most the receiver will accept) and content type.
+2. The client PUTs the bytes to the ticket's upload_url. With
+   LocalUploadBackend that is ReceiverApp, a bare ASGI app mounted in
+   hear_me_app/asgi.py in front of Django, which streams the body to disk
+   with no middleware, ORM or session work. A backend for an object store
+   would return a presigned URL of the store instead.
+3. ``POST api/uploads/direct/complete/`` with the ticket validates the
+   stored object like a regular upload and attaches it to the Influencer.
+
+The API workers only ever see the two small JSON requests.
+
+A ticket is good for one upload and one completion. The backend records
+each use (mark_used()) and refuses a second one for as long as the ticket
+is valid, even after the object itself has been deleted. ``manage.py
+purge_direct_uploads`` clears the records of expired tickets, objects that
+were never completed and abandoned partial transfers.
+"""
+import asyncio
+import json
+import os
+import time
+import uuid
+from functools import lru_cache
+from urllib.parse import parse_qs, urlencode
+
+from django.conf import settings
+from django.core import signing
+from django.utils.module_loading import import_string
+
+from core import admission
+
+from .upload_sessions import AssembledUpload
+
+SALT = 'authentication.direct_uploads'
+DEFAULT_TICKET_TTL = 300  # seconds
+DEFAULT_URL = '/direct-upload/'
+KINDS = ('profile_picture', 'bio_video')
+USES = ('uploaded', 'completed')
+
+
+class TicketError(Exception):
+    pass
+
+
+def ticket_ttl():
+    return getattr(settings, 'DIRECT_UPLOAD_TICKET_TTL', DEFAULT_TICKET_TTL)
+
+
+def issue_ticket(user, kind, filename, size, content_type):
+    """Return ``(token, key)`` for one upload of at most `size` bytes of `content_type`."""
+    ext = os.path.splitext(filename)[1].lower()
+    key = f"{user.pk}/{uuid.uuid4().hex}{ext}"
+    payload = {'key': key, 'user': user.pk, 'kind': kind, 'name': filename, 'size': size, 'type': content_type}
+    return signing.dumps(payload, salt=SALT, compress=True), key
+
+
+def load_ticket(token):
+    try:
+        return signing.loads(token, salt=SALT, max_age=ticket_ttl())
+    except signing.SignatureExpired:
+        raise TicketError("Upload ticket has expired.")
+    except signing.BadSignature:
+        raise TicketError("Invalid upload ticket.")
+
+
+class LocalUploadBackend:
+    """Objects as files under DIRECT_UPLOAD_ROOT, received by ReceiverApp."""
+
+    @property
+    def root(self):
+        return getattr(settings, 'DIRECT_UPLOAD_ROOT', os.path.join(settings.BASE_DIR, 'direct_uploads'))
+
+    def path(self, key):
+        return os.path.join(self.root, *key.split('/'))
+
+    def upload_url(self, token, key):
+        return f"{getattr(settings, 'DIRECT_UPLOAD_URL', DEFAULT_URL)}?{urlencode({'ticket': token})}"
+
+    def open(self, ticket):
+        """The stored object as a File; storage can move it into place without a copy."""
+        path = self.path(ticket['key'])
+        return AssembledUpload(path, ticket['name'], os.path.getsize(path), ticket['type'], None)
+
+    def mark_used(self, key, use):
+        """
+        Record `use` (one of USES) of the ticket for `key`. Returns False if it
+        was already recorded. The record is an empty marker file that delete()
+        leaves in place.
+        """
+        marker = f'{self.path(key)}.{use}'
+        os.makedirs(os.path.dirname(marker), exist_ok=True)
+        try:
+            # exclusive create: of two concurrent uses only one gets here first
+            with open(marker, 'x'):
+                pass
+        except FileExistsError:
+            return False
+        return True
+
+    def was_used(self, key, use):
+        return os.path.exists(f'{self.path(key)}.{use}')
+
+    def delete(self, key):
+        """Remove the object and any partial transfer of it; the use markers stay."""
+        for path in (self.path(key), self.path(key) + '.part'):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
+    def purge_expired(self):
+        """
+        Delete objects, partial transfers and use markers that have not been
+        written to for a ticket TTL. Their ticket has expired by then, so
+        nothing can upload or complete them any more. Returns the number of
+        files deleted. User directories are left for the next ticket.
+        """
+        cutoff = time.time() - ticket_ttl()
+        purged = 0
+        for directory, _, names in os.walk(self.root):
+            for name in names:
+                path = os.path.join(directory, name)
+                try:
+                    if os.stat(path).st_mtime < cutoff:
+                        os.remove(path)
+                        purged += 1
+                except FileNotFoundError:
+                    pass
+        return purged
+
+
+@lru_cache(maxsize=None)
+def get_backend():
+    return import_string(getattr(settings, 'DIRECT_UPLOAD_BACKEND', 'authentication.direct_uploads.LocalUploadBackend'))()
+
+
+class ReceiverApp:
+    """
+    ASGI app that accepts ``PUT <DIRECT_UPLOAD_URL>?ticket=...`` for LocalUploadBackend
+    and hands every other request to `application`.
+    """
+
+    def __init__(self, application, backend=None):
+        self.application = application
+        self.backend = backend or get_backend()
+
+    async def __call__(self, scope, receive, send):
+        prefix = getattr(settings, 'DIRECT_UPLOAD_URL', DEFAULT_URL)
+        if scope['type'] != 'http' or scope['path'] != prefix:
+            return await self.application(scope, receive, send)
+        status, body = await self.receive_upload(scope, receive)
+        headers = [(b'content-type', b'application/json')]
+        if status == 503:
+            headers.append((b'retry-after', str(admission.retry_after()).encode()))
+        await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+        await send({'type': 'http.response.body', 'body': json.dumps(body).encode()})
+
+    async def receive_upload(self, scope, receive):
+        if scope['method'] != 'PUT':
+            return 405, {"detail": "Use PUT."}
+        query = parse_qs(scope.get('query_string', b'').decode())
+        try:
+            ticket = load_ticket(query.get('ticket', [''])[0])
+        except TicketError as e:
+            return 403, {"detail": str(e)}
+
+        headers = {key.decode('latin-1').lower(): value.decode('latin-1') for key, value in scope['headers']}
+        if headers.get('content-type', '').split(';')[0].strip() != ticket['type']:
+            return 415, {"detail": f"Content-Type must be {ticket['type']}."}
+        length = headers.get('content-length')
+        if length is None or not length.isdigit():
+            return 411, {"detail": "Content-Length required."}
+        if int(length) > ticket['size']:
+            return 413, {"detail": f"Upload exceeds the ticket's {ticket['size']} bytes."}
+        if not admission.has_room(int(length), [self.backend.root]):
+            return 503, {"detail": "Not enough storage space for this upload right now."}
+
+        # one transfer per ticket, even when two race or the object has since been completed and deleted
+        if not self.backend.mark_used(ticket['key'], 'uploaded'):
+            return 409, {"detail": "This ticket has already been used."}
+        path = self.backend.path(ticket['key'])
+        partial = path + '.part'
+        out = open(partial, 'wb')
+        received = 0
+        with out:
+            while True:
+                message = await receive()
+                if message['type'] == 'http.disconnect':
+                    out.close()
+                    self.backend.delete(ticket['key'])
+                    return 400, {"detail": "Client disconnected."}
+                chunk = message.get('body', b'')
+                received += len(chunk)
+                if received > ticket['size']:
+                    out.close()
+                    self.backend.delete(ticket['key'])
+                    return 413, {"detail": f"Upload exceeds the ticket's {ticket['size']} bytes."}
+                if chunk:
+                    # file writes run off the event loop so other transfers keep flowing
+                    await asyncio.to_thread(out.write, chunk)
+                if not message.get('more_body'):
+                    break
+        os.replace(partial, path)
+        return 201, {"key": ticket['key'], "size": received}
@@ -1,22 +1,46 @@
 import os
 from django.core.exceptions import ValidationError
 
+from .video_probe import ProbeError, probe
+
 ALLOWED_VIDEO_EXTENSIONS = ["mp4", "webm", "mov", "mkv"]
 ALLOWED_CONTENT_TYPES = ["video/mp4", "video/webm", "video/quicktime", "video/x-matroska"]
 MAX_VIDEO_SIZE = 150 * 1024 * 1024  # 150 MB (adjust as needed)
+MAX_VIDEO_DURATION = 3 * 60  # seconds
+MAX_VIDEO_BITRATE = 20 * 1000 * 1000  # bits per second
+# container family the file's magic bytes must match, by extension
+EXTENSION_FAMILIES = {"mp4": "mp4", "mov": "mp4", "webm": "matroska", "mkv": "matroska"}
 
-def validate_video_file(file):
+def video_extension(name):
+    # the last suffix: "my.clip.mp4" -> "mp4"
+    return os.path.splitext(str(name))[1][1:].lower()
+
+def validate_video_metadata(name, size, content_type=None):
     # check size
-    if file.size > MAX_VIDEO_SIZE:
+    if size > MAX_VIDEO_SIZE:
         raise ValidationError(f"File too large. Max size is {MAX_VIDEO_SIZE // (1024*1024)} MB")
 
     # check extension
-    name = str(file.name)
-    ext = name.split(".")[1] if "." in name else ""
-    if ext.lower() not in ALLOWED_VIDEO_EXTENSIONS:
+    if video_extension(name) not in ALLOWED_VIDEO_EXTENSIONS:
         raise ValidationError("Unsupported file extension.")
 
-    # optional: check content_type if file has content_type attribute (DRF file)
-    content_type = getattr(file, "content_type", None)
+    # optional: check content_type if the client supplied one
     if content_type and content_type not in ALLOWED_CONTENT_TYPES:
         raise ValidationError("Unsupported content type.")
+
+def validate_video_file(file):
+    """Check the upload's metadata, then its container headers (see video_probe). Returns the VideoInfo."""
+    # content_type is only present on DRF/Django uploaded files
+    validate_video_metadata(file.name, file.size, getattr(file, "content_type", None))
+
+    try:
+        info = probe(file, file.size)
+    except ProbeError as e:
+        raise ValidationError(str(e))
+    if info.family != EXTENSION_FAMILIES[video_extension(file.name)]:
+        raise ValidationError("File content does not match its extension.")
+    if info.duration > MAX_VIDEO_DURATION:
+        raise ValidationError(f"Video too long. Max duration is {MAX_VIDEO_DURATION} seconds.")
+    if info.bitrate > MAX_VIDEO_BITRATE:
+        raise ValidationError(f"Video bitrate too high. Max is {MAX_VIDEO_BITRATE // 1000000} Mbps.")
+    return info
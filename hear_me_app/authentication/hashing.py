@@ -0,0 +1,62 @@
+"""
+Password hashing off the request path.
+
+PBKDF2 takes tens of milliseconds of CPU per call. The async login and
+register views hand it to a small shared thread pool (hashlib releases the
+GIL while hashing) so the event loop keeps serving other requests. The pool
+admits at most PASSWORD_HASHING_WORKERS + PASSWORD_HASHING_QUEUE_DEPTH calls
+at once; anything beyond that fails immediately with Saturated instead of
+queueing behind a spike.
+"""
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password, verify_password
+
+
+class Saturated(Exception):
+    """The hashing pool is full; the caller should retry later."""
+
+    def __init__(self, retry_after):
+        super().__init__("Password hashing is at capacity.")
+        self.retry_after = retry_after
+
+
+class HashingPool:
+    def __init__(self, workers, queue_depth, retry_after=1):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-hashing')
+        self.slots = threading.BoundedSemaphore(workers + queue_depth)
+        self.retry_after = retry_after
+
+    async def run(self, fn, *args):
+        if not self.slots.acquire(blocking=False):
+            raise Saturated(self.retry_after)
+        try:
+            future = self.executor.submit(fn, *args)
+        except BaseException:
+            self.slots.release()
+            raise
+        future.add_done_callback(lambda _: self.slots.release())
+        return await asyncio.wrap_future(future)
+
+
+@lru_cache(maxsize=None)
+def get_pool():
+    return HashingPool(
+        workers=getattr(settings, 'PASSWORD_HASHING_WORKERS', None) or os.cpu_count() or 1,
+        queue_depth=getattr(settings, 'PASSWORD_HASHING_QUEUE_DEPTH', 32),
+        retry_after=getattr(settings, 'PASSWORD_HASHING_RETRY_AFTER', 1),
+    )
+
+
+async def hash_password(raw_password):
+    return await get_pool().run(make_password, raw_password)
+
+
+async def verify(raw_password, encoded):
+    """Returns ``(is_correct, must_update)`` like django.contrib.auth.hashers.verify_password."""
+    return await get_pool().run(verify_password, raw_password, encoded)
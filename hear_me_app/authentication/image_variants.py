@@ -0,0 +1,180 @@
+"""
+Resized WebP/JPEG variants of influencer profile pictures.
+
+render_variants() is a plain function over file paths so it can run in a
+worker process without Django. Output files are keyed by the source image's
+content hash, so re-rendering the same picture is a no-op and identical
+pictures share their variants.
+
+Django is only imported inside the functions that run in the web process, so
+spawned workers can import this module without configuring settings.
+
+IMAGE_VARIANTS_MODE picks where schedule_variants() renders: "pool" (the
+default) in the process pool, "sync" in the saving thread right after the
+commit (tests, single-process setups), "off" not at all.
+"""
+import hashlib
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+# longest edge in pixels, largest first: each variant is resized from the previous one
+VARIANT_SIZES = {
+    'full': 1280,
+    'card': 480,
+    'thumbnail': 150,
+}
+VARIANT_FORMATS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+VARIANTS_DIR = 'influencer_profiles/variants'
+DEFAULT_MODE = 'pool'
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def variant_dir(checksum):
+    return f"{VARIANTS_DIR}/{checksum[:2]}/{checksum}"
+
+
+def render_variants(source_path, media_root, checksum):
+    """
+    Render every variant of the image at `source_path` into MEDIA_ROOT.
+
+    Returns ``{variant: {"width", "height", "webp", "jpeg"}}`` with storage
+    names relative to `media_root`. Files that already exist are kept.
+    """
+    out_dir = variant_dir(checksum)
+    os.makedirs(os.path.join(media_root, out_dir), exist_ok=True)
+
+    rendered = {}
+    with Image.open(source_path) as image:
+        # decode JPEGs at a reduced scale when the largest variant allows it
+        largest = max(VARIANT_SIZES.values())
+        image.draft('RGB', (largest, largest))
+        image = ImageOps.exif_transpose(image)
+        if image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA' if image.mode in ('LA', 'P', 'PA') else 'RGB')
+
+        for name, edge in VARIANT_SIZES.items():
+            image = image.copy()
+            image.thumbnail((edge, edge), Image.Resampling.LANCZOS, reducing_gap=3.0)
+            entry = {'width': image.width, 'height': image.height}
+            for ext, (fmt, options) in VARIANT_FORMATS.items():
+                name_on_disk = f"{out_dir}/{name}.{ext}"
+                target = os.path.join(media_root, name_on_disk)
+                if not os.path.exists(target):
+                    frame = image
+                    if fmt == 'JPEG' and frame.mode == 'RGBA':
+                        frame = Image.new('RGB', frame.size, (255, 255, 255))
+                        frame.paste(image, mask=image.getchannel('A'))
+                    tmp = f"{target}.{os.getpid()}.tmp"
+                    frame.save(tmp, fmt, **options)
+                    os.replace(tmp, target)
+                entry[ext] = name_on_disk
+            rendered[name] = entry
+    return rendered
+
+
+def get_executor(replace_broken=None):
+    """Lazily start the process pool shared by this Django process."""
+    global _executor
+    from django.conf import settings
+
+    with _executor_lock:
+        if _executor is None or _executor is replace_broken:
+            _executor = ProcessPoolExecutor(
+                max_workers=getattr(settings, 'IMAGE_VARIANT_WORKERS', None) or os.cpu_count(),
+                mp_context=multiprocessing.get_context('spawn'),
+            )
+    return _executor
+
+
+def variants_ready(influencer):
+    variants = influencer.profile_picture_variants or {}
+    return (
+        bool(influencer.profile_picture)
+        and variants.get('source') == influencer.profile_picture.name
+        and set(variants.get('variants', {})) == set(VARIANT_SIZES)
+    )
+
+
+def record_variants(influencer_id, source_name, rendered):
+    """Store the rendered variants unless the picture changed while they were built."""
+    from .caching import invalidate_influencers
+    from .models import Influencer
+
+    if Influencer.objects.filter(pk=influencer_id, profile_picture=source_name).update(
+        profile_picture_variants={'source': source_name, 'variants': rendered},
+    ):
+        # update() sends no post_save, so the cached profile and list pages are dropped here
+        invalidate_influencers([influencer_id])
+
+
+def source_checksum(source_name):
+    from .models import MediaBlob
+
+    checksum = MediaBlob.objects.filter(path=source_name).values_list('sha256', flat=True).first()
+    if checksum:
+        return checksum
+    # pictures stored before content addressing: key them by their path instead
+    return hashlib.sha256(source_name.encode()).hexdigest()
+
+
+def _on_rendered(influencer_id, source_name, future):
+    from django.db import connection
+
+    try:
+        record_variants(influencer_id, source_name, future.result())
+    except Exception:
+        logger.exception("Rendering variants for influencer %s failed", influencer_id)
+    finally:
+        # runs on the executor's callback thread, which has its own connection
+        connection.close()
+
+
+def schedule_variants(influencer, checksum=None):
+    """
+    Queue variant rendering for the influencer's current picture once the save commits.
+
+    `checksum` is the picture's content hash when the caller already has it; otherwise
+    it is looked up from the picture's MediaBlob.
+    """
+    from django.conf import settings
+    from django.db import transaction
+
+    mode = getattr(settings, 'IMAGE_VARIANTS_MODE', DEFAULT_MODE)
+    if mode == 'off' or not influencer.profile_picture or variants_ready(influencer):
+        return
+
+    influencer_id = influencer.pk
+    source_name = influencer.profile_picture.name
+
+    def submit():
+        args = (os.path.join(settings.MEDIA_ROOT, source_name), str(settings.MEDIA_ROOT),
+                checksum or source_checksum(source_name))
+        if mode == 'sync':
+            try:
+                record_variants(influencer_id, source_name, render_variants(*args))
+            except Exception:
+                logger.exception("Rendering variants for influencer %s failed", influencer_id)
+            return
+        executor = get_executor()
+        try:
+            future = executor.submit(render_variants, *args)
+        except BrokenProcessPool:
+            # a worker died (e.g. OOM on a huge image); start a fresh pool once
+            future = get_executor(replace_broken=executor).submit(render_variants, *args)
+        future.add_done_callback(partial(_on_rendered, influencer_id, source_name))
+
+    transaction.on_commit(submit)
@@ -0,0 +1,49 @@
+from concurrent.futures import as_completed
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from authentication.image_variants import (
+    source_checksum, get_executor, record_variants, render_variants, variants_ready,
+)
+from authentication.models import Influencer
+
+
+class Command(BaseCommand):
+    help = "Render missing profile picture variants (thumbnail, card, full) in a process pool."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help="Re-record variants even if they look ready.")
+
+    def handle(self, *args, **options):
+        influencers = (
+            Influencer.objects.exclude(profile_picture='').exclude(profile_picture__isnull=True)
+            .only('pk', 'profile_picture', 'profile_picture_variants')
+        )
+        futures = {}
+        executor = get_executor()
+        for influencer in influencers.iterator():
+            if variants_ready(influencer) and not options['force']:
+                continue
+            source_name = influencer.profile_picture.name
+            future = executor.submit(
+                render_variants,
+                os.path.join(settings.MEDIA_ROOT, source_name),
+                str(settings.MEDIA_ROOT),
+                source_checksum(source_name),
+            )
+            futures[future] = (influencer.pk, source_name)
+
+        failed = 0
+        for future in as_completed(futures):
+            influencer_id, source_name = futures[future]
+            try:
+                record_variants(influencer_id, source_name, future.result())
+            except Exception as e:
+                failed += 1
+                self.stderr.write(f"Influencer {influencer_id}: {e}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Rendered variants for {len(futures) - failed} influencer(s); {failed} failed."
+        ))
@@ -0,0 +1,35 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from authentication.onboarding import BATCH_SIZE, FORMATS, detect_format, import_influencers
+
+
+class Command(BaseCommand):
+    help = "Import influencers from a CSV or JSONL file in batches, writing rejected rows to an error report."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=FORMATS, help="Defaults to the file extension (.jsonl, else csv).")
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE,
+                            help="Rows validated and inserted per transaction.")
+        parser.add_argument('--report', help="Where to write the CSV error report (default: stderr).")
+
+    def handle(self, *args, **options):
+        fmt = options['format'] or detect_format(options['path'])
+        try:
+            stream = open(options['path'], 'rb')
+        except OSError as e:
+            raise CommandError(e)
+
+        report = open(options['report'], 'w', newline='', encoding='utf-8') if options['report'] else sys.stderr
+        try:
+            with stream:
+                result = import_influencers(stream, fmt, report=report, batch_size=options['batch_size'])
+        finally:
+            if report is not sys.stderr:
+                report.close()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {result.created} of {result.rows} row(s); {result.failed} rejected."
+        ))
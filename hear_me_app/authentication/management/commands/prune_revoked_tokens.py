@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from authentication.revocation import PRUNE_BATCH_SIZE, prune_expired
+
+
+class Command(BaseCommand):
+    help = "Delete revoked refresh tokens that have expired anyway."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=PRUNE_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        pruned = prune_expired(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Pruned {pruned} expired revoked token(s)."))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from authentication.direct_uploads import get_backend
+
+
+class Command(BaseCommand):
+    help = "Delete direct uploads that were never completed, abandoned partial transfers and expired ticket records."
+
+    def handle(self, *args, **options):
+        purged = get_backend().purge_expired()
+        self.stdout.write(self.style.SUCCESS(f"Purged {purged} expired direct-upload file(s)."))
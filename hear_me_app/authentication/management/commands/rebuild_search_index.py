@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from authentication.search import get_backend
+
+
+class Command(BaseCommand):
+    help = "Rebuild the influencer full-text search index in bulk batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        indexed = get_backend().rebuild(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Indexed {indexed} influencer(s)."))
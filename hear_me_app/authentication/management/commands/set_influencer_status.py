@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from authentication.models import Influencer
+from authentication.status import EMAIL_BATCH_SIZE, bulk_set_status
+
+
+class Command(BaseCommand):
+    help = "Move influencers to a new status in bulk and queue batched notification emails."
+
+    def add_arguments(self, parser):
+        parser.add_argument('status', choices=[choice for choice, _ in Influencer.STATUS_CHOICES])
+        parser.add_argument('--from', dest='from_status', choices=[choice for choice, _ in Influencer.STATUS_CHOICES],
+                            help="Only change influencers currently in this status.")
+        parser.add_argument('--ids', type=int, nargs='+', help="Only change these influencer ids.")
+        parser.add_argument('--email-batch-size', type=int, default=EMAIL_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        queryset = Influencer.objects.all()
+        if options['from_status']:
+            queryset = queryset.filter(status=options['from_status'])
+        if options['ids']:
+            queryset = queryset.filter(pk__in=options['ids'])
+        elif not options['from_status']:
+            raise CommandError("Pass --from and/or --ids to choose which influencers to change.")
+
+        changed = bulk_set_status(queryset, options['status'], email_batch_size=options['email_batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Set {len(changed)} influencer(s) to {options['status']}."))
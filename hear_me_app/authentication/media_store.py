@@ -0,0 +1,269 @@
+"""
+Content-addressed, reference-counted media storage.
+
+Files are stored once under ``<prefix>/<sha[:2]>/<sha><ext>`` and tracked by a
+MediaBlob row. Uploading bytes that are already stored only bumps the row's
+ref_count, and because names are derived from content there is never a name
+collision to probe the filesystem for.
+
+A reference belongs to whoever records the blob's path (e.g. an Influencer's
+profile_picture) and is dropped with release() when that record lets go.
+Uploads nobody records pass ``reference=False``: the blob is stored or
+shared but its ref_count is left alone, so the count only ever reflects
+owners that will release it. Whoever later records such a path (e.g.
+registration) takes the reference then, with acquire().
+
+put_many() stores several files all-or-nothing, with the per-file work
+(validation, checksum, storage write) running concurrently on a bounded
+thread pool shared by the process.
+"""
+import os
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files.storage import FileSystemStorage
+from django.db import IntegrityError, transaction
+from django.db.models import Case, F, Value, When
+
+from .models import MediaBlob
+from .uploads import file_checksum
+from .video_probe import ProbeError
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    MEDIA_ROOT storage that never renames: a name already on disk holds the
+    same bytes, so it is simply overwritten instead of probed for a free name.
+    """
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault('allow_overwrite', True)
+        super().__init__(**kwargs)
+
+
+content_storage = ContentAddressedStorage()
+
+DEFAULT_WORKERS = 4
+# what a put_many() `validate` raises for a bad file; anything else is our failure, not the file's
+VALIDATION_ERRORS = (ValidationError, ProbeError)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+class BatchFailed(Exception):
+    """A file of a put_many() batch failed validation; nothing from the batch was stored."""
+
+    def __init__(self, file, error):
+        super().__init__(f"{file.name}: {error}")
+        self.file = file
+        self.error = error
+
+
+def get_executor():
+    """Lazily start the thread pool shared by this Django process."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'MEDIA_STORE_WORKERS', None) or DEFAULT_WORKERS,
+                thread_name_prefix='media-store',
+            )
+    return _executor
+
+
+def _map(func, items):
+    # one item needs no thread hop
+    if len(items) == 1:
+        return [_outcome(func, items[0])]
+    return list(get_executor().map(lambda item: _outcome(func, item), items))
+
+
+def _outcome(func, item):
+    try:
+        return func(item), None
+    except Exception as e:
+        return None, e
+
+
+def blob_key(prefix, checksum, filename):
+    ext = os.path.splitext(str(filename))[1].lower()
+    return f"{prefix}/{checksum[:2]}/{checksum}{ext}"
+
+
+def _acquire(checksum):
+    """Take a reference on an existing blob; returns the blob or None."""
+    if MediaBlob.objects.filter(sha256=checksum).update(ref_count=F('ref_count') + 1):
+        return MediaBlob.objects.get(sha256=checksum)
+    return None
+
+
+def _existing(checksum, reference):
+    if reference:
+        return _acquire(checksum)
+    return MediaBlob.objects.filter(sha256=checksum).first()
+
+
+def put(file, prefix, reference=True):
+    """
+    Store `file` under `prefix` unless identical content is already stored.
+
+    Returns ``(blob, created)``; `created` is False when the upload was a
+    duplicate and at most the reference count changed. With
+    ``reference=False`` no reference is taken (see the module docstring).
+    """
+    checksum = file_checksum(file)
+    blob = _existing(checksum, reference)
+    if blob is not None:
+        return blob, False
+
+    path = content_storage.save(blob_key(prefix, checksum, file.name), file)
+    try:
+        with transaction.atomic():
+            blob = MediaBlob.objects.create(
+                sha256=checksum,
+                path=path,
+                size=file.size,
+                content_type=getattr(file, 'content_type', None) or '',
+                ref_count=1 if reference else 0,
+            )
+    except IntegrityError:
+        # a concurrent upload of the same bytes won the insert; share its blob
+        blob = _existing(checksum, reference)
+        if blob is None:
+            raise
+        return blob, False
+    return blob, True
+
+
+def stored_path(value):
+    """The storage path of `value`, which is either that path or a URL built from it."""
+    path = urlparse(value).path if '://' in value else value
+    return path[len(settings.MEDIA_URL):] if path.startswith(settings.MEDIA_URL) else path
+
+
+def acquire(values):
+    """
+    Take one reference per entry of `values` (paths or media URLs) on the blob stored there,
+    in a single UPDATE. Values that are not stored blobs are ignored.
+    """
+    references = Counter(stored_path(value) for value in values if value and isinstance(value, str))
+    if references:
+        _add_references('path', references)
+
+
+def _add_references(field, references):
+    MediaBlob.objects.filter(**{f'{field}__in': references}).update(ref_count=F('ref_count') + Case(
+        *[When(**{field: key}, then=Value(count)) for key, count in references.items()], default=Value(0),
+    ))
+
+
+def release(path):
+    """Drop one reference to the blob stored at `path`, deleting the file with the last one."""
+    if not path:
+        return
+    with transaction.atomic():
+        blob = MediaBlob.objects.select_for_update().filter(path=path).first()
+        if blob is None or blob.ref_count == 0:
+            # nothing recorded it with a reference, so nobody's reference is ours to drop
+            return
+        if blob.ref_count > 1:
+            MediaBlob.objects.filter(pk=blob.pk).update(ref_count=F('ref_count') - 1)
+            return
+        MediaBlob.objects.filter(pk=blob.pk).delete()
+        # deleted while the row is still locked: a concurrent put() of the same bytes blocks
+        # in _acquire() until we commit and then writes the file afresh, rather than
+        # rewriting it just before a deferred delete would remove it from under a new row
+        content_storage.delete(path)
+
+
+def put_many(files, prefix, validate=None, reference=True):
+    """
+    Store all of `files` under `prefix`, or none of them. `reference` is as for put().
+
+    `validate(file)` and the checksum run concurrently first; a file that
+    fails validation raises BatchFailed before anything is written (other
+    errors propagate as they are). New content is then
+    written concurrently, and the MediaBlob rows of the whole batch are taken
+    in one transaction with the same handful of queries for any number of
+    files (without a reference, one INSERT and no re-read). If that fails,
+    the files written for the batch are deleted again.
+    Returns the list of ``(blob, created)`` in file order; `created` means
+    this batch wrote the file.
+    """
+    def check(file):
+        if validate is not None:
+            validate(file)
+        return file_checksum(file)
+
+    checksums = []
+    for file, (checksum, error) in zip(files, _map(check, files)):
+        if isinstance(error, VALIDATION_ERRORS):
+            raise BatchFailed(file, error)
+        if error is not None:
+            raise error
+        checksums.append(checksum)
+
+    stored = MediaBlob.objects.in_bulk(checksums, field_name='sha256')
+    # identical files within the batch are written once
+    to_write = {}
+    for file, checksum in zip(files, checksums):
+        if checksum not in stored:
+            to_write.setdefault(checksum, file)
+    keys = {checksum: blob_key(prefix, checksum, file.name) for checksum, file in to_write.items()}
+
+    written = {}
+    try:
+        results = _map(lambda item: content_storage.save(keys[item[0]], item[1]), list(to_write.items()))
+        written = {checksum: path for checksum, (path, error) in zip(to_write, results) if error is None}
+        errors = [error for _, error in results if error is not None]
+        if errors:
+            raise errors[0]
+
+        try:
+            with transaction.atomic():
+                return _take_all(files, checksums, stored, written, reference)
+        except IntegrityError:
+            # a concurrent upload inserted some of the same bytes first; take the batch again, sharing its rows
+            with transaction.atomic():
+                return _take_all(files, checksums, stored, written, reference, raced=True)
+    except BaseException:
+        # rows of the batch were rolled back with the transaction; drop files no blob refers to
+        for path in written.values():
+            if not MediaBlob.objects.filter(path=path).exists():
+                content_storage.delete(path)
+        raise
+
+
+def _take_all(files, checksums, stored, written, reference, raced=False):
+    # new rows start unreferenced; after a race, a row the concurrent upload inserted is simply kept
+    new_rows = {}
+    for file, checksum in zip(files, checksums):
+        if checksum in written and checksum not in new_rows:
+            new_rows[checksum] = MediaBlob(
+                sha256=checksum, path=written[checksum], size=file.size,
+                content_type=getattr(file, 'content_type', None) or '', ref_count=0,
+            )
+    MediaBlob.objects.bulk_create(new_rows.values(), ignore_conflicts=raced)
+
+    # then one reference per file, in a single UPDATE however often each checksum repeats
+    references = Counter(checksums)
+    if reference:
+        _add_references('sha256', references)
+
+    if reference or raced:
+        blobs = MediaBlob.objects.in_bulk(references, field_name='sha256')
+        if len(blobs) != len(references):
+            raise MediaBlob.DoesNotExist("A stored blob disappeared while the batch was being recorded.")
+    else:
+        # nothing changed the rows read before the writes or those just inserted, so no re-read
+        blobs = {**stored, **new_rows}
+    for checksum, path in written.items():
+        if blobs[checksum].path != path:
+            # a concurrent upload stored the same bytes under another prefix first; ours is surplus
+            transaction.on_commit(lambda path=path: content_storage.delete(path))
+    return [(blobs[checksum], blobs[checksum].path == written.get(checksum)) for checksum in checksums]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 18:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0007_mediablob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='influencer',
+            name='profile_picture_variants',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-17 18:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0008_influencer_profile_picture_variants'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='influencer',
+            index=models.Index(fields=['status', 'id'], name='influencer_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='influencer',
+            index=models.Index(fields=['status', 'category', 'id'], name='influencer_status_cat_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='influencer',
+            index=models.Index(fields=['status', 'daily_price', 'id'], name='influencer_daily_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='influencer',
+            index=models.Index(fields=['status', 'weekly_price', 'id'], name='influencer_weekly_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='influencer',
+            index=models.Index(fields=['status', 'category', 'daily_price', 'id'], name='influencer_cat_daily_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='influencer',
+            index=models.Index(fields=['status', 'category', 'weekly_price', 'id'], name='influencer_cat_weekly_idx'),
+        ),
+    ]
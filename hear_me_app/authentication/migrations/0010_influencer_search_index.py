@@ -0,0 +1,61 @@
+import re
+
+from django.db import migrations
+
+# authentication.search's normalization as of this migration, frozen so that
+# later changes to it cannot change what this migration does
+_ARABIC_FOLD = str.maketrans({
+    'أ': 'ا', 'إ': 'ا', 'آ': 'ا', 'ٱ': 'ا',
+    'ى': 'ي', 'ئ': 'ي', 'ؤ': 'و', 'ة': 'ه',
+    'ـ': None,  # tatweel
+    **{chr(c): None for c in range(0x064B, 0x0653)},  # harakat, shadda, sukun
+    'ٰ': None,  # superscript alef
+})
+_ARTICLES = ('وال', 'بال', 'كال', 'فال', 'لل', 'ال')
+_TOKEN_RE = re.compile(r'\w+')
+
+
+def _strip_article(token):
+    for article in _ARTICLES:
+        if token.startswith(article) and len(token) - len(article) >= 2:
+            return token[len(article):]
+    return token
+
+
+def normalize_text(text):
+    if not text:
+        return ''
+    return ' '.join(_strip_article(token) for token in _TOKEN_RE.findall(text.casefold().translate(_ARABIC_FOLD)))
+
+
+def create_search_table(apps, schema_editor):
+    # the FTS5 index only exists on SQLite; other databases use a different search backend
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS influencer_search USING fts5("
+        "full_name, biography, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+    )
+    Influencer = apps.get_model('authentication', 'Influencer')
+    rows = [
+        (pk, normalize_text(full_name), normalize_text(biography))
+        for pk, full_name, biography in Influencer.objects.values_list('pk', 'full_name', 'biography').iterator()
+    ]
+    with schema_editor.connection.cursor() as cursor:
+        cursor.executemany("INSERT INTO influencer_search (rowid, full_name, biography) VALUES (%s, %s, %s)", rows)
+
+
+def drop_search_table(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute("DROP TABLE IF EXISTS influencer_search")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0009_influencer_discovery_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_table, drop_search_table),
+    ]
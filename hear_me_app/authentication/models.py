@@ -1,5 +1,11 @@
 from django.contrib.auth.models import AbstractUser
+from django.core.files.storage import default_storage
 from django.db import models
+import uuid
+
+from core.models import ChangeTrackingMixin
+
+MAX_BIO_VIDEOS = 5
 
 class User(AbstractUser):
 
@@ -29,7 +35,7 @@ class Client(models.Model):
     def __str__(self):
         return f"Client profile for {self.user.email}"
 
-class Influencer(models.Model):
+class Influencer(ChangeTrackingMixin, models.Model):
     STATUS_CHOICES = [
         ('pending', 'Pending'),
         ('approved', 'Approved'),
@@ -50,6 +56,8 @@ class Influencer(models.Model):
     biography = models.TextField(blank=True, null=True)
     category = models.CharField(max_length=20, choices=CATEGORY_CHOICES, blank=True, null=True)
     profile_picture = models.ImageField(upload_to='influencer_profiles/', blank=True, null=True)
+    # {"source": <picture name>, "variants": {name: {"width", "height", "webp", "jpeg"}}}; see image_variants
+    profile_picture_variants = models.JSONField(default=dict, blank=True)
     bio_videos = models.JSONField(default=list, blank=True)  # List of video URLs
     daily_price = models.DecimalField(max_digits=10, decimal_places=2, blank=True, null=True)
     weekly_price = models.DecimalField(max_digits=10, decimal_places=2, blank=True, null=True)
@@ -62,13 +70,83 @@ class Influencer(models.Model):
     iban = models.CharField(max_length=34, blank=True, null=True, help_text="IBAN no spaces, uppercase")
     
 
+    class Meta:
+        # discovery filters on status (+ category) and orders by price or id; see InfluencerListView
+        indexes = [
+            models.Index(fields=['status', 'id'], name='influencer_status_idx'),
+            models.Index(fields=['status', 'category', 'id'], name='influencer_status_cat_idx'),
+            models.Index(fields=['status', 'daily_price', 'id'], name='influencer_daily_price_idx'),
+            models.Index(fields=['status', 'weekly_price', 'id'], name='influencer_weekly_price_idx'),
+            models.Index(fields=['status', 'category', 'daily_price', 'id'], name='influencer_cat_daily_idx'),
+            models.Index(fields=['status', 'category', 'weekly_price', 'id'], name='influencer_cat_weekly_idx'),
+        ]
+
     def __str__(self):
         return f"Influencer profile for {self.user.email}"
     
+    @property
+    def profile_picture_variant_urls(self):
+        # only variants rendered from the current picture are exposed
+        variants = self.profile_picture_variants or {}
+        if not self.profile_picture or variants.get('source') != self.profile_picture.name:
+            return {}
+        return {
+            name: {key: default_storage.url(value) if key in ('webp', 'jpeg') else value
+                   for key, value in entry.items()}
+            for name, entry in variants.get('variants', {}).items()
+        }
+
     def save(self, *args, **kwargs):
-        if len(self.bio_videos) > 5:
-            raise ValueError("An influencer can have a maximum of 5 bio videos.")
+        if len(self.bio_videos) > MAX_BIO_VIDEOS:
+            raise ValueError(f"An influencer can have a maximum of {MAX_BIO_VIDEOS} bio videos.")
         super().save(*args, **kwargs)
 
 
+class UploadSession(models.Model):
+    """A resumable bio-video upload; chunk data lives on disk under UPLOAD_SESSIONS_ROOT."""
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='upload_sessions', blank=True, null=True)
+    filename = models.CharField(max_length=255)
+    content_type = models.CharField(max_length=100, blank=True)
+    total_size = models.PositiveBigIntegerField()
+    chunk_size = models.PositiveIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    @property
+    def total_chunks(self):
+        return max(1, -(-self.total_size // self.chunk_size))
+
+    def chunk_length(self, index):
+        # every chunk is chunk_size bytes except (possibly) the last one
+        if index < self.total_chunks - 1:
+            return self.chunk_size
+        return self.total_size - self.chunk_size * (self.total_chunks - 1)
+
+    def __str__(self):
+        return f"Upload session {self.id} for {self.filename}"
 
+
+class MediaBlob(models.Model):
+    """A stored media file keyed by the sha256 of its content; see authentication.media_store."""
+    sha256 = models.CharField(max_length=64, unique=True)
+    path = models.CharField(max_length=255, unique=True)
+    size = models.PositiveBigIntegerField()
+    content_type = models.CharField(max_length=100, blank=True)
+    ref_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.path} ({self.ref_count} refs)"
+
+
+class RevokedToken(models.Model):
+    """A refresh token that may not be used again (rotated or revoked); see authentication.revocation."""
+    jti = models.CharField(max_length=255, unique=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='revoked_tokens', blank=True, null=True)
+    # the token's own expiry; past it the token is rejected anyway and the row can be pruned
+    expires_at = models.DateTimeField(db_index=True)
+    revoked_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Revoked token {self.jti}"
@@ -0,0 +1,18 @@
+from django.conf import settings
+
+STATUS_EMAIL_SUBJECT = "حالة حساب المؤثر الخاص بك قد تم تحديثها"  # "Your Influencer Account Status Has Been Updated"
+
+STATUS_EMAIL_MESSAGES = {
+    'approved': (
+        "تهانينا - تم الموافقة علي حسابك كمؤثر \n\n"
+        "يمكنك الآن تسجيل الدخول وبدء استخدام ميزات المؤثرين لدينا. شكراً لانضمامك إلينا!"
+    ),
+    'rejected': (
+        "نأسف - تم رفض حسابك كمؤثر \n\n"
+        "اذا كنت تعتقد ان هذا كان خطأ، يرجى التواصل مع دعم العملاء للمساعدة."
+    ),
+}
+
+
+def notification_from_email():
+    return getattr(settings, 'DEFAULT_FROM_EMAIL', None) or getattr(settings, 'EMAIL_HOST_USER', None)
@@ -0,0 +1,275 @@
+"""
+Bulk influencer onboarding from CSV or JSONL files.
+
+import_influencers() streams the file, validates rows a batch at a time and
+inserts each batch of users and influencer profiles with bulk_create inside
+its own transaction, so memory stays flat however large the file is.
+
+Validation is column by column over the batch: model field rules (lengths,
+choices, e-mail/URL format, decimals), IBANs through iban.validate_many(),
+and uniqueness of phone_number, username and email with one query per column
+per batch plus a check against the rest of the batch. Earlier batches are
+already in the database by then, so duplicates across the file are caught by
+the same queries. Rows that fail are written to the error report and
+skipped; the rest of the batch is still imported.
+
+Passwords are never hashed during the import (PBKDF2 per row would dominate
+it). An optional password_hash column carries a Django-format hash made
+beforehand (make_password(), or exported from a Django system using the same
+hashers) and is stored as it is. Rows without one get an unusable password:
+those accounts cannot log in until an admin sets a password, e.g. with
+``manage.py changepassword <phone_number>``.
+"""
+import csv
+import io
+import json
+import secrets
+from dataclasses import dataclass
+
+from django.contrib.auth.hashers import UNUSABLE_PASSWORD_PREFIX, identify_hasher
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.db.models.functions import Lower
+
+from . import iban
+from .caching import invalidate_influencers
+from .models import Influencer, User
+from .search import get_backend
+
+BATCH_SIZE = 500
+FORMATS = ('csv', 'jsonl')
+
+USER_COLUMNS = ('phone_number', 'username', 'email')
+INFLUENCER_COLUMNS = (
+    'full_name', 'biography', 'category', 'daily_price', 'weekly_price', 'instagram_acc_link',
+    'tiktok_acc_link', 'snapchat_acc_link', 'youtube_acc_link', 'bank_name',
+)
+UNIQUE_COLUMNS = ('phone_number', 'username', 'email')
+REPORT_HEADER = ('line', 'field', 'error')
+
+
+@dataclass
+class ImportResult:
+    rows: int = 0
+    created: int = 0
+
+    @property
+    def failed(self):
+        return self.rows - self.created
+
+
+def detect_format(filename):
+    extension = filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
+    if extension in ('jsonl', 'ndjson'):
+        return 'jsonl'
+    return 'csv'
+
+
+def read_rows(stream, fmt):
+    """Yield ``(line, row_dict_or_None, error_or_None)`` from a binary `stream`."""
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='' if fmt == 'csv' else None)
+    try:
+        if fmt == 'csv':
+            reader = csv.DictReader(text)
+            for row in reader:
+                if None in row:
+                    yield reader.line_num, None, "More values than columns."
+                else:
+                    yield reader.line_num, row, None
+        else:
+            for line, raw in enumerate(text, start=1):
+                if not raw.strip():
+                    continue
+                try:
+                    row = json.loads(raw)
+                except ValueError as e:
+                    yield line, None, f"Invalid JSON: {e}"
+                    continue
+                if not isinstance(row, dict):
+                    yield line, None, "Expected a JSON object."
+                    continue
+                yield line, row, None
+    finally:
+        # leave the caller's stream open
+        text.detach()
+
+
+def _batches(rows, size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _text(value):
+    if value is None:
+        return ''
+    return value.strip() if isinstance(value, str) else str(value)
+
+
+class _Batch:
+    def __init__(self, rows):
+        # line -> cleaned values; rejected rows are dropped from here before the uniqueness checks
+        self.values = {}
+        self.errors = []
+        self.rejected = set()
+        for line, row, error in rows:
+            if error:
+                self.errors.append((line, '', error))
+            else:
+                self.values[line] = {key: _text(value) for key, value in row.items() if key}
+
+    def fail(self, line, field_name, message):
+        self.errors.append((line, field_name, message))
+        self.rejected.add(line)
+
+    def drop_rejected(self):
+        for line in self.rejected:
+            self.values.pop(line, None)
+
+    def column(self, name):
+        return [(line, values.get(name, '')) for line, values in self.values.items()]
+
+    def validate(self):
+        for line, values in list(self.values.items()):
+            # same defaults as registration: username falls back to the phone number
+            values['username'] = values.get('username') or values.get('phone_number', '')
+            values['email'] = User.objects.normalize_email(values.get('email', ''))
+
+        for name in USER_COLUMNS:
+            self._clean_column(User._meta.get_field(name), name, required=True)
+        for name in INFLUENCER_COLUMNS:
+            self._clean_column(Influencer._meta.get_field(name), name, required=False)
+
+        for line, value in self.column('password_hash'):
+            if not value:
+                continue
+            try:
+                identify_hasher(value)
+            except ValueError:
+                # also what a plain password put in the column by mistake gets
+                self.fail(line, 'password_hash', "Not a password hash this site can check.")
+
+        ibans = self.column('iban')
+        present = [(line, value) for line, value in ibans if value]
+        for (line, _), cleaned in zip(present, iban.validate_many(value for _, value in present)):
+            if cleaned is None:
+                self.fail(line, 'iban', "Invalid IBAN.")
+            else:
+                self.values[line]['iban'] = cleaned
+
+        # every field of a row is checked so the report lists all of its problems at once;
+        # only rows that are otherwise valid take part in the uniqueness checks
+        for name in UNIQUE_COLUMNS:
+            self.drop_rejected()
+            self._check_unique(name)
+        self.drop_rejected()
+
+    def _clean_column(self, model_field, name, required):
+        for line, value in self.column(name):
+            if not value:
+                if required:
+                    self.fail(line, name, "This field is required.")
+                else:
+                    self.values[line][name] = None
+                continue
+            try:
+                self.values[line][name] = model_field.clean(value, None)
+            except ValidationError as e:
+                self.fail(line, name, ' '.join(e.messages))
+
+    def _check_unique(self, name):
+        # e-mail addresses compare case-insensitively, the other columns exactly
+        key = str.lower if name == 'email' else (lambda value: value)
+        column = [(line, key(value)) for line, value in self.column(name)]
+        if name == 'email':
+            taken = User.objects.annotate(email_lower=Lower('email')).filter(
+                email_lower__in={value for _, value in column}).values_list('email_lower', flat=True)
+        else:
+            taken = User.objects.filter(**{f'{name}__in': {value for _, value in column}}).values_list(name, flat=True)
+        taken = set(taken)
+        seen = set()
+        for line, value in column:
+            if value in taken:
+                self.fail(line, name, f"A user with this {name.replace('_', ' ')} already exists.")
+            elif value in seen:
+                self.fail(line, name, f"Duplicate {name.replace('_', ' ')} within the file.")
+            else:
+                seen.add(value)
+
+    def build(self):
+        pairs = []
+        for line, values in self.values.items():
+            user = User(
+                username=values['username'], email=values['email'], phone_number=values['phone_number'],
+                role='influencer',
+                # without a hash: what make_password(None) stores, minus its per-character random.choice loop
+                password=values.get('password_hash') or UNUSABLE_PASSWORD_PREFIX + secrets.token_hex(20),
+            )
+            influencer = Influencer(
+                **{name: values.get(name) for name in INFLUENCER_COLUMNS}, iban=values.get('iban') or None,
+            )
+            pairs.append((line, user, influencer))
+        return pairs
+
+
+def _insert(pairs):
+    users = User.objects.bulk_create([user for _, user, _ in pairs])
+    for user, (_, _, influencer) in zip(users, pairs):
+        influencer.user = user
+    return Influencer.objects.bulk_create([influencer for _, _, influencer in pairs])
+
+
+def _insert_one_by_one(pairs, batch):
+    # a concurrent signup took a value between the check and the insert; isolate the offending rows
+    influencers = []
+    for line, user, influencer in pairs:
+        for obj in (user, influencer):
+            # the rolled-back bulk insert may already have assigned primary keys
+            obj.pk = None
+            obj._state.adding = True
+        try:
+            with transaction.atomic():
+                influencers.extend(_insert([(line, user, influencer)]))
+        except IntegrityError as e:
+            batch.fail(line, '', f"Conflicts with an existing user: {e}")
+    return influencers
+
+
+def import_influencers(stream, fmt='csv', report=None, batch_size=BATCH_SIZE):
+    """
+    Import influencers from the binary `stream` in `fmt` ('csv' or 'jsonl').
+
+    Row errors are written to `report` (a text file object) as CSV with the
+    columns line, field, error. Returns an ImportResult.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown import format: {fmt}")
+    writer = csv.writer(report) if report is not None else None
+    if writer:
+        writer.writerow(REPORT_HEADER)
+
+    result = ImportResult()
+    for rows in _batches(read_rows(stream, fmt), batch_size):
+        result.rows += len(rows)
+        batch = _Batch(rows)
+        with transaction.atomic():
+            batch.validate()
+            pairs = batch.build()
+            if pairs:
+                try:
+                    with transaction.atomic():
+                        influencers = _insert(pairs)
+                except IntegrityError:
+                    influencers = _insert_one_by_one(pairs, batch)
+                # bulk_create sends no signals: index for search and drop cached list pages here
+                get_backend().index(influencers, replace=False)
+                invalidate_influencers([influencer.pk for influencer in influencers])
+                result.created += len(influencers)
+        if writer:
+            writer.writerows(sorted(batch.errors))
+    return result
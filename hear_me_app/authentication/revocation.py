@@ -0,0 +1,126 @@
+"""
+Refresh-token revocation store.
+
+Rotated (and otherwise revoked) refresh tokens are recorded by jti in
+RevokedToken. The unique constraint on jti is what makes rotation safe:
+revoke() claims a token with a plain INSERT, so when the same refresh token
+is presented twice, even by two processes at once, only one INSERT wins.
+
+Each process also keeps a Bloom filter of the revoked jtis it knows about:
+the unexpired rows when it was loaded plus this process's own revocations
+since. It cannot see what other processes revoke after that, so a miss only
+proves the token was never revoked *here*. is_revoked() therefore lets a
+miss skip the lookup only when the caller passes claimed_later=True, i.e.
+will revoke() the token next, where the INSERT catches every revocation
+made elsewhere. Without it, and on a hit (revoked or one of the rare false
+positives), is_revoked() takes one indexed lookup. The filter is loaded on
+first use, and loaded again after pruning or once it holds more jtis than it
+was sized for.
+"""
+import hashlib
+import math
+import threading
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .models import RevokedToken
+
+DEFAULT_FILTER_CAPACITY = 100_000
+DEFAULT_FILTER_ERROR_RATE = 0.001
+PRUNE_BATCH_SIZE = 1000
+
+
+class BloomFilter:
+    def __init__(self, capacity, error_rate):
+        self.capacity = capacity
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key):
+        # double hashing: k positions from the two halves of one digest
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little') | 1
+        return [(first + i * second) % self.size for i in range(self.hashes)]
+
+    def add(self, key):
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+_filter = None
+_filter_lock = threading.Lock()
+
+
+def load_filter():
+    """Build a filter from the unexpired revocations in the database."""
+    jtis = list(RevokedToken.objects.filter(expires_at__gt=timezone.now()).values_list('jti', flat=True))
+    capacity = getattr(settings, 'TOKEN_REVOCATION_FILTER_CAPACITY', DEFAULT_FILTER_CAPACITY)
+    error_rate = getattr(settings, 'TOKEN_REVOCATION_FILTER_ERROR_RATE', DEFAULT_FILTER_ERROR_RATE)
+    # room to grow before the next load
+    bloom = BloomFilter(max(capacity, 2 * len(jtis)), error_rate)
+    for jti in jtis:
+        bloom.add(jti)
+    return bloom
+
+
+def get_filter():
+    global _filter
+    bloom = _filter
+    if bloom is None or bloom.count > bloom.capacity:
+        with _filter_lock:
+            if _filter is None or _filter.count > _filter.capacity:
+                _filter = load_filter()
+            bloom = _filter
+    return bloom
+
+
+def reset_filter():
+    """Drop this process's filter; the next check loads a fresh one."""
+    global _filter
+    _filter = None
+
+
+def is_revoked(jti, claimed_later=False):
+    """
+    True if `jti` has been revoked. Pass claimed_later=True only if revoke(jti)
+    follows: a filter miss then skips the lookup and leaves it to the INSERT.
+    """
+    if claimed_later and jti not in get_filter():
+        return False
+    return RevokedToken.objects.filter(jti=jti).exists()
+
+
+def revoke(jti, expires_at, user_id=None):
+    """Record `jti` as revoked. Returns False if it already was, i.e. the token is being reused."""
+    bloom = get_filter()
+    try:
+        with transaction.atomic():
+            RevokedToken.objects.create(jti=jti, expires_at=expires_at, user_id=user_id)
+    except IntegrityError:
+        bloom.add(jti)
+        return False
+    # added even if the surrounding transaction rolls back; that is only a false positive
+    bloom.add(jti)
+    return True
+
+
+def prune_expired(batch_size=PRUNE_BATCH_SIZE):
+    """Delete revocations of tokens that have expired anyway, `batch_size` rows at a time. Returns the count."""
+    now = timezone.now()
+    pruned = 0
+    while True:
+        ids = list(RevokedToken.objects.filter(expires_at__lte=now).values_list('pk', flat=True)[:batch_size])
+        if not ids:
+            break
+        pruned += RevokedToken.objects.filter(pk__in=ids).delete()[0]
+    if pruned:
+        reset_filter()
+    return pruned
@@ -0,0 +1,155 @@
+"""
+Full-text search over influencer names and biographies.
+
+The backend is chosen by ``settings.INFLUENCER_SEARCH_BACKEND`` (a dotted path).
+SQLiteFTS5Backend keeps an FTS5 table in the main database, updated from the
+Influencer save/delete signals inside the same transaction. SimpleBackend is a
+portable icontains fallback for other databases.
+
+Text is normalized the same way on both sides: Arabic diacritics and tatweel
+are dropped, alef/yaa/taa-marbuta variants are folded, and a leading definite
+article is stripped, so "المُؤثِّرين" and "مؤثرين" match each other.
+"""
+import re
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils.module_loading import import_string
+
+from .models import Influencer
+
+_ARABIC_FOLD = str.maketrans({
+    'أ': 'ا', 'إ': 'ا', 'آ': 'ا', 'ٱ': 'ا',
+    'ى': 'ي', 'ئ': 'ي', 'ؤ': 'و', 'ة': 'ه',
+    'ـ': None,  # tatweel
+    **{chr(c): None for c in range(0x064B, 0x0653)},  # harakat, shadda, sukun
+    'ٰ': None,  # superscript alef
+})
+_ARTICLES = ('وال', 'بال', 'كال', 'فال', 'لل', 'ال')
+_TOKEN_RE = re.compile(r'\w+')
+
+
+def _strip_article(token):
+    for article in _ARTICLES:
+        if token.startswith(article) and len(token) - len(article) >= 2:
+            return token[len(article):]
+    return token
+
+
+def tokenize(text):
+    if not text:
+        return []
+    return [_strip_article(token) for token in _TOKEN_RE.findall(text.casefold().translate(_ARABIC_FOLD))]
+
+
+def normalize_text(text):
+    return ' '.join(tokenize(text))
+
+
+class SearchBackend:
+    def index(self, influencers, replace=True):
+        """Add or refresh influencers; replace=False skips removing existing entries first."""
+        raise NotImplementedError
+
+    def remove(self, influencer_ids):
+        raise NotImplementedError
+
+    def search(self, query, status='approved', limit=20):
+        """Return influencer ids ranked best first."""
+        raise NotImplementedError
+
+    def clear(self):
+        pass
+
+    def rebuild(self, batch_size=2000):
+        """Reindex every influencer in pk-ordered batches; returns the number indexed."""
+        self.clear()
+        indexed = 0
+        last_pk = 0
+        while True:
+            batch = list(
+                Influencer.objects.filter(pk__gt=last_pk).order_by('pk')
+                .only('pk', 'full_name', 'biography')[:batch_size]
+            )
+            if not batch:
+                return indexed
+            with transaction.atomic():
+                self.index(batch, replace=False)
+            indexed += len(batch)
+            last_pk = batch[-1].pk
+
+
+class SQLiteFTS5Backend(SearchBackend):
+    """
+    Ranked FTS5 search. Matches are joined to their influencer rows, so the
+    status filter applies before anything is cut, and every remaining match
+    is ranked by bm25 before the best `limit` are taken.
+    """
+    table = 'influencer_search'
+    # full_name matches weigh ten times more than biography matches in bm25
+    rank = 'bm25(10.0, 1.0)'
+
+    # the table is created by migration 0010_influencer_search_index
+    def index(self, influencers, replace=True):
+        rows = [(i.pk, normalize_text(i.full_name), normalize_text(i.biography)) for i in influencers]
+        if not rows:
+            return
+        with connection.cursor() as cursor:
+            if replace:
+                cursor.executemany(f"DELETE FROM {self.table} WHERE rowid = %s", [(row[0],) for row in rows])
+            cursor.executemany(f"INSERT INTO {self.table} (rowid, full_name, biography) VALUES (%s, %s, %s)", rows)
+
+    def remove(self, influencer_ids):
+        with connection.cursor() as cursor:
+            cursor.executemany(f"DELETE FROM {self.table} WHERE rowid = %s", [(pk,) for pk in influencer_ids])
+
+    def clear(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table}")
+
+    @staticmethod
+    def match_expression(query):
+        # every term must match; each is a quoted prefix query so input cannot inject FTS syntax
+        return ' '.join('"%s"*' % token.replace('"', '""') for token in tokenize(query))
+
+    def search(self, query, status='approved', limit=20):
+        expression = self.match_expression(query)
+        if not expression:
+            return []
+        with connection.cursor() as cursor:
+            # status is filtered before the LIMIT, so pending matches never crowd out approved ones
+            cursor.execute(
+                f"SELECT s.rowid FROM {self.table} AS s JOIN {Influencer._meta.db_table} AS i ON i.id = s.rowid "
+                f"WHERE {self.table} MATCH %s AND s.rank MATCH %s AND i.status = %s ORDER BY s.rank LIMIT %s",
+                [expression, self.rank, status, limit],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+
+class SimpleBackend(SearchBackend):
+    """Unindexed icontains search for databases without FTS5; fine for small tables only."""
+
+    def index(self, influencers, replace=True):
+        pass
+
+    def remove(self, influencer_ids):
+        pass
+
+    def rebuild(self, batch_size=2000):
+        return 0
+
+    def search(self, query, status='approved', limit=20):
+        queryset = Influencer.objects.filter(status=status)
+        terms = _TOKEN_RE.findall(query)
+        if not terms:
+            return []
+        for term in terms:
+            queryset = queryset.filter(Q(full_name__icontains=term) | Q(biography__icontains=term))
+        return list(queryset.order_by('pk').values_list('pk', flat=True)[:limit])
+
+
+@lru_cache(maxsize=None)
+def get_backend():
+    return import_string(getattr(settings, 'INFLUENCER_SEARCH_BACKEND', 'authentication.search.SQLiteFTS5Backend'))()
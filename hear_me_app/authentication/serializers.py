@@ -1,42 +1,31 @@
 from rest_framework import serializers
+from rest_framework.exceptions import NotFound, PermissionDenied
 from django.contrib.auth import get_user_model, authenticate
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.files.storage import default_storage
+from django.db import IntegrityError, transaction
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
 from rest_framework_simplejwt.tokens import RefreshToken
-import re
-from .models import Client, Influencer
+from rest_framework_simplejwt.utils import datetime_from_epoch
+from .backends import CachedJWTAuthentication
+from .models import MAX_BIO_VIDEOS, Client, Influencer
+from . import direct_uploads, iban, media_store, revocation
+from .file_validators import MAX_VIDEO_SIZE, validate_video_file, validate_video_metadata
+from .image_variants import schedule_variants
 import logging
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.DEBUG)
 User = get_user_model()
 
 
 
+# kept for existing imports; validation lives in iban.py
 def normalize_iban(value: str) -> str:
-    return re.sub(r'\s+', '', value).upper()
-
-# IBAN checksum validation (basic, reliable)
-def is_valid_iban(iban: str) -> bool:
-    iban = normalize_iban(iban)
-    # Basic pattern: 2 letters country + 2 digits + up to 30 alnum
-    if not re.match(r'^[A-Z]{2}[0-9]{2}[A-Z0-9]{1,30}$', iban):
-        return False
-
-    # Move first 4 chars to the end and replace letters with numbers (A=10 ... Z=35)
-    rearranged = iban[4:] + iban[:4]
-    converted = ''
-    for ch in rearranged:
-        if ch.isdigit():
-            converted += ch
-        else:
-            converted += str(ord(ch) - 55)  # A->10 ... Z->35
+    return iban.normalize(value)
 
-    # Perform mod-97
-    # To avoid huge ints, iteratively compute remainder
-    remainder = 0
-    for i in range(0, len(converted), 9):  # process in chunks
-        part = str(remainder) + converted[i:i+9]
-        remainder = int(part) % 97
-    return remainder == 1
 
+def is_valid_iban(value: str) -> bool:
+    return iban.is_valid(value)
 
 
 # Utility function for token generation
@@ -60,92 +49,107 @@ class RegisterSerializer(serializers.Serializer):
             raise serializers.ValidationError("Invalid data format; expected an object.")
         return data.copy()
     
+    # only these request keys reach the saved rows; anything else (is_staff, status, ...) is ignored
+    USER_FIELDS = ('username', 'email', 'phone_number', 'password')
+    PROFILE_FIELDS = {
+        'client': (),
+        'influencer': (
+            'full_name', 'biography', 'category', 'profile_picture', 'bio_videos', 'daily_price', 'weekly_price',
+            'instagram_acc_link', 'tiktok_acc_link', 'snapchat_acc_link', 'youtube_acc_link', 'bank_name', 'iban',
+        ),
+    }
+    PROFILE_DEFAULTS = {'full_name': '', 'biography': '', 'category': '', 'bio_videos': list}
+    PROFILE_MODELS = {'client': Client, 'influencer': Influencer}
+
     def validate(self, data):
         # Conditional validation based on role
-        logger.info(f"Validating data: {data}")
+        logger.debug("Validating data: %s", data)
         role = data.get('role')
         if not role:
             raise serializers.ValidationError("Role is required.")
-        
-#data filtering for validation
-        data_copy = data.copy()
-        user_data = {}
-        for field in User._meta.get_fields():
-            field_name = field.name
-            if field_name in data_copy:
-                user_data[field_name] = data_copy.pop(field_name)
-
-# Validate the user data
-        user_instance = User(**user_data)
-        try:
-            user_instance.full_clean()
-        except serializers.ValidationError as e:
-            raise serializers.ValidationError(e.message_dict)
-        
-        if role == 'client':
-            # data_copy.pop('bio_videos')
-            client_instance = Client(**data_copy)
-            try:
-                client_instance.full_clean(exclude=['user'])
-            except serializers.ValidationError as e:
-                raise serializers.ValidationError(e.message_dict)
+        if role not in self.PROFILE_MODELS:
+            raise serializers.ValidationError({'role': f'"{role}" is not a valid choice.'})
 
-        elif role == 'influencer':
+        if role == 'influencer':
             # IBAN validation if present and role is influencer
             iban_val = data.get('iban')
             if iban_val:
-                from .serializers import is_valid_iban, normalize_iban
-                if not is_valid_iban(iban_val):
+                # normalized before saving
+                data['iban'] = iban.clean(iban_val)
+                if data['iban'] is None:
                     raise serializers.ValidationError({'iban': 'Invalid IBAN.'})
-                # normalize before saving
-                data['iban'] = normalize_iban(iban_val)
 
             bank_name_val = data.get('bank_name')
             # validate bank_name length/characters
             if bank_name_val and len(bank_name_val) > 150:
                 raise serializers.ValidationError({'bank_name': 'Bank name too long.'})
 
-            Influencer_instance = Influencer(**data_copy) 
+        # field rules are checked here, once; uniqueness is left to the database constraints (see create)
+        user = User(role=role, **{name: data.get(name) for name in self.USER_FIELDS})
+        profile = self.PROFILE_MODELS[role](**{
+            name: data.get(name, self._default(name)) for name in self.PROFILE_FIELDS[role]
+        })
+        errors = {}
+        for instance, exclude in ((user, None), (profile, ['user'])):
             try:
-                Influencer_instance.full_clean(exclude=['user'])
-            except serializers.ValidationError as e:
-                raise serializers.ValidationError(e.message_dict)
+                instance.full_clean(exclude=exclude, validate_unique=False, validate_constraints=False)
+            except DjangoValidationError as e:
+                errors.update(e.message_dict)
+        if errors:
+            raise serializers.ValidationError(errors)
 
+        self.user, self.profile = user, profile
         return data
-    
+
+    def _default(self, name):
+        default = self.PROFILE_DEFAULTS.get(name)
+        return default() if callable(default) else default
+
+    @staticmethod
+    def unique_violation(exc, user):
+        """Map an IntegrityError from the user INSERT to the error full_clean() would have raised."""
+        message = str(exc)
+        for field in User._meta.fields:
+            if field.unique and not field.primary_key and field.column in message:
+                return serializers.ValidationError(
+                    {field.name: user.unique_error_message(User, [field.name]).messages}
+                )
+        return serializers.ValidationError("An account with these details already exists.")
+
     def create(self, validated_data):
-        # Extract role-specific data
-        role = validated_data.pop('role')
-
-        # Create the user
-        user = User.objects.create_user(
-            username=validated_data['username'],
-            email=validated_data['email'],
-            phone_number=validated_data['phone_number'],
-            password=validated_data['password'],
-            role=role
-        )
-
-        # Handle role-specific models
-        if role == 'client':
-            Client.objects.create(user=user)
-        elif role == 'influencer':
-            Influencer.objects.create(
-                user=user,
-                full_name=validated_data.get('full_name', ''),
-                biography=validated_data.get('biography', ''),
-                category=validated_data.get('category', ''),
-                profile_picture=validated_data.get('profile_picture'),
-                bio_videos=validated_data.get('bio_videos', []),
-                daily_price=validated_data.get('daily_price'),
-                weekly_price=validated_data.get('weekly_price'),
-                instagram_acc_link=validated_data.get('instagram_acc_link'),
-                tiktok_acc_link=validated_data.get('tiktok_acc_link'),
-                snapchat_acc_link=validated_data.get('snapchat_acc_link'),
-                youtube_acc_link=validated_data.get('youtube_acc_link'),
-                bank_name=validated_data.get('bank_name'),
-                iban=validated_data.get('iban'),
-            )
+        """
+        Insert the user and role profile validated above in one transaction.
+
+        A duplicate phone number or username is caught by the unique constraint rather than a
+        SELECT beforehand, so registration is two INSERTs (three with the influencer search entry),
+        plus one UPDATE taking the references on any uploads the profile records.
+        """
+        user, profile = self.user, self.profile
+
+        # the async register view hashes the password beforehand (see hashing.py)
+        password_hash = validated_data.pop('password_hash', None)
+        if password_hash is None:
+            user.set_password(validated_data['password'])
+        else:
+            user.password = password_hash
+        user.username = User.normalize_username(user.username) if user.username else user.username
+        user.email = User.objects.normalize_email(user.email)
+
+        # an uploaded picture is recorded by its storage path, not the URL the upload returned
+        if getattr(profile, 'profile_picture', None):
+            profile.profile_picture.name = media_store.stored_path(profile.profile_picture.name)
+
+        try:
+            with transaction.atomic():
+                user.save()
+                profile.user = user
+                profile.save()
+                # the uploads recorded on the profile were stored without a reference; take ours now
+                if isinstance(profile, Influencer):
+                    media_store.acquire([profile.profile_picture.name, *profile.bio_videos])
+        except IntegrityError as e:
+            user.pk = None
+            raise self.unique_violation(e, user)
 
         # Generate tokens
         tokens = generate_tokens(user)
@@ -154,19 +158,26 @@ class RegisterSerializer(serializers.Serializer):
 
         return validated_data
 
-class LoginSerializer(serializers.Serializer):
+class LoginCredentialsSerializer(serializers.Serializer):
     phone_number = serializers.CharField(max_length=15)
     password = serializers.CharField(write_only=True)
     role = serializers.ChoiceField(choices=[('client', 'Client'), ('influencer', 'Influencer')])
 
+    @staticmethod
+    def check_account(user, role):
+        if user.role != role:
+            raise serializers.ValidationError("Role mismatch.")
+        if user.role == 'influencer' and user.influencer_profile.status != 'approved':
+            raise serializers.ValidationError("Influencer account not approved.")
+
+
+class LoginSerializer(LoginCredentialsSerializer):
+
     def validate(self, data):
         user = authenticate(phone_number=data['phone_number'], password=data['password'])
         if not user:
             raise serializers.ValidationError("Invalid credentials.")
-        if user.role != data['role']:
-            raise serializers.ValidationError("Role mismatch.")
-        if user.role == 'influencer' and user.influencer_profile.status != 'approved':
-            raise serializers.ValidationError("Influencer account not approved.")
+        self.check_account(user, data['role'])
         data['user'] = user
         return data
 
@@ -175,7 +186,44 @@ class LoginSerializer(serializers.Serializer):
         tokens = generate_tokens(user)
         validated_data.update(tokens)
         return validated_data
-    
+
+
+class TokenRefreshSerializer(serializers.Serializer):
+    refresh_token = serializers.CharField()
+
+    def validate(self, data):
+        try:
+            refresh = RefreshToken(data['refresh_token'])
+        except TokenError as e:
+            raise InvalidToken(e.args[0])
+        # with rotation blacklisting, create() claims the token with an INSERT that fails for any
+        # revoked token, so a miss in this process's filter may skip the lookup
+        claimed_later = jwt_settings.ROTATE_REFRESH_TOKENS and jwt_settings.BLACKLIST_AFTER_ROTATION
+        if revocation.is_revoked(refresh[jwt_settings.JTI_CLAIM], claimed_later=claimed_later):
+            raise InvalidToken("Token is blacklisted")
+        # same cached user lookup and checks (active, password unchanged) as request authentication
+        data['user'] = CachedJWTAuthentication().get_user(refresh)
+        data['refresh'] = refresh
+        return data
+
+    def create(self, validated_data):
+        refresh = validated_data['refresh']
+        tokens = {'access_token': str(refresh.access_token)}
+        if jwt_settings.ROTATE_REFRESH_TOKENS:
+            if jwt_settings.BLACKLIST_AFTER_ROTATION:
+                # the INSERT is the claim: of two requests with the same token only one gets past here
+                claimed = revocation.revoke(
+                    refresh[jwt_settings.JTI_CLAIM], datetime_from_epoch(refresh['exp']), validated_data['user'].pk,
+                )
+                if not claimed:
+                    raise InvalidToken("Token is blacklisted")
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            tokens['refresh_token'] = str(refresh)
+        return tokens
+
+
 class ProfilePictureUploadSerializer(serializers.ModelSerializer):
     profile_picture = serializers.ImageField(required=True)
 
@@ -183,27 +231,121 @@ class ProfilePictureUploadSerializer(serializers.ModelSerializer):
         model = Influencer
         fields = ['profile_picture']
 
-    def validate_profile_picture(self, value):
+    MAX_SIZE = 5 * 1024 * 1024
+    EXTENSIONS = ['.jpg', '.jpeg', '.png', '.webp']
+    CONTENT_TYPES = ['image/jpeg', 'image/png', 'image/webp']
 
+    @classmethod
+    def check_metadata(cls, name, size):
         # Validate file size (e.g., max 5MB)
-        max_size = 5 * 1024 * 1024 
-        if value.size > max_size: 
+        if size > cls.MAX_SIZE:
             raise serializers.ValidationError("Profile picture size should not exceed 5MB.")
 
-
         # Valisate file type
-        validated_extensions = ['.jpg', '.jpeg', '.png', '.webp'] 
-        if not any(str(value.name).lower().endswith(ext) for ext in validated_extensions):
+        if not any(str(name).lower().endswith(ext) for ext in cls.EXTENSIONS):
             raise serializers.ValidationError("Unsupported file type. Allowed types: JPG, JPEG, PNG, WEBP.")
-        
+
+    def validate_profile_picture(self, value):
+        self.check_metadata(value.name, value.size)
         return value
     
     def save(self, user):
-        influencer = user.influencer_profile
-        influencer.profile_picture = self.validated_data['profile_picture']
-        influencer.save()
+        blob, _ = media_store.put(self.validated_data['profile_picture'], 'influencer_profiles')
+        with transaction.atomic():
+            # user.influencer_profile may be the auth cache's copy; the picture it
+            # names can be stale, and saving it whole could undo an admin's change
+            influencer = Influencer.objects.select_for_update().get(pk=user.influencer_profile.pk)
+            old_path = influencer.profile_picture.name if influencer.profile_picture else None
+            # assigning the stored name attaches the blob without another storage write
+            influencer.profile_picture = blob.path
+            influencer.save(update_fields=['profile_picture'])
+        if old_path:
+            # drops the previous picture's reference (or the duplicate one just taken)
+            media_store.release(old_path)
+        # resized variants are rendered in a process pool after the save commits
+        schedule_variants(influencer, checksum=blob.sha256)
         return influencer
 
+
+class DirectUploadTicketSerializer(serializers.Serializer):
+    """What the client is about to upload; the ticket is issued for exactly this."""
+    kind = serializers.ChoiceField(choices=direct_uploads.KINDS)
+    filename = serializers.CharField(max_length=255)
+    size = serializers.IntegerField(min_value=1)
+    content_type = serializers.CharField(max_length=100)
+
+    def validate(self, data):
+        if data['kind'] == 'profile_picture':
+            ProfilePictureUploadSerializer.check_metadata(data['filename'], data['size'])
+            if data['content_type'] not in ProfilePictureUploadSerializer.CONTENT_TYPES:
+                raise serializers.ValidationError("Unsupported content type.")
+        else:
+            try:
+                validate_video_metadata(data['filename'], data['size'], data['content_type'])
+            except DjangoValidationError as e:
+                raise serializers.ValidationError(e.messages)
+        return data
+
+
+class DirectUploadCompleteSerializer(serializers.Serializer):
+    ticket = serializers.CharField()
+
+    def validate_ticket(self, value):
+        try:
+            return direct_uploads.load_ticket(value)
+        except direct_uploads.TicketError as e:
+            raise serializers.ValidationError(str(e))
+
+    def save(self, user):
+        """
+        Validate the uploaded object like a regular upload and attach it to the
+        user's Influencer. The object is removed from the upload backend either way.
+        """
+        ticket = self.validated_data['ticket']
+        if ticket['user'] != user.pk:
+            raise PermissionDenied("This upload ticket belongs to another user.")
+        backend = direct_uploads.get_backend()
+        used = serializers.ValidationError({'ticket': ["This ticket has already been used."]})
+        try:
+            file = backend.open(ticket)
+        except FileNotFoundError:
+            # a completed upload's object is gone, but its ticket must not look unused
+            if backend.was_used(ticket['key'], 'completed'):
+                raise used
+            raise NotFound("Nothing has been uploaded for this ticket.")
+        if not backend.mark_used(ticket['key'], 'completed'):
+            file.close()
+            raise used
+        try:
+            if ticket['kind'] == 'profile_picture':
+                serializer = ProfilePictureUploadSerializer(data={'profile_picture': file})
+                serializer.is_valid(raise_exception=True)
+                return serializer.save(user)
+
+            try:
+                validate_video_file(file)
+            except DjangoValidationError as e:
+                raise serializers.ValidationError(e.messages)
+            blob, _ = media_store.put(file, 'influencer_bio_videos')
+            try:
+                with transaction.atomic():
+                    # count and append on the current row, not the auth cache's copy, so
+                    # concurrent completions can neither lose a video nor pass the limit together
+                    influencer = Influencer.objects.select_for_update().get(pk=user.influencer_profile.pk)
+                    if len(influencer.bio_videos) >= MAX_BIO_VIDEOS:
+                        raise serializers.ValidationError(
+                            f"An influencer can have a maximum of {MAX_BIO_VIDEOS} bio videos.")
+                    influencer.bio_videos.append(default_storage.url(blob.path))
+                    influencer.save(update_fields=['bio_videos'])
+            except serializers.ValidationError:
+                media_store.release(blob.path)
+                raise
+            return influencer
+        finally:
+            file.close()
+            backend.delete(ticket['key'])
+
+
 class BankDetailsSerializer(serializers.ModelSerializer):
     iban = serializers.CharField(required=True)
     bank_name = serializers.CharField(required=True, max_length=150)
@@ -213,7 +355,76 @@ class BankDetailsSerializer(serializers.ModelSerializer):
         fields = ['bank_name', 'iban']
 
     def validate_iban(self, value):
-        value = normalize_iban(value)
-        if not is_valid_iban(value):
+        value = iban.clean(value)
+        if value is None:
             raise serializers.ValidationError("Invalid IBAN.")
         return value
+
+    def update(self, instance, validated_data):
+        # the instance may be the auth cache's copy of the profile: write back only these columns
+        for name, value in validated_data.items():
+            setattr(instance, name, value)
+        instance.save(update_fields=list(validated_data))
+        return instance
+
+
+class UploadSessionSerializer(serializers.Serializer):
+    filename = serializers.CharField(max_length=255)
+    total_size = serializers.IntegerField(min_value=1)
+    content_type = serializers.CharField(max_length=100, required=False, allow_blank=True)
+    chunk_size = serializers.IntegerField(min_value=1, max_value=MAX_VIDEO_SIZE, required=False)
+
+
+class InfluencerDiscoveryQuerySerializer(serializers.Serializer):
+    ORDERING_CHOICES = ['-id', 'id', 'daily_price', '-daily_price', 'weekly_price', '-weekly_price']
+
+    category = serializers.ChoiceField(choices=Influencer.CATEGORY_CHOICES, required=False)
+    status = serializers.ChoiceField(choices=Influencer.STATUS_CHOICES, default='approved')
+    min_daily_price = serializers.DecimalField(max_digits=10, decimal_places=2, required=False)
+    max_daily_price = serializers.DecimalField(max_digits=10, decimal_places=2, required=False)
+    min_weekly_price = serializers.DecimalField(max_digits=10, decimal_places=2, required=False)
+    max_weekly_price = serializers.DecimalField(max_digits=10, decimal_places=2, required=False)
+    ordering = serializers.ChoiceField(choices=ORDERING_CHOICES, default='-id')
+    page_size = serializers.IntegerField(min_value=1, max_value=100, default=20)
+    cursor = serializers.CharField(required=False)
+
+    def validate_status(self, value):
+        # only staff may browse influencers that are not approved yet
+        request = self.context.get('request')
+        if value != 'approved' and not (request and request.user.is_staff):
+            raise serializers.ValidationError("Only approved influencers can be listed.")
+        return value
+
+
+class InfluencerSearchQuerySerializer(serializers.Serializer):
+    q = serializers.CharField(max_length=200)
+    status = serializers.ChoiceField(choices=Influencer.STATUS_CHOICES, default='approved')
+    limit = serializers.IntegerField(min_value=1, max_value=50, default=20)
+
+    validate_status = InfluencerDiscoveryQuerySerializer.validate_status
+
+
+class InfluencerPublicSerializer(serializers.ModelSerializer):
+    username = serializers.CharField(source='user.username', read_only=True)
+    profile_picture = serializers.ImageField(read_only=True)
+    profile_picture_variants = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Influencer
+        fields = [
+            'id', 'username', 'full_name', 'biography', 'category', 'profile_picture', 'profile_picture_variants',
+            'bio_videos', 'daily_price', 'weekly_price', 'instagram_acc_link', 'tiktok_acc_link',
+            'snapchat_acc_link', 'youtube_acc_link',
+        ]
+        read_only_fields = fields
+
+    def get_profile_picture_variants(self, obj):
+        request = self.context.get('request')
+        urls = obj.profile_picture_variant_urls
+        if request is None:
+            return urls
+        return {
+            name: {key: request.build_absolute_uri(value) if key in ('webp', 'jpeg') else value
+                   for key, value in entry.items()}
+            for name, entry in urls.items()
+        }
@@ -1,25 +1,24 @@
-from django.db.models.signals import pre_save, post_save
+from django.db.models.signals import pre_save, post_save, post_delete
 from django.dispatch import receiver
-from django.core.mail import send_mail
-from django.conf import settings
 import logging
 
-from .models import Influencer
+from core.jobs import enqueue
+
+from .caching import LIST_FIELDS, invalidate_influencers, invalidate_users
+from .models import Client, Influencer, User
+from .search import get_backend
 
 logger = logging.getLogger(__name__)
 
 
 @receiver(pre_save, sender=Influencer)
 def influencer_pre_save(sender, instance, **kwargs):
-    # stash old status so post_save can detect changes
-    if instance.pk:
-        try:
-            old = sender.objects.get(pk=instance.pk)
-            instance._old_status = getattr(old, 'status', None)
-        except sender.DoesNotExist:
-            instance._old_status = None
-    else:
-        instance._old_status = None
+    # rows loaded from the DB already carry their original status (ChangeTrackingMixin);
+    # only instances built by hand around an existing pk need a lookup
+    if instance.pk and not instance.is_tracked('status'):
+        instance.__dict__.setdefault('_loaded_values', {})['status'] = (
+            sender.objects.filter(pk=instance.pk).values_list('status', flat=True).first()
+        )
 
 
 @receiver(post_save, sender=Influencer)
@@ -28,35 +27,72 @@ def influencer_post_save(sender, instance, created, **kwargs):
     if created:
         return
 
-    old_status = getattr(instance, '_old_status', None)
-    new_status = getattr(instance, 'status', None)
+    old_status = instance.loaded_value('status')
+    new_status = instance.status
     if old_status == new_status:
         return
 
     if new_status not in ('approved', 'rejected'):
         return
 
-    user_email = getattr(instance.user, 'email', None)
-    if not user_email:
-        logger.warning("Influencer %s has no email; skipping notification", instance.pk)
+    # the email is sent by the job queue worker (manage.py run_jobs), not inside the save;
+    # the job row commits or rolls back together with the status change
+    enqueue('authentication.send_status_email', {'influencer_id': instance.pk, 'status': new_status})
+
+
+@receiver(post_save, sender=Influencer)
+def influencer_search_index(sender, instance, created, update_fields=None, **kwargs):
+    # reindex only when the searchable text may have changed
+    searchable = {'full_name', 'biography'}
+    if update_fields is not None and not searchable & set(update_fields):
         return
+    if created or not instance.is_tracked('full_name') or not instance.is_tracked('biography') \
+            or searchable & instance.changed_fields:
+        # a new profile has no index entry to replace yet
+        get_backend().index([instance], replace=not created)
 
-    subject = "حالة حساب المؤثر الخاص بك قد تم تحديثها"  # "Your Influencer Account Status Has Been Updated"
-    if new_status == 'approved':
-        message = (
-            "تهانينا - تم الموافقة علي حسابك كمؤثر \n\n"
-            "يمكنك الآن تسجيل الدخول وبدء استخدام ميزات المؤثرين لدينا. شكراً لانضمامك إلينا!"
-        )
-    else:  # rejected
-        message = (
-            "نأسف - تم رفض حسابك كمؤثر \n\n"
-            "اذا كنت تعتقد ان هذا كان خطأ، يرجى التواصل مع دعم العملاء للمساعدة."
-        )
 
-    from_email = getattr(settings, 'DEFAULT_FROM_EMAIL', None) or getattr(settings, 'EMAIL_HOST_USER', None)
+@receiver(post_delete, sender=Influencer)
+def influencer_search_remove(sender, instance, **kwargs):
+    get_backend().remove([instance.pk])
+
+
+@receiver(post_save, sender=Influencer)
+def influencer_cache_invalidate(sender, instance, created, update_fields=None, **kwargs):
+    # list pages survive saves that only touch fields they neither show nor filter on (bank details)
+    fields = LIST_FIELDS if update_fields is None else LIST_FIELDS & set(update_fields)
+    changed = instance.changed_fields
+    listed = created or any(not instance.is_tracked(name) or name in changed for name in fields)
+    invalidate_influencers([instance.pk], lists=listed)
+    # the owner's cached auth entry carries this profile (status included)
+    invalidate_users([instance.user_id])
+
+
+@receiver(post_delete, sender=Influencer)
+def influencer_cache_remove(sender, instance, **kwargs):
+    invalidate_influencers([instance.pk])
+    invalidate_users([instance.user_id])
+
+
+@receiver(post_save, sender=Client)
+@receiver(post_delete, sender=Client)
+def client_cache_invalidate(sender, instance, **kwargs):
+    invalidate_users([instance.user_id])
+
 
-    try:
-        send_mail(subject, message, from_email, [user_email], fail_silently=False)
-        logger.info("Sent %s email to %s", new_status, user_email)
-    except Exception:
-        logger.exception("Failed to send influencer status email to %s", user_email)
\ No newline at end of file
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_auth_cache_invalidate(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and set(update_fields) <= {'last_login'}:
+        return
+    invalidate_users([instance.pk])
+
+
+@receiver(post_save, sender=User)
+def user_cache_invalidate(sender, instance, created, update_fields=None, **kwargs):
+    # login bookkeeping does not touch anything a public profile shows
+    if created or instance.role != 'influencer':
+        return
+    if update_fields is not None and set(update_fields) <= {'last_login', 'password'}:
+        return
+    invalidate_influencers(Influencer.objects.filter(user_id=instance.pk).values_list('pk', flat=True))
@@ -0,0 +1,44 @@
+"""
+Bulk influencer status changes.
+
+bulk_set_status() moves many influencers with a few batched UPDATEs instead
+of one save() per row, so no per-row signals fire. Notifications are queued
+as one job per batch, and each job sends its emails over a single reused
+connection.
+"""
+from django.db import transaction
+
+from core.jobs import enqueue_many
+
+from .caching import invalidate_influencers, invalidate_users
+from .models import Influencer
+
+NOTIFY_STATUSES = ('approved', 'rejected')
+UPDATE_BATCH_SIZE = 1000
+EMAIL_BATCH_SIZE = 200
+
+
+def _batches(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def bulk_set_status(queryset, new_status, email_batch_size=EMAIL_BATCH_SIZE):
+    """Set `new_status` on every influencer in `queryset`; returns the ids that changed."""
+    if new_status not in dict(Influencer.STATUS_CHOICES):
+        raise ValueError(f"Unknown influencer status: {new_status}")
+
+    with transaction.atomic():
+        rows = list(queryset.exclude(status=new_status).order_by('pk').values_list('pk', 'user_id'))
+        ids = [pk for pk, _ in rows]
+        for batch in _batches(ids, UPDATE_BATCH_SIZE):
+            Influencer.objects.filter(pk__in=batch).update(status=new_status)
+        if new_status in NOTIFY_STATUSES and ids:
+            enqueue_many('authentication.send_status_emails', [
+                {'influencer_ids': batch, 'status': new_status}
+                for batch in _batches(ids, email_batch_size)
+            ])
+        # queryset.update() sends no signals, so cached profiles and auth entries are dropped here
+        invalidate_influencers(ids)
+        invalidate_users([user_id for _, user_id in rows])
+    return ids
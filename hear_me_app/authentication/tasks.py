@@ -0,0 +1,71 @@
+import logging
+
+from django.core.mail import EmailMessage, get_connection, send_mail
+
+from core.jobs import backoff, enqueue, task
+
+from .models import Influencer
+from .notifications import STATUS_EMAIL_MESSAGES, STATUS_EMAIL_SUBJECT, notification_from_email
+
+logger = logging.getLogger(__name__)
+
+
+@task('authentication.send_status_email', queue='email', max_attempts=6)
+def send_status_email(influencer_id, status):
+    influencer = Influencer.objects.select_related('user').filter(pk=influencer_id).first()
+    if influencer is None:
+        logger.info("Influencer %s no longer exists; dropping %s email", influencer_id, status)
+        return
+
+    user_email = influencer.user.email
+    if not user_email:
+        logger.warning("Influencer %s has no email; skipping notification", influencer_id)
+        return
+
+    # raising lets the job queue retry with backoff
+    send_mail(STATUS_EMAIL_SUBJECT, STATUS_EMAIL_MESSAGES[status], notification_from_email(), [user_email],
+              fail_silently=False)
+    logger.info("Sent %s email to influencer %s", status, influencer_id)
+
+
+BATCH_EMAIL_MAX_ATTEMPTS = 6
+
+
+@task('authentication.send_status_emails', queue='email', max_attempts=1)
+def send_status_emails(influencer_ids, status, attempt=1):
+    """
+    Send one batch of status emails over a single connection.
+
+    Retries are handled here rather than by the queue: only the influencers
+    whose email was not sent yet are re-queued, so nobody gets a duplicate.
+    """
+    recipients = [
+        (influencer_id, email)
+        for influencer_id, email in Influencer.objects.filter(pk__in=influencer_ids)
+        .order_by('pk').values_list('pk', 'user__email')
+        if email
+    ]
+    from_email = notification_from_email()
+    connection = get_connection(fail_silently=False)
+    sent = 0
+    try:
+        connection.open()
+        for influencer_id, email in recipients:
+            connection.send_messages([
+                EmailMessage(STATUS_EMAIL_SUBJECT, STATUS_EMAIL_MESSAGES[status], from_email, [email],
+                             connection=connection),
+            ])
+            sent += 1
+    except Exception:
+        remaining = [influencer_id for influencer_id, _ in recipients[sent:]]
+        if attempt >= BATCH_EMAIL_MAX_ATTEMPTS:
+            raise
+        logger.warning("Status email batch failed after %s of %s; re-queuing %s",
+                       sent, len(recipients), len(remaining), exc_info=True)
+        enqueue('authentication.send_status_emails',
+                {'influencer_ids': remaining, 'status': status, 'attempt': attempt + 1},
+                delay=backoff(attempt))
+        return
+    finally:
+        connection.close()
+    logger.info("Sent %s %s email(s) in one batch", sent, status)
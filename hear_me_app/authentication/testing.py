@@ -0,0 +1,39 @@
+"""Minimal but well-formed video files for tests and benchmarks (see video_probe)."""
+import struct
+
+
+def _box(kind, *payload):
+    data = b''.join(payload)
+    return struct.pack('>I4s', 8 + len(data), kind) + data
+
+
+def mp4_bytes(duration=10, width=1280, height=720, codec=b'avc1', media=b'', brand=b'isom', moov_last=False):
+    """An MP4 (or MOV with brand=b'qt  ') with one video track and `media` as its mdat payload."""
+    timescale = 1000
+    mvhd = _box(b'mvhd', struct.pack('>I8xII', 0, timescale, duration * timescale), bytes(80))
+    tkhd = _box(b'tkhd', bytes(76), struct.pack('>II', width << 16, height << 16))
+    hdlr = _box(b'hdlr', bytes(8), b'vide', bytes(13))
+    stsd = _box(b'stsd', struct.pack('>II', 0, 1), _box(codec, bytes(78)))
+    trak = _box(b'trak', tkhd, _box(b'mdia', hdlr, _box(b'minf', _box(b'stbl', stsd))))
+    moov = _box(b'moov', mvhd, trak)
+    ftyp = _box(b'ftyp', brand, bytes(4))
+    mdat = _box(b'mdat', media)
+    return ftyp + (mdat + moov if moov_last else moov + mdat)
+
+
+def _element(element_id, payload):
+    size = len(payload)
+    # 8-byte size vint, always valid
+    return element_id + bytes([0x01]) + size.to_bytes(7, 'big') + payload
+
+
+def webm_bytes(duration=10, width=1280, height=720, codec=b'V_VP9', media=b'', doctype=b'webm'):
+    """A WebM (or Matroska with doctype=b'matroska') file with one video track and `media` in one Cluster."""
+    header = _element(b'\x1a\x45\xdf\xa3', _element(b'\x42\x82', doctype))
+    info = _element(b'\x15\x49\xa9\x66', _element(b'\x2a\xd7\xb1', (1_000_000).to_bytes(3, 'big'))
+                    + _element(b'\x44\x89', struct.pack('>d', duration * 1000.0)))
+    video = _element(b'\xe0', _element(b'\xb0', width.to_bytes(2, 'big')) + _element(b'\xba', height.to_bytes(2, 'big')))
+    track = _element(b'\xae', _element(b'\x83', b'\x01') + _element(b'\x86', codec) + video)
+    tracks = _element(b'\x16\x54\xae\x6b', track)
+    cluster = _element(b'\x1f\x43\xb6\x75', media)
+    return header + _element(b'\x18\x53\x80\x67', info + tracks + cluster)
@@ -1,3 +1,1000 @@
-from django.test import TestCase
+import io
+import json
+import os
+import shutil
+import tempfile
+import time
+from datetime import timedelta
+from unittest import mock
+from urllib.parse import urlsplit
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import AnonymousUser
+from django.core import mail
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from core import admission, jobs
+from core.models import Job
+from core.testing import QueryBudgetTestMixin
+
+from . import (
+    direct_uploads, hashing, iban, image_variants, media_store, revocation, search, upload_sessions, video_probe,
+)
+from .backends import CachedJWTAuthentication
+from .file_validators import MAX_VIDEO_DURATION, MAX_VIDEO_SIZE, validate_video_file
+from .onboarding import import_influencers
+from .models import Influencer, MediaBlob, RevokedToken, UploadSession, User
+from .status import bulk_set_status
+from .tasks import send_status_emails
+from .testing import mp4_bytes, webm_bytes
+from .urls import urlpatterns
+
+
+class InfluencerChangeTrackingTests(TestCase):
+    def setUp(self):
+        user = User.objects.create_user(
+            phone_number='0500000001', username='influencer1', email='influencer1@example.com',
+            password='pass12345', role='influencer',
+        )
+        self.influencer_id = Influencer.objects.create(user=user).pk
+
+    def test_save_without_status_change_is_a_single_update(self):
+        influencer = Influencer.objects.get(pk=self.influencer_id)
+        influencer.bank_name = 'Bank'
+        influencer.iban = 'SA0380000000608010167519'
+        with self.assertNumQueries(1):
+            influencer.save()
+        self.assertEqual(influencer.changed_fields, set())
+
+    def test_status_change_is_detected_without_a_select(self):
+        influencer = Influencer.objects.get(pk=self.influencer_id)
+        influencer.status = 'approved'
+        self.assertEqual(influencer.changed_fields, {'status'})
+        # UPDATE plus the notification job INSERT
+        with self.assertNumQueries(2):
+            influencer.save()
+        self.assertEqual(Job.objects.filter(task='authentication.send_status_email').count(), 1)
+        self.assertEqual(influencer.loaded_value('status'), 'approved')
+
+    def test_saving_again_does_not_renotify(self):
+        influencer = Influencer.objects.get(pk=self.influencer_id)
+        influencer.status = 'approved'
+        influencer.save()
+        influencer.save()
+        self.assertEqual(Job.objects.count(), 1)
+
+    def test_in_place_json_changes_are_tracked(self):
+        influencer = Influencer.objects.get(pk=self.influencer_id)
+        influencer.bio_videos.append('/media/influencer_bio_videos/a.mp4')
+        self.assertEqual(influencer.changed_fields, {'bio_videos'})
+
+    def test_unloaded_instance_falls_back_to_a_lookup(self):
+        influencer = Influencer.objects.get(pk=self.influencer_id)
+        detached = Influencer(pk=influencer.pk, user_id=influencer.user_id, status='rejected')
+        detached._state.adding = False
+        detached.save()
+        self.assertEqual(Job.objects.get().payload, {'influencer_id': influencer.pk, 'status': 'rejected'})
+
+    @override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
+    def test_stale_status_emails_are_requeued_and_sent_by_a_worker_of_every_queue(self):
+        influencer = Influencer.objects.get(pk=self.influencer_id)
+        influencer.status = 'approved'
+        influencer.save()
+        # left "running" by a worker that died
+        Job.objects.update(status='running', locked_at=timezone.now() - timedelta(hours=1))
+        jobs.requeue_stale()
+        jobs.run_pending()
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertFalse(Job.objects.exists())
+
+    @override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
+    def test_failed_email_batch_is_requeued_not_reported_as_sent(self):
+        with mock.patch('django.core.mail.backends.locmem.EmailBackend.send_messages', side_effect=OSError), \
+                self.assertLogs('authentication.tasks', 'INFO') as logs:
+            send_status_emails([self.influencer_id], 'approved')
+        self.assertEqual(Job.objects.get().payload, {
+            'influencer_ids': [self.influencer_id], 'status': 'approved', 'attempt': 2,
+        })
+        self.assertEqual([record.levelname for record in logs.records], ['WARNING'])
+
+
+class CachedJWTAuthenticationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            phone_number='0500000002', username='influencer2', email='influencer2@example.com',
+            password='pass12345', role='influencer',
+        )
+        self.influencer = Influencer.objects.create(user=self.user)
+        self.token = AccessToken.for_user(self.user)
+        self.backend = CachedJWTAuthentication()
+
+    def test_cache_hit_makes_no_queries(self):
+        with self.assertNumQueries(1):
+            user = self.backend.get_user(self.token)
+            self.assertEqual(user.influencer_profile.status, 'pending')
+        with self.assertNumQueries(0):
+            user = self.backend.get_user(self.token)
+            self.assertEqual(user.influencer_profile.pk, self.influencer.pk)
+            self.assertFalse(hasattr(user, 'client_profile'))
+
+    def test_status_change_invalidates(self):
+        self.backend.get_user(self.token)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.influencer.status = 'approved'
+            self.influencer.save()
+        self.assertEqual(self.backend.get_user(self.token).influencer_profile.status, 'approved')
+
+    def test_bulk_status_change_invalidates(self):
+        self.backend.get_user(self.token)
+        with self.captureOnCommitCallbacks(execute=True):
+            bulk_set_status(Influencer.objects.all(), 'rejected')
+        self.assertEqual(self.backend.get_user(self.token).influencer_profile.status, 'rejected')
+
+    def stale_profile(self, **changes):
+        """Cache the user, then change the row behind the cache's back."""
+        self.backend.get_user(self.token)
+        Influencer.objects.filter(pk=self.influencer.pk).update(**changes)
+        return {'HTTP_AUTHORIZATION': f'Bearer {self.token}'}
+
+    def test_bank_details_do_not_write_back_a_stale_profile(self):
+        auth = self.stale_profile(status='approved')
+        response = self.client.post(
+            reverse('influencer-bank'), {'bank_name': 'Bank', 'iban': 'SA0380000000608010167519'},
+            content_type='application/json', **auth)
+        self.assertEqual(response.status_code, 200, response.content)
+        self.influencer.refresh_from_db()
+        self.assertEqual((self.influencer.status, self.influencer.bank_name), ('approved', 'Bank'))
+
+    def test_profile_picture_replaces_the_current_picture_not_the_cached_one(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        with override_settings(MEDIA_ROOT=media_root, IMAGE_VARIANTS_MODE='off'):
+            current, _ = media_store.put(SimpleUploadedFile('old.png', b'old picture'), 'influencer_profiles')
+            auth = self.stale_profile(status='approved', profile_picture=current.path)
+            buffer = io.BytesIO()
+            Image.new('RGB', (8, 8)).save(buffer, 'PNG')
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post(reverse('upload-profile-picture'), {
+                    'profile_picture': SimpleUploadedFile('new.png', buffer.getvalue(), content_type='image/png'),
+                }, **auth)
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertFalse(MediaBlob.objects.filter(path=current.path).exists())
+        self.influencer.refresh_from_db()
+        self.assertEqual(self.influencer.status, 'approved')
+        self.assertNotEqual(self.influencer.profile_picture.name, current.path)
+
+    def test_deactivated_user_is_rejected(self):
+        self.backend.get_user(self.token)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_active = False
+            self.user.save()
+        with self.assertRaises(AuthenticationFailed):
+            self.backend.get_user(self.token)
+
+
+class AsyncLoginTests(TestCase):
+    def setUp(self):
+        hashing.get_pool.cache_clear()
+        self.addCleanup(hashing.get_pool.cache_clear)
+        User.objects.create_user(
+            phone_number='0500000003', username='client3', email='client3@example.com',
+            password='pass12345', role='client',
+        )
+        self.credentials = {'phone_number': '0500000003', 'password': 'pass12345', 'role': 'client'}
+
+    async def test_login(self):
+        response = await self.async_client.post('/api/login/async/', self.credentials, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('access_token', response.json())
+
+        response = await self.async_client.post(
+            '/api/login/async/', {**self.credentials, 'password': 'wrong'}, content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 400)
+
+    @override_settings(PASSWORD_HASHING_WORKERS=1, PASSWORD_HASHING_QUEUE_DEPTH=0, PASSWORD_HASHING_RETRY_AFTER=3)
+    async def test_saturated_pool_rejects_fast(self):
+        pool = hashing.get_pool()
+        self.assertTrue(pool.slots.acquire(blocking=False))
+        self.addCleanup(pool.slots.release)
+        response = await self.async_client.post('/api/login/async/', self.credentials, content_type='application/json')
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '3')
+
+
+class TokenRefreshTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        revocation.reset_filter()
+        self.addCleanup(revocation.reset_filter)
+        self.user = User.objects.create_user(
+            phone_number='0500000006', username='client6', email='client6@example.com', password='pass12345',
+        )
+
+    def refresh(self, token):
+        return self.client.post(reverse('token-refresh'), {'refresh_token': str(token)}, content_type='application/json')
+
+    def test_rotation_revokes_the_old_token(self):
+        token = RefreshToken.for_user(self.user)
+        response = self.refresh(token)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(RevokedToken.objects.filter(jti=token['jti']).exists())
+
+        # the rotated token works once, the old one never again
+        self.assertEqual(self.refresh(response.json()['refresh_token']).status_code, 200)
+        self.assertEqual(self.refresh(token).status_code, 401)
+
+    def test_filter_miss_skips_the_lookup_and_reuse_is_caught_by_the_insert(self):
+        first, second = RefreshToken.for_user(self.user), RefreshToken.for_user(self.user)
+        revocation.get_filter()
+        # filter miss: no SELECT on the revocation table, just the claiming INSERT
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.refresh(first).status_code, 200)
+        self.assertFalse([q for q in queries if 'SELECT' in q['sql'] and 'revokedtoken' in q['sql']])
+
+        # revoked by another process: not in this filter, rejected by the unique constraint
+        RevokedToken.objects.create(jti=second['jti'], expires_at=timezone.now() + timedelta(days=1))
+        self.assertEqual(self.refresh(second).status_code, 401)
+
+    @override_settings(SIMPLE_JWT={**settings.SIMPLE_JWT, 'BLACKLIST_AFTER_ROTATION': False})
+    def test_without_a_claiming_insert_a_filter_miss_is_looked_up(self):
+        token = RefreshToken.for_user(self.user)
+        revocation.get_filter()
+        # revoked by another process after this one loaded its filter
+        RevokedToken.objects.create(jti=token['jti'], expires_at=timezone.now() + timedelta(days=1))
+        self.assertEqual(self.refresh(token).status_code, 401)
+
+    def test_prune_removes_only_expired_rows(self):
+        now = timezone.now()
+        RevokedToken.objects.bulk_create([
+            RevokedToken(jti=f'old{i}', expires_at=now - timedelta(minutes=1)) for i in range(5)
+        ] + [RevokedToken(jti='live', expires_at=now + timedelta(days=1))])
+        self.assertEqual(revocation.prune_expired(batch_size=2), 5)
+        self.assertEqual(list(RevokedToken.objects.values_list('jti', flat=True)), ['live'])
+        self.assertTrue(revocation.is_revoked('live'))
+        self.assertFalse(revocation.is_revoked('old0'))
+
+
+class IbanTests(TestCase):
+    VALID = [
+        'SA0380000000608010167519', 'AE070331234567890123456', 'GB82WEST12345698765432',
+        'FR1420041010050500013M02606', 'KW81CBKU0000000000001234560101', 'BR1800360305000010009795493C1',
+    ]
+
+    def test_valid_ibans(self):
+        self.assertEqual(iban.validate_many(self.VALID), self.VALID)
+
+    def test_normalizes_grouped_input(self):
+        self.assertEqual(iban.clean(' sa03 8000 0000 6080 1016 7519 '), 'SA0380000000608010167519')
+
+    def test_rejects_bad_checksum_length_structure_and_country(self):
+        self.assertEqual(iban.validate_many([
+            'SA0380000000608010167518',  # checksum
+            'SA038000000060801016751',  # length
+            'GB94BARC2020153456789',  # length for GB
+            'GB961234WEST9876543212',  # valid checksum, but GB starts with a 4-letter bank code
+            'XX0380000000608010167519',  # country
+        ]), [None] * 5)
+
+
+class RegistrationTests(TestCase):
+    def register(self, **data):
+        body = {'role': 'influencer', 'username': 'new1', 'email': 'new1@example.com',
+                'phone_number': '0520000001', 'password': 'pass12345', **data}
+        return self.client.post(reverse('register'), body, content_type='application/json')
+
+    def test_only_allowlisted_fields_are_saved(self):
+        response = self.register(is_staff=True, is_superuser=True, status='approved', full_name='New')
+        self.assertEqual(response.status_code, 201)
+        user = User.objects.get(phone_number='0520000001')
+        self.assertFalse(user.is_staff or user.is_superuser)
+        self.assertEqual((user.influencer_profile.full_name, user.influencer_profile.status), ('New', 'pending'))
+
+    def test_duplicate_is_rejected_by_the_unique_constraint(self):
+        self.assertEqual(self.register().status_code, 201)
+        response = self.register(username='other', email='other@example.com')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('phone_number', response.json())
+        self.assertEqual(User.objects.count(), 1)
+        self.assertEqual(Influencer.objects.count(), 1)
+
+    def test_invalid_profile_field_creates_nothing(self):
+        response = self.register(category='Bogus')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('category', response.json())
+        self.assertFalse(User.objects.exists())
+
+    def test_registered_picture_survives_another_owner_of_the_same_bytes(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        buffer = io.BytesIO()
+        Image.new('RGB', (8, 8)).save(buffer, 'PNG')
+        picture = buffer.getvalue()
+        other = Influencer.objects.create(user=User.objects.create_user(
+            phone_number='0520000002', username='other', email='other@example.com',
+            password='pass12345', role='influencer',
+        ))
+        auth = {'HTTP_AUTHORIZATION': f'Bearer {AccessToken.for_user(other.user)}'}
+
+        with override_settings(MEDIA_ROOT=media_root, IMAGE_VARIANTS_MODE='off'):
+            uploaded = self.client.post(reverse('upload-profile-picture'), {
+                'profile_picture': SimpleUploadedFile('a.png', picture, content_type='image/png'),
+            }).json()['profile_picture_url']
+            self.assertEqual(self.register(profile_picture=uploaded).status_code, 201)
+            # another influencer uploads the same bytes, then replaces them
+            for data in (picture, picture + b'\0'):
+                with self.captureOnCommitCallbacks(execute=True):
+                    response = self.client.post(reverse('upload-profile-picture'), {
+                        'profile_picture': SimpleUploadedFile('b.png', data, content_type='image/png'),
+                    }, **auth)
+                self.assertEqual(response.status_code, 201, response.content)
+
+            path = Influencer.objects.get(user__phone_number='0520000001').profile_picture.name
+            self.assertEqual(MediaBlob.objects.get(path=path).ref_count, 1)
+            self.assertTrue(media_store.content_storage.exists(path))
+
+
+class VideoProbeTests(TestCase):
+    def validate(self, name, data):
+        return validate_video_file(SimpleUploadedFile(name, data, content_type=None))
+
+    def test_reads_headers_of_each_container(self):
+        self.assertEqual(self.validate('my.clip.mp4', mp4_bytes(width=1920, height=1080)).codec, 'avc1')
+        self.assertEqual(self.validate('clip.mov', mp4_bytes(brand=b'qt  ', moov_last=True)).container, 'mov')
+        info = self.validate('clip.webm', webm_bytes(duration=30, width=640, height=360))
+        self.assertEqual((info.container, info.duration, info.width, info.height, info.codec),
+                         ('webm', 30.0, 640, 360, 'V_VP9'))
+
+    def test_rejects_bad_magic_corruption_mismatch_and_limits(self):
+        for name, data in [
+            ('clip.mp4', b'\0' * 64),
+            ('clip.mp4', mp4_bytes()[:-16]),
+            ('clip.mp4', webm_bytes()),
+            ('clip.webm', webm_bytes(duration=float('nan'))),
+            ('clip.webm', webm_bytes(duration=float('inf'))),
+            ('clip.mp4', mp4_bytes(duration=MAX_VIDEO_DURATION + 1)),
+            ('clip.mp4', mp4_bytes(duration=1, media=b'\0' * 4_000_000)),
+            ('clip.mp4.exe', mp4_bytes()),
+        ]:
+            with self.subTest(name=name, size=len(data)), self.assertRaises(ValidationError):
+                self.validate(name, data)
+
+    def test_media_data_is_skipped(self):
+        data = io.BytesIO(mp4_bytes(media=b'\0' * 1_000_000, moov_last=True))
+        reads = []
+        read = data.read
+        data.read = lambda size=-1: reads.append(size) or read(size)
+        video_probe.probe(data)
+        self.assertLess(sum(reads), 1024)
+
+
+class MediaStoreTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        overrides = override_settings(MEDIA_ROOT=self.media_root)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+    def put(self, **kwargs):
+        return media_store.put(SimpleUploadedFile('clip.mp4', b'same bytes', content_type='video/mp4'),
+                               'influencer_bio_videos', **kwargs)
+
+    def test_only_owners_hold_references(self):
+        blob, created = self.put(reference=False)
+        self.assertTrue(created)
+        self.assertEqual(blob.ref_count, 0)
+        self.put()
+        blob, created = self.put()
+        self.assertFalse(created)
+        self.assertEqual(blob.ref_count, 2)
+        self.put(reference=False)
+        self.assertEqual(MediaBlob.objects.get().ref_count, 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            media_store.release(blob.path)
+            media_store.release(blob.path)
+        self.assertFalse(MediaBlob.objects.exists())
+        self.assertFalse(media_store.content_storage.exists(blob.path))
+
+    def test_put_right_after_the_last_release_keeps_its_file(self):
+        blob, _ = self.put()
+        with self.captureOnCommitCallbacks(execute=True):
+            media_store.release(blob.path)
+            # the same bytes arrive again before the releasing request has finished
+            again, created = self.put()
+        self.assertTrue(created)
+        self.assertTrue(media_store.content_storage.exists(again.path))
+
+    def test_put_many_shares_a_row_inserted_concurrently(self):
+        blob, _ = self.put()
+        lookups = []
+
+        def in_bulk(*args, in_bulk=MediaBlob.objects.in_bulk, **kwargs):
+            lookups.append(args)
+            # the concurrent upload commits its row after this batch looked for stored blobs
+            return {} if len(lookups) == 1 else in_bulk(*args, **kwargs)
+
+        with mock.patch.object(MediaBlob.objects, 'in_bulk', side_effect=in_bulk):
+            with self.captureOnCommitCallbacks(execute=True):
+                [(shared, created)] = media_store.put_many(
+                    [SimpleUploadedFile('clip.mp4', b'same bytes', content_type='video/mp4')], 'other_prefix')
+        self.assertEqual((shared.pk, created, shared.ref_count), (blob.pk, False, 2))
+        surplus = media_store.blob_key('other_prefix', blob.sha256, 'clip.mp4')
+        self.assertFalse(media_store.content_storage.exists(surplus))
+
+
+class BioVideoUploadTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        overrides = override_settings(MEDIA_ROOT=self.media_root)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+    def upload(self, *videos):
+        files = [SimpleUploadedFile(f'clip{i}.mp4', data, content_type='video/mp4') for i, data in enumerate(videos)]
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(reverse('upload-bio-videos'), {'bio_videos': files})
+
+    def stored_files(self):
+        return [name for _, _, names in os.walk(self.media_root) for name in names]
+
+    def test_batch_is_stored_with_duplicates_shared(self):
+        videos = [mp4_bytes(media=bytes([i]) * 100) for i in range(4)]
+        response = self.upload(*videos, videos[0])
+        self.assertEqual(response.status_code, 201)
+        uploaded = response.json()['uploaded']
+        self.assertEqual([entry['filename'] for entry in uploaded], [f'clip{i}.mp4' for i in range(5)])
+        self.assertEqual(uploaded[0]['path'], uploaded[4]['path'])
+        # nothing records these uploads, so none of them holds a reference
+        self.assertEqual(set(MediaBlob.objects.values_list('ref_count', flat=True)), {0})
+        self.assertEqual(len(self.stored_files()), 4)
+
+    def test_invalid_file_stores_nothing(self):
+        response = self.upload(mp4_bytes(), b'\0' * 64, mp4_bytes(duration=5))
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('clip1.mp4', response.json()['detail'])
+        self.assertFalse(MediaBlob.objects.exists())
+        self.assertEqual(self.stored_files(), [])
+
+    def test_storage_failure_removes_the_files_already_written(self):
+        save = media_store.content_storage.save
+
+        def flaky_save(name, content):
+            if content.name == 'clip1.mp4':
+                raise OSError("disk full")
+            return save(name, content)
+
+        with mock.patch.object(media_store.content_storage, 'save', side_effect=flaky_save), \
+                self.assertRaises(OSError):
+            self.upload(mp4_bytes(), mp4_bytes(duration=5), mp4_bytes(duration=6))
+        self.assertFalse(MediaBlob.objects.exists())
+        self.assertEqual(self.stored_files(), [])
+
+    def test_a_failure_that_is_not_the_file_is_not_reported_as_invalid(self):
+        with mock.patch('authentication.media_store.file_checksum', side_effect=OSError("read error")), \
+                self.assertRaises(OSError):
+            self.upload(mp4_bytes())
+
+    def test_referenced_batch_counts_duplicates_in_one_update(self):
+        videos = [mp4_bytes(media=bytes([i]) * 100) for i in range(3)]
+        files = [SimpleUploadedFile(f'clip{i}.mp4', data, content_type='video/mp4')
+                 for i, data in enumerate([*videos, videos[0], videos[0], videos[1]])]
+        with CaptureQueriesContext(connection) as queries:
+            media_store.put_many(files, 'influencer_bio_videos')
+        self.assertEqual(len([q for q in queries if q['sql'].startswith('UPDATE')]), 1)
+        self.assertEqual(sorted(MediaBlob.objects.values_list('ref_count', flat=True)), [1, 2, 3])
+
+
+class UploadAdmissionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        admission.reset_stats()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        overrides = override_settings(MEDIA_ROOT=media_root, UPLOAD_DISK_RESERVE=0)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+    def upload(self, **extra):
+        video = SimpleUploadedFile('clip.mp4', mp4_bytes(), content_type='video/mp4')
+        return self.client.post(reverse('upload-bio-videos'), {'bio_videos': video}, **extra)
+
+    def fill(self, key, count):
+        cache.set_many({slot: 'taken' for slot in admission.slot_keys(key, count)})
+
+    def test_admitted_upload_releases_its_slot(self):
+        self.assertEqual(self.upload().status_code, 201)
+        self.assertEqual(admission.stats(), {'in_flight': 0, 'counters': {'admitted': 1}})
+
+    def test_content_length_is_checked_before_the_body_is_read(self):
+        self.assertEqual(self.upload(CONTENT_LENGTH='').status_code, 411)
+        response = self.client.post(reverse('upload-profile-picture'), {}, CONTENT_LENGTH=str(50 * 1024 * 1024))
+        self.assertEqual(response.status_code, 413)
+        self.assertFalse(MediaBlob.objects.exists())
+
+    def test_saturation_is_answered_with_retry_after(self):
+        self.fill('uploads:in-flight:addr:127.0.0.1', 2)
+        response = self.upload()
+        self.assertEqual((response.status_code, response['Retry-After']), (429, '5'))
+
+        cache.clear()
+        self.fill(admission.GLOBAL_KEY, 8)
+        response = self.upload()
+        self.assertEqual((response.status_code, response['Retry-After']), (503, '5'))
+        # the per-user slot taken before the global check is handed back
+        self.assertEqual(admission.in_flight('uploads:in-flight:addr:127.0.0.1', 2), 0)
+
+        with override_settings(UPLOAD_DISK_RESERVE=2 ** 62):
+            self.assertEqual(self.upload().status_code, 503)
+        self.assertEqual(admission.stats()['counters'], {
+            'rejected_per_user': 1, 'rejected_saturated': 1, 'rejected_disk_full': 1,
+        })
+
+    def test_an_expired_slot_is_freed_without_disturbing_its_next_holder(self):
+        with mock.patch.object(admission, 'SLOT_TIMEOUT', 0.01):
+            request = RequestFactory().post('/', b'x', content_type='application/octet-stream')
+            request.user = AnonymousUser()
+            stale = admission.admit(request, 1024)
+            time.sleep(0.05)
+            self.assertEqual(admission.in_flight(admission.GLOBAL_KEY, 8), 0)
+            fresh = admission.admit(request, 1024)
+            stale.release()
+            self.assertEqual(admission.in_flight(admission.GLOBAL_KEY, 8), 1)
+            fresh.release()
+        self.assertEqual(admission.in_flight(admission.GLOBAL_KEY, 8), 0)
+
+    def test_stats_are_staff_only(self):
+        self.assertEqual(self.client.get(reverse('upload-stats')).status_code, 401)
+        staff = User.objects.create_user(
+            phone_number='0500000009', username='staff', email='staff@example.com', password='pass12345',
+            role='client', is_staff=True,
+        )
+        response = self.client.get(reverse('upload-stats'),
+                                   HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(staff)}')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['uploads']['in_flight'], 0)
+
+
+def put_direct(upload_url, body, content_type, chunk_size=64 * 1024):
+    """PUT `body` to a direct-upload URL through ReceiverApp; returns (status, json)."""
+    url = urlsplit(upload_url)
+    scope = {
+        'type': 'http', 'method': 'PUT', 'path': url.path, 'query_string': url.query.encode(),
+        'headers': [(b'content-type', content_type.encode()), (b'content-length', str(len(body)).encode())],
+    }
+    chunks = [body[i:i + chunk_size] for i in range(0, len(body), chunk_size)] or [b'']
+    messages = [{'type': 'http.request', 'body': chunk, 'more_body': i < len(chunks) - 1}
+                for i, chunk in enumerate(chunks)]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    async def not_found(scope, receive, send):
+        raise AssertionError(f"{scope['path']} was passed on to Django")
+
+    async_to_sync(direct_uploads.ReceiverApp(not_found))(scope, receive, send)
+    return sent[0]['status'], json.loads(sent[1]['body'])
+
+
+class DirectUploadTests(TestCase):
+    def setUp(self):
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root, ignore_errors=True)
+        self.upload_root = f'{root}/direct'
+        # variants render in this thread, while MEDIA_ROOT still exists
+        overrides = override_settings(MEDIA_ROOT=f'{root}/media', DIRECT_UPLOAD_ROOT=self.upload_root,
+                                      IMAGE_VARIANTS_MODE='sync')
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+        self.influencer = Influencer.objects.create(
+            user=User.objects.create_user(
+                phone_number='0500000007', username='influencer7', email='influencer7@example.com',
+                password='pass12345', role='influencer',
+            ),
+            full_name='Direct Uploader',
+        )
+        self.auth = {'HTTP_AUTHORIZATION': f'Bearer {AccessToken.for_user(self.influencer.user)}'}
+
+    def ticket(self, data, kind='bio_video', filename='clip.mp4', content_type='video/mp4', size=None):
+        response = self.client.post(reverse('direct-upload-ticket'), {
+            'kind': kind, 'filename': filename, 'content_type': content_type,
+            'size': len(data) if size is None else size,
+        }, content_type='application/json', **self.auth)
+        self.assertEqual(response.status_code, 201, response.content)
+        return response.json()
+
+    def complete(self, ticket):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(reverse('direct-upload-complete'), {'ticket': ticket['ticket']},
+                                    content_type='application/json', **self.auth)
+
+    def test_video_is_attached_after_a_direct_upload(self):
+        video = mp4_bytes(media=b'\1' * 200_000)
+        ticket = self.ticket(video)
+        self.assertEqual(ticket['method'], 'PUT')
+        self.assertEqual(put_direct(ticket['upload_url'], video, 'video/mp4'), (201, {'key': ticket['key'], 'size': len(video)}))
+        # a ticket is good for one upload
+        self.assertEqual(put_direct(ticket['upload_url'], video, 'video/mp4')[0], 409)
+
+        response = self.complete(ticket)
+        self.assertEqual(response.status_code, 201, response.content)
+        self.influencer.refresh_from_db()
+        self.assertEqual(len(self.influencer.bio_videos), 1)
+        self.assertEqual(MediaBlob.objects.get().size, len(video))
+        # only the records of the ticket's two uses are left
+        name = ticket['key'].split('/')[1]
+        self.assertEqual(sorted(os.listdir(os.path.join(self.upload_root, str(self.influencer.user.pk)))),
+                         [f'{name}.completed', f'{name}.uploaded'])
+
+        # and they keep the ticket from being used again
+        self.assertEqual(put_direct(ticket['upload_url'], video, 'video/mp4')[0], 409)
+        self.assertEqual(self.complete(ticket).json(), {'ticket': ["This ticket has already been used."]})
+
+    def test_profile_picture_is_attached_after_a_direct_upload(self):
+        buffer = io.BytesIO()
+        Image.new('RGB', (8, 8)).save(buffer, 'PNG')
+        ticket = self.ticket(buffer.getvalue(), kind='profile_picture', filename='me.png', content_type='image/png')
+        self.assertEqual(put_direct(ticket['upload_url'], buffer.getvalue(), 'image/png')[0], 201)
+        self.assertEqual(self.complete(ticket).status_code, 201)
+        self.influencer.refresh_from_db()
+        self.assertTrue(self.influencer.profile_picture.name.startswith('influencer_profiles/'))
+        self.assertEqual(set(self.influencer.profile_picture_variant_urls), {'full', 'card', 'thumbnail'})
+
+    def test_ticket_request_is_validated(self):
+        response = self.client.post(reverse('direct-upload-ticket'), {
+            'kind': 'bio_video', 'filename': 'clip.exe', 'content_type': 'video/mp4', 'size': 10,
+        }, content_type='application/json', **self.auth)
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post(reverse('direct-upload-ticket'), {
+            'kind': 'bio_video', 'filename': 'clip.mp4', 'content_type': 'video/mp4', 'size': 10,
+        }, content_type='application/json')
+        self.assertEqual(response.status_code, 403)
+
+    def test_receiver_enforces_the_ticket(self):
+        video = mp4_bytes()
+        ticket = self.ticket(video, size=len(video) - 1)
+        self.assertEqual(put_direct(ticket['upload_url'], video, 'video/mp4')[0], 413)
+        self.assertEqual(put_direct(ticket['upload_url'], video[:10], 'video/webm')[0], 415)
+        self.assertEqual(put_direct('/direct-upload/?ticket=forged', video, 'video/mp4')[0], 403)
+        with override_settings(DIRECT_UPLOAD_TICKET_TTL=-1):
+            self.assertEqual(put_direct(ticket['upload_url'], video[:10], 'video/mp4'),
+                             (403, {'detail': 'Upload ticket has expired.'}))
+        # nothing arrived, so there is nothing to complete
+        self.assertEqual(self.complete(ticket).status_code, 404)
+
+    def test_invalid_upload_is_rejected_and_discarded(self):
+        ticket = self.ticket(b'\0' * 64)
+        self.assertEqual(put_direct(ticket['upload_url'], b'\0' * 64, 'video/mp4')[0], 201)
+        response = self.complete(ticket)
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(MediaBlob.objects.exists())
+        self.assertEqual(self.complete(ticket).status_code, 400)
+
+    def test_ticket_is_bound_to_its_user(self):
+        video = mp4_bytes()
+        ticket = self.ticket(video)
+        put_direct(ticket['upload_url'], video, 'video/mp4')
+        other = Influencer.objects.create(
+            user=User.objects.create_user(
+                phone_number='0500000008', username='influencer8', email='influencer8@example.com',
+                password='pass12345', role='influencer',
+            ),
+            full_name='Someone Else',
+        )
+        response = self.client.post(reverse('direct-upload-complete'), {'ticket': ticket['ticket']},
+                                    content_type='application/json',
+                                    HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(other.user)}')
+        self.assertEqual(response.status_code, 403)
+
+    def test_video_limit_is_checked_on_the_current_row(self):
+        video = mp4_bytes()
+        ticket = self.ticket(video)
+        put_direct(ticket['upload_url'], video, 'video/mp4')
+        # filled up since the auth cache took its copy of the profile
+        Influencer.objects.filter(pk=self.influencer.pk).update(bio_videos=[f'/media/{i}.mp4' for i in range(5)])
+        response = self.complete(ticket)
+        self.assertEqual(response.status_code, 400, response.content)
+        self.assertFalse(MediaBlob.objects.exists())
+        self.influencer.refresh_from_db()
+        self.assertEqual(len(self.influencer.bio_videos), 5)
+
+    def test_purge_removes_what_expired_tickets_left_behind(self):
+        video = mp4_bytes()
+        ticket = self.ticket(video)
+        put_direct(ticket['upload_url'], video, 'video/mp4')
+        user_dir = os.path.join(self.upload_root, str(self.influencer.user.pk))
+        abandoned = os.path.join(user_dir, 'abandoned.mp4.part')
+        with open(abandoned, 'wb') as out:
+            out.write(b'partial')
+        self.assertEqual(direct_uploads.get_backend().purge_expired(), 0)
+
+        # an hour later: never completed, never finished
+        past = time.time() - 3600
+        for name in os.listdir(user_dir):
+            os.utime(os.path.join(user_dir, name), (past, past))
+        out = io.StringIO()
+        call_command('purge_direct_uploads', stdout=out)
+        self.assertIn('Purged 3', out.getvalue())
+        self.assertEqual(os.listdir(user_dir), [])
+
+
+class UploadSessionTests(TestCase):
+    def setUp(self):
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root, ignore_errors=True)
+        overrides = override_settings(MEDIA_ROOT=f'{root}/media', UPLOAD_SESSIONS_ROOT=f'{root}/sessions')
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+    def open_session(self, video, **extra):
+        return self.client.post(reverse('bio-video-upload-sessions'), {
+            'filename': 'clip.mp4', 'total_size': len(video), 'content_type': 'video/mp4', **extra,
+        }, content_type='application/json')
+
+    def test_only_one_completion_stores_the_video(self):
+        video = mp4_bytes(media=b'\3' * 64)
+        upload_id = self.open_session(video).json()['upload_id']
+        self.client.put(reverse('bio-video-upload-chunk', args=[upload_id, 0]), video,
+                        content_type='application/octet-stream')
+        session = UploadSession.objects.get(pk=upload_id)
+        # a concurrent completion got there first
+        with mock.patch.object(upload_sessions, 'claim_session', return_value=False):
+            response = self.client.post(reverse('bio-video-upload-complete', args=[upload_id]))
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(MediaBlob.objects.exists())
+
+        response = self.client.post(reverse('bio-video-upload-complete', args=[upload_id]))
+        self.assertEqual(response.status_code, 201)
+        self.assertFalse(os.path.exists(upload_sessions.session_dir(session)))
+        self.assertEqual(self.client.post(reverse('bio-video-upload-complete', args=[upload_id])).status_code, 404)
+
+    def test_chunk_size_is_capped(self):
+        response = self.open_session(mp4_bytes(), chunk_size=MAX_VIDEO_SIZE + 1)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('chunk_size', response.json())
+
+
+class InfluencerDiscoveryTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.ids = {}
+        for number, price in enumerate(['100.00', None, '50.00', None], start=10):
+            user = User.objects.create_user(
+                phone_number=f'05000000{number}', username=f'influencer{number}',
+                email=f'influencer{number}@example.com', password='pass12345', role='influencer',
+            )
+            self.ids[number] = Influencer.objects.create(user=user, status='approved', daily_price=price).pk
+
+    def walk(self, ordering):
+        seen, params = [], {'ordering': ordering, 'page_size': 1}
+        while True:
+            response = self.client.get(reverse('influencer-list'), params)
+            self.assertEqual(response.status_code, 200, response.content)
+            seen += [row['id'] for row in response.json()['results']]
+            if not response.json()['next_cursor']:
+                return seen
+            params['cursor'] = response.json()['next_cursor']
+
+    def test_influencers_without_a_price_are_listed_last(self):
+        ids = self.ids
+        self.assertEqual(self.walk('daily_price'), [ids[12], ids[10], ids[11], ids[13]])
+        self.assertEqual(self.walk('-daily_price'), [ids[10], ids[12], ids[13], ids[11]])
+
+    def test_only_changes_to_listed_fields_drop_cached_pages(self):
+        url = reverse('influencer-list')
+        self.assertEqual(self.client.get(url)['X-Cache'], 'MISS')
+        influencer = Influencer.objects.get(pk=self.ids[10])
+        with self.captureOnCommitCallbacks(execute=True):
+            influencer.bank_name = 'Bank'
+            influencer.save()
+        self.assertEqual(self.client.get(url)['X-Cache'], 'HIT')
+        with self.captureOnCommitCallbacks(execute=True):
+            influencer.daily_price = '80.00'
+            influencer.save()
+        self.assertEqual(self.client.get(url)['X-Cache'], 'MISS')
+
+    def test_recorded_variants_drop_cached_pages(self):
+        influencer = Influencer.objects.get(pk=self.ids[10])
+        with self.captureOnCommitCallbacks(execute=True):
+            influencer.profile_picture = 'influencer_profiles/ab/abc.png'
+            influencer.save()
+        detail, listing = reverse('influencer-detail', args=[influencer.pk]), reverse('influencer-list')
+        self.assertEqual(self.client.get(detail).json()['profile_picture_variants'], {})
+        self.client.get(listing)
+
+        rendered = {'thumbnail': {'width': 150, 'height': 150, 'webp': 'v/thumbnail.webp', 'jpeg': 'v/thumbnail.jpeg'}}
+        with self.captureOnCommitCallbacks(execute=True):
+            image_variants.record_variants(influencer.pk, influencer.profile_picture.name, rendered)
+        self.assertIn('thumbnail', self.client.get(detail).json()['profile_picture_variants'])
+        rows = {row['id']: row for row in self.client.get(listing).json()['results']}
+        self.assertIn('thumbnail', rows[influencer.pk]['profile_picture_variants'])
+
+
+class InfluencerSearchTests(TestCase):
+    def create(self, number, status, full_name, biography=''):
+        user = User.objects.create_user(
+            phone_number=f'05000000{number}', username=f'influencer{number}',
+            email=f'influencer{number}@example.com', password='pass12345', role='influencer',
+        )
+        return Influencer.objects.create(user=user, status=status, full_name=full_name, biography=biography).pk
+
+    def test_best_approved_matches_come_first(self):
+        by_name = self.create(20, 'approved', 'Travel Sara')
+        by_biography = self.create(21, 'approved', 'Omar', 'food and travel')
+        for number in range(22, 25):
+            self.create(number, 'pending', 'Travel Lina')
+        self.assertEqual(search.get_backend().search('travel', limit=2), [by_name, by_biography])
+
+
+class OnboardingImportTests(TestCase):
+    def test_import_reports_bad_rows_and_catches_duplicates_across_batches(self):
+        User.objects.create_user(phone_number='0500000005', username='existing', email='Existing@example.com',
+                                 password='pass12345')
+        data = (
+            'phone_number,email,full_name,category,iban\n'
+            '0510000001,one@example.com,One,Travel,SA0380000000608010167519\n'
+            '0510000002,existing@example.com,Two,Travel,\n'
+            '0510000001,three@example.com,Three,Travel,\n'
+            '0510000004,four@example.com,Four,Bogus,SA00\n'
+            '0510000005,five@example.com,Five,,\n'
+        )
+        report = io.StringIO()
+        result = import_influencers(io.BytesIO(data.encode()), 'csv', report=report, batch_size=2)
+
+        self.assertEqual((result.rows, result.created), (5, 2))
+        self.assertEqual(
+            sorted(Influencer.objects.values_list('user__phone_number', flat=True)), ['0510000001', '0510000005'])
+        self.assertEqual(Influencer.objects.get(full_name='One').iban, 'SA0380000000608010167519')
+        self.assertFalse(User.objects.get(phone_number='0510000001').has_usable_password())
+        lines = report.getvalue().splitlines()
+        self.assertEqual(lines[0], 'line,field,error')
+        self.assertEqual([line.split(',')[:2] for line in lines[1:]], [
+            ['3', 'email'], ['4', 'phone_number'], ['5', 'category'], ['5', 'iban'],
+        ])
+
+    def test_imported_password_hashes_are_stored_as_they_are(self):
+        hashed = make_password('pass12345')
+        data = (
+            'phone_number,email,password_hash\n'
+            f'0510000001,one@example.com,{hashed}\n'
+            '0510000002,two@example.com,pass12345\n'
+            '0510000003,three@example.com,\n'
+        )
+        report = io.StringIO()
+        result = import_influencers(io.BytesIO(data.encode()), 'csv', report=report)
+
+        self.assertEqual((result.rows, result.created), (3, 2))
+        self.assertEqual(report.getvalue().splitlines()[1].split(',')[:2], ['3', 'password_hash'])
+        self.assertEqual(User.objects.get(phone_number='0510000001').password, hashed)
+        self.assertTrue(self.client.login(phone_number='0510000001', password='pass12345'))
+        self.assertFalse(User.objects.get(phone_number='0510000003').has_usable_password())
+
+
+class QueryBudgetTests(QueryBudgetTestMixin, TestCase):
+    """Every route in authentication/urls.py, exercised once and held to settings.QUERY_BUDGETS."""
+
+    def setUp(self):
+        cache.clear()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        overrides = override_settings(MEDIA_ROOT=media_root, UPLOAD_SESSIONS_ROOT=f'{media_root}/sessions',
+                                      DIRECT_UPLOAD_ROOT=f'{media_root}/direct')
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+        # each picture upload replaces the current one and deletes its blob, the costliest case
+        picture, _ = media_store.put(SimpleUploadedFile('old.png', b'old picture'), 'influencer_profiles')
+        self.influencer = Influencer.objects.create(
+            user=User.objects.create_user(
+                phone_number='0500000004', username='influencer4', email='influencer4@example.com',
+                password='pass12345', role='influencer',
+            ),
+            full_name='Sara Travel', biography='travel vlogs', status='approved', profile_picture=picture.path,
+        )
+        self.auth = {'HTTP_AUTHORIZATION': f'Bearer {AccessToken.for_user(self.influencer.user)}'}
+        # the revocation filter loads once per process, not per request
+        revocation.reset_filter()
+        revocation.get_filter()
+        self.addCleanup(revocation.reset_filter)
+
+    def image(self, size=8):
+        buffer = io.BytesIO()
+        Image.new('RGB', (size, size)).save(buffer, 'PNG')
+        return SimpleUploadedFile('avatar.png', buffer.getvalue(), content_type='image/png')
+
+    def registration(self, suffix):
+        return {
+            'role': 'client', 'username': f'client{suffix}', 'email': f'client{suffix}@example.com',
+            'phone_number': f'05100000{suffix}', 'password': 'pass12345',
+        }
+
+    def exercise(self):
+        """Yields one representative response per URL name."""
+        yield 'register', self.client.post(reverse('register'), self.registration('01'), content_type='application/json')
+        yield 'register-async', self.client.post(
+            reverse('register-async'), self.registration('02'), content_type='application/json')
+        login = {'phone_number': '0500000004', 'password': 'pass12345', 'role': 'influencer'}
+        yield 'login', self.client.post(reverse('login'), login, content_type='application/json')
+        response = self.client.post(reverse('login-async'), login, content_type='application/json')
+        yield 'login-async', response
+        yield 'token-refresh', self.client.post(
+            reverse('token-refresh'), {'refresh_token': response.json()['refresh_token']},
+            content_type='application/json')
+        yield 'upload-profile-picture', self.client.post(
+            reverse('upload-profile-picture'), {'profile_picture': self.image()})
+        yield 'upload-profile-picture', self.client.post(
+            reverse('upload-profile-picture'), {'profile_picture': self.image(9)}, **self.auth)
+        yield 'influencer-bank', self.client.post(
+            reverse('influencer-bank'), {'bank_name': 'Bank', 'iban': 'SA0380000000608010167519'},
+            content_type='application/json', **self.auth)
+        yield 'upload-bio-videos', self.client.post(reverse('upload-bio-videos'), {
+            'bio_videos': SimpleUploadedFile('clip.mp4', mp4_bytes(), content_type='video/mp4'),
+        })
+
+        video = mp4_bytes(media=b'\0' * 64)
+        response = self.client.post(reverse('bio-video-upload-sessions'), {
+            'filename': 'long.mp4', 'total_size': len(video), 'content_type': 'video/mp4',
+        }, content_type='application/json')
+        yield 'bio-video-upload-sessions', response
+        upload_id = response.json()['upload_id']
+        yield 'bio-video-upload-chunk', self.client.put(
+            reverse('bio-video-upload-chunk', args=[upload_id, 0]), video,
+            content_type='application/octet-stream')
+        yield 'bio-video-upload-session', self.client.get(reverse('bio-video-upload-session', args=[upload_id]))
+        yield 'bio-video-upload-complete', self.client.post(reverse('bio-video-upload-complete', args=[upload_id]))
+
+        video = mp4_bytes(media=b'\2' * 64)
+        response = self.client.post(reverse('direct-upload-ticket'), {
+            'kind': 'bio_video', 'filename': 'direct.mp4', 'content_type': 'video/mp4', 'size': len(video),
+        }, content_type='application/json', **self.auth)
+        yield 'direct-upload-ticket', response
+        ticket = response.json()
+        put_direct(ticket['upload_url'], video, 'video/mp4')
+        yield 'direct-upload-complete', self.client.post(
+            reverse('direct-upload-complete'), {'ticket': ticket['ticket']}, content_type='application/json', **self.auth)
+
+        picture = self.image(10).read()
+        response = self.client.post(reverse('direct-upload-ticket'), {
+            'kind': 'profile_picture', 'filename': 'direct.png', 'content_type': 'image/png', 'size': len(picture),
+        }, content_type='application/json', **self.auth)
+        yield 'direct-upload-ticket', response
+        ticket = response.json()
+        put_direct(ticket['upload_url'], picture, 'image/png')
+        yield 'direct-upload-complete', self.client.post(
+            reverse('direct-upload-complete'), {'ticket': ticket['ticket']}, content_type='application/json', **self.auth)
+
+        yield 'influencer-list', self.client.get(reverse('influencer-list'))
+        yield 'influencer-search', self.client.get(reverse('influencer-search'), {'q': 'travel'})
+        yield 'influencer-detail', self.client.get(reverse('influencer-detail', args=[self.influencer.pk]))
+
+    def test_every_route_is_within_budget(self):
+        exercised = []
+        for name, response in self.exercise():
+            with self.subTest(route=name):
+                self.assertLess(response.status_code, 400, getattr(response, 'data', response.content))
+                usage = self.assertWithinQueryBudget(response)
+                self.assertEqual(usage.view_name, name)
+            exercised.append(name)
+        self.assertRoutesCovered(urlpatterns, exercised)
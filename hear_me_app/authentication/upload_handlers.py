@@ -0,0 +1,36 @@
+import hashlib
+
+from django.core.files.uploadhandler import MemoryFileUploadHandler, TemporaryFileUploadHandler
+
+
+class ChecksumMixin:
+    """
+    Hash every chunk the handler keeps while the request body is parsed, so the
+    resulting uploaded file carries its sha256 without ever being read again.
+    """
+
+    def new_file(self, *args, **kwargs):
+        # reset before super(): the memory handler raises StopFutureHandlers
+        self._sha256 = hashlib.sha256()
+        super().new_file(*args, **kwargs)
+
+    def receive_data_chunk(self, raw_data, start):
+        remaining = super().receive_data_chunk(raw_data, start)
+        # handlers return the chunk when they pass it on instead of keeping it
+        if remaining is None:
+            self._sha256.update(raw_data)
+        return remaining
+
+    def file_complete(self, file_size):
+        uploaded = super().file_complete(file_size)
+        if uploaded is not None:
+            uploaded.sha256 = self._sha256.hexdigest()
+        return uploaded
+
+
+class ChecksumMemoryFileUploadHandler(ChecksumMixin, MemoryFileUploadHandler):
+    pass
+
+
+class ChecksumTemporaryFileUploadHandler(ChecksumMixin, TemporaryFileUploadHandler):
+    pass
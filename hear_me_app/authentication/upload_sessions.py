@@ -0,0 +1,207 @@
+"""
+Resumable bio-video uploads.
+
+Each session owns a directory under UPLOAD_SESSIONS_ROOT holding one file per
+received chunk. Chunks are written to a temp name and renamed into place, so
+the directory listing is the single source of truth for what has arrived and
+concurrent PUTs never race on a database row.
+"""
+import hashlib
+import os
+import shutil
+import time
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.base import File
+from django.utils import timezone
+
+from .file_validators import validate_video_metadata
+from .models import UploadSession
+
+DEFAULT_CHUNK_SIZE = 5 * 1024 * 1024
+MIN_CHUNK_SIZE = 256 * 1024
+DEFAULT_SESSION_TTL = timedelta(hours=24)
+PURGE_INTERVAL_SECONDS = 15 * 60
+COPY_BUFFER_SIZE = 1024 * 1024
+
+_last_purge = 0.0
+
+
+class ChunkError(Exception):
+    pass
+
+
+def sessions_root():
+    return getattr(settings, 'UPLOAD_SESSIONS_ROOT', os.path.join(settings.BASE_DIR, 'upload_sessions'))
+
+
+def session_dir(session):
+    return os.path.join(sessions_root(), session.id.hex)
+
+
+def _chunk_path(session, index):
+    return os.path.join(session_dir(session), f'{index:06d}.part')
+
+
+def create_session(user, filename, total_size, content_type='', chunk_size=None):
+    validate_video_metadata(filename, total_size, content_type)
+    chunk_size = chunk_size or getattr(settings, 'UPLOAD_CHUNK_SIZE', DEFAULT_CHUNK_SIZE)
+    chunk_size = max(int(chunk_size), MIN_CHUNK_SIZE)
+    ttl = getattr(settings, 'UPLOAD_SESSION_TTL', DEFAULT_SESSION_TTL)
+
+    purge_expired_sessions(throttle=True)
+    session = UploadSession.objects.create(
+        user=user if user and user.is_authenticated else None,
+        filename=filename,
+        content_type=content_type or '',
+        total_size=total_size,
+        chunk_size=chunk_size,
+        expires_at=timezone.now() + ttl,
+    )
+    os.makedirs(session_dir(session), exist_ok=True)
+    return session
+
+
+def received_chunks(session):
+    try:
+        names = os.listdir(session_dir(session))
+    except FileNotFoundError:
+        return []
+    return sorted(int(name[:-5]) for name in names if name.endswith('.part'))
+
+
+def missing_chunks(session):
+    received = set(received_chunks(session))
+    return [i for i in range(session.total_chunks) if i not in received]
+
+
+def write_chunk(session, index, stream, offset=None):
+    """Stream one chunk from `stream` to disk; the body must be exactly the chunk's length."""
+    if not 0 <= index < session.total_chunks:
+        raise ChunkError(f"Chunk index must be between 0 and {session.total_chunks - 1}.")
+    if offset is not None and offset != index * session.chunk_size:
+        raise ChunkError(f"Chunk {index} must start at offset {index * session.chunk_size}.")
+
+    expected = session.chunk_length(index)
+    final_path = _chunk_path(session, index)
+    tmp_path = f'{final_path}.{os.getpid()}.{time.monotonic_ns()}.tmp'
+    written = 0
+    try:
+        with open(tmp_path, 'wb') as out:
+            while written <= expected:
+                data = stream.read(min(COPY_BUFFER_SIZE, expected + 1 - written)) if stream else b''
+                if not data:
+                    break
+                out.write(data)
+                written += len(data)
+        if written != expected:
+            raise ChunkError(f"Chunk {index} must be {expected} bytes, got {written}.")
+        os.replace(tmp_path, final_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return written
+
+
+class AssembledUpload(File):
+    """
+    The assembled file of a finished session. It exposes temporary_file_path()
+    and a precomputed sha256 so storage can move it into place without a copy.
+    """
+
+    def __init__(self, path, name, size, content_type, sha256):
+        super().__init__(open(path, 'rb'), name=name)
+        self._path = path
+        self.size = size
+        self.content_type = content_type or None
+        self.sha256 = sha256
+
+    def temporary_file_path(self):
+        return self._path
+
+
+def assemble(session):
+    """
+    Concatenate the chunks in order into a single file next to them, hashing
+    the data on the way through with a fixed-size buffer.
+    """
+    missing = missing_chunks(session)
+    if missing:
+        raise ChunkError(f"Upload incomplete; missing chunks: {missing[:20]}")
+
+    ext = os.path.splitext(session.filename)[1]
+    target = os.path.join(session_dir(session), f'assembled{ext}')
+    sha256 = hashlib.sha256()
+    buffer = bytearray(COPY_BUFFER_SIZE)
+    view = memoryview(buffer)
+    with open(target, 'wb') as out:
+        for index in range(session.total_chunks):
+            with open(_chunk_path(session, index), 'rb') as part:
+                while n := part.readinto(buffer):
+                    sha256.update(view[:n])
+                    out.write(view[:n])
+            os.remove(_chunk_path(session, index))
+    return AssembledUpload(target, session.filename, session.total_size, session.content_type, sha256.hexdigest())
+
+
+def claim_session(session):
+    """
+    Take the session for completion by deleting its row. Only one request can
+    win; the chunk directory stays until remove_session_dir().
+    """
+    deleted, _ = UploadSession.objects.filter(pk=session.pk).delete()
+    return deleted == 1
+
+
+def remove_session_dir(session):
+    shutil.rmtree(session_dir(session), ignore_errors=True)
+
+
+def discard_session(session):
+    remove_session_dir(session)
+    session.delete()
+
+
+def purge_expired_sessions(throttle=False):
+    """Delete expired sessions and their chunk directories. Returns the number purged."""
+    global _last_purge
+    if throttle and time.monotonic() - _last_purge < PURGE_INTERVAL_SECONDS:
+        return 0
+    _last_purge = time.monotonic()
+
+    now = timezone.now()
+    expired = list(UploadSession.objects.filter(expires_at__lte=now).values_list('id', flat=True))
+    for session_id in expired:
+        shutil.rmtree(os.path.join(sessions_root(), session_id.hex), ignore_errors=True)
+    for start in range(0, len(expired), 500):
+        UploadSession.objects.filter(id__in=expired[start:start + 500]).delete()
+
+    # directories whose session row is gone (e.g. the user was deleted)
+    ttl = getattr(settings, 'UPLOAD_SESSION_TTL', DEFAULT_SESSION_TTL)
+    cutoff = time.time() - ttl.total_seconds()
+    try:
+        entries = list(os.scandir(sessions_root()))
+    except FileNotFoundError:
+        entries = []
+    stale = {e.name for e in entries if e.is_dir() and e.stat().st_mtime < cutoff}
+    if stale:
+        live = {
+            session_id.hex
+            for session_id in UploadSession.objects.filter(
+                id__in=[uuid.UUID(name) for name in stale if _is_uuid_hex(name)]
+            ).values_list('id', flat=True)
+        }
+        for name in stale - live:
+            shutil.rmtree(os.path.join(sessions_root(), name), ignore_errors=True)
+    return len(expired)
+
+
+def _is_uuid_hex(name):
+    try:
+        uuid.UUID(name)
+    except ValueError:
+        return False
+    return True
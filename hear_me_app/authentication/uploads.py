@@ -0,0 +1,13 @@
+import hashlib
+
+
+def file_checksum(file):
+    """Return the sha256 hex digest of a file, reading it chunk by chunk if needed."""
+    checksum = getattr(file, 'sha256', None)
+    if isinstance(checksum, str):
+        return checksum
+    sha256 = hashlib.sha256()
+    for chunk in file.chunks():
+        sha256.update(chunk)
+    file.seek(0)
+    return sha256.hexdigest()
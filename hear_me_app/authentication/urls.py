@@ -1,12 +1,29 @@
 from django.urls import path
-from .views import RegisterView, LoginView, ProfilePictureUploadView, InfluencerBankDetailsView, UploadBioVideosView
+from .views import (
+    RegisterView, LoginView, TokenRefreshView, AsyncRegisterView, AsyncLoginView, ProfilePictureUploadView, InfluencerBankDetailsView, UploadBioVideosView,
+    BioVideoUploadSessionView, BioVideoUploadSessionDetailView, BioVideoUploadChunkView,
+    BioVideoUploadSessionCompleteView, InfluencerListView, InfluencerSearchView,
+    InfluencerDetailView, DirectUploadTicketView, DirectUploadCompleteView,
+)
 
 
 urlpatterns = [
     path('api/register/', RegisterView.as_view(), name='register'),
     path('api/login/', LoginView.as_view(), name='login'),
+    path('api/token/refresh/', TokenRefreshView.as_view(), name='token-refresh'),
+    path('api/register/async/', AsyncRegisterView.as_view(), name='register-async'),
+    path('api/login/async/', AsyncLoginView.as_view(), name='login-async'),
     path('api/influencer/upload/profile-picture/', ProfilePictureUploadView.as_view(), name='upload-profile-picture'),
     path('influencer/bank/', InfluencerBankDetailsView.as_view(), name='influencer-bank'), 
     path("api/influencer/upload/bio-videos/", UploadBioVideosView.as_view(), name="upload-bio-videos"),
+    path("api/influencer/upload/bio-videos/sessions/", BioVideoUploadSessionView.as_view(), name="bio-video-upload-sessions"),
+    path("api/influencer/upload/bio-videos/sessions/<uuid:upload_id>/", BioVideoUploadSessionDetailView.as_view(), name="bio-video-upload-session"),
+    path("api/influencer/upload/bio-videos/sessions/<uuid:upload_id>/chunks/<int:index>/", BioVideoUploadChunkView.as_view(), name="bio-video-upload-chunk"),
+    path("api/influencer/upload/bio-videos/sessions/<uuid:upload_id>/complete/", BioVideoUploadSessionCompleteView.as_view(), name="bio-video-upload-complete"),
+    path("api/uploads/direct/", DirectUploadTicketView.as_view(), name="direct-upload-ticket"),
+    path("api/uploads/direct/complete/", DirectUploadCompleteView.as_view(), name="direct-upload-complete"),
+    path("api/influencers/", InfluencerListView.as_view(), name="influencer-list"),
+    path("api/influencers/search/", InfluencerSearchView.as_view(), name="influencer-search"),
+    path("api/influencers/<int:pk>/", InfluencerDetailView.as_view(), name="influencer-detail"),
 ]
 
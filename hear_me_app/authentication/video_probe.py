@@ -0,0 +1,263 @@
+"""
+Header-only probing of uploaded videos.
+
+probe() identifies the container from its magic bytes and walks just the
+structure needed for duration, resolution and codec: the box headers of an
+MP4/MOV file (descending into moov/trak/mdia/minf/stbl only) or the EBML
+elements of a WebM/Matroska file up to the first Cluster. Everything else,
+the media data above all, is skipped with a seek, so a probe reads a few
+hundred bytes and never more than PROBE_READ_LIMIT whatever the file size.
+Bitrate is the file size over the duration.
+"""
+import math
+import struct
+from dataclasses import dataclass
+
+PROBE_READ_LIMIT = 16 * 1024
+MAX_ELEMENTS = 2000
+
+# boxes an ISO base media file (MP4, MOV) can start with
+MP4_LEADING_BOXES = {b'ftyp', b'moov', b'mdat', b'free', b'skip', b'wide', b'pnot'}
+MP4_CONTAINER_BOXES = {b'moov', b'trak', b'mdia', b'minf', b'stbl'}
+EBML_MAGIC = b'\x1a\x45\xdf\xa3'
+
+# Matroska element ids
+EBML_DOCTYPE = 0x4282
+SEGMENT = 0x18538067
+INFO = 0x1549A966
+TIMESTAMP_SCALE = 0x2AD7B1
+DURATION = 0x4489
+TRACKS = 0x1654AE6B
+TRACK_ENTRY = 0xAE
+TRACK_TYPE = 0x83
+CODEC_ID = 0x86
+VIDEO = 0xE0
+PIXEL_WIDTH = 0xB0
+PIXEL_HEIGHT = 0xBA
+CLUSTER = 0x1F43B675
+
+
+class ProbeError(ValueError):
+    pass
+
+
+@dataclass
+class VideoInfo:
+    container: str  # 'mp4', 'mov', 'webm' or 'matroska'
+    duration: float  # seconds
+    width: int
+    height: int
+    codec: str
+    bitrate: int  # bits per second, over the whole file
+
+    @property
+    def family(self):
+        return 'matroska' if self.container in ('webm', 'matroska') else 'mp4'
+
+
+class _Reader:
+    """Positioned reads from `file` that count against a byte budget."""
+
+    def __init__(self, file, size, limit):
+        self.file = file
+        self.size = size
+        self.remaining = limit
+        self.elements = 0
+
+    def read(self, offset, length):
+        if length > self.remaining:
+            raise ProbeError("Video headers are too large to probe.")
+        self.file.seek(offset)
+        data = self.file.read(length)
+        if len(data) < length:
+            raise ProbeError("Video file is truncated.")
+        self.remaining -= length
+        return data
+
+    def count_element(self):
+        self.elements += 1
+        if self.elements > MAX_ELEMENTS:
+            raise ProbeError("Video structure is too complex to probe.")
+
+
+def probe(file, size=None, limit=PROBE_READ_LIMIT):
+    """Return the VideoInfo of `file` (a seekable binary file); raises ProbeError if it is not a valid video."""
+    if size is None:
+        file.seek(0, 2)
+        size = file.tell()
+    reader = _Reader(file, size, limit)
+    try:
+        magic = reader.read(0, min(8, size))
+        if magic[:4] == EBML_MAGIC:
+            info = _probe_matroska(reader)
+        elif len(magic) == 8 and magic[4:] in MP4_LEADING_BOXES:
+            info = _probe_mp4(reader)
+        else:
+            raise ProbeError("Not an MP4, MOV, WebM or Matroska file.")
+    finally:
+        file.seek(0)
+
+    # a Matroska duration is a float: NaN or infinity would otherwise get through
+    if not info.duration or not math.isfinite(info.duration) or info.duration <= 0:
+        raise ProbeError("Could not determine the video duration.")
+    if not info.codec:
+        raise ProbeError("No video track found.")
+    info.bitrate = int(size * 8 / info.duration)
+    return info
+
+
+# MP4 / MOV
+
+def _boxes(reader, start, end):
+    offset = start
+    while offset + 8 <= end:
+        reader.count_element()
+        size, kind = struct.unpack('>I4s', reader.read(offset, 8))
+        header = 8
+        if size == 1:
+            size, = struct.unpack('>Q', reader.read(offset + 8, 8))
+            header = 16
+        elif size == 0:
+            # extends to the end of the enclosing box / file
+            size = end - offset
+        if size < header or offset + size > end:
+            raise ProbeError("Corrupt MP4 box structure.")
+        yield kind, offset + header, offset + size
+        offset += size
+
+
+def _probe_mp4(reader):
+    container, moov = 'mp4', None
+    for kind, start, end in _boxes(reader, 0, reader.size):
+        if kind == b'ftyp' and end - start >= 4 and reader.read(start, 4) == b'qt  ':
+            container = 'mov'
+        elif kind == b'moov':
+            moov = (start, end)
+            break
+    if moov is None:
+        raise ProbeError("No movie header (moov) found.")
+
+    duration, width, height, codec = None, 0, 0, ''
+    for kind, start, end in _boxes(reader, *moov):
+        if kind == b'mvhd':
+            duration = _mvhd_duration(reader, start, end)
+        elif kind == b'trak' and not codec:
+            track = {}
+            _walk_track(reader, start, end, track)
+            if track.get('handler') == b'vide':
+                width, height, codec = track.get('width', 0), track.get('height', 0), track.get('codec', '')
+    return VideoInfo(container, duration, width, height, codec, 0)
+
+
+def _mvhd_duration(reader, start, end):
+    version = reader.read(start, 1)[0]
+    if version == 1:
+        timescale, duration = struct.unpack('>IQ', reader.read(start + 20, 12))
+    else:
+        timescale, duration = struct.unpack('>II', reader.read(start + 12, 8))
+    return duration / timescale if timescale else None
+
+
+def _walk_track(reader, start, end, track):
+    for kind, child_start, child_end in _boxes(reader, start, end):
+        if kind in MP4_CONTAINER_BOXES:
+            _walk_track(reader, child_start, child_end, track)
+        elif kind == b'tkhd':
+            # width and height are 16.16 fixed point, the last 8 bytes of the box
+            width, height = struct.unpack('>II', reader.read(child_end - 8, 8))
+            track['width'], track['height'] = width >> 16, height >> 16
+        elif kind == b'hdlr':
+            track['handler'] = reader.read(child_start + 8, 4)
+        elif kind == b'stsd':
+            # the first sample entry's format is the codec (avc1, hvc1, av01, ...)
+            track['codec'] = reader.read(child_start + 12, 4).decode('latin-1').strip()
+
+
+# WebM / Matroska
+
+def _vint(reader, offset, is_id):
+    first = reader.read(offset, 1)[0]
+    length = 1
+    while length <= 8 and not first & (0x80 >> (length - 1)):
+        length += 1
+    if length > (4 if is_id else 8):
+        raise ProbeError("Corrupt EBML element.")
+    data = first if is_id else first & (0xFF >> length)
+    for byte in reader.read(offset + 1, length - 1):
+        data = (data << 8) | byte
+    unknown = not is_id and data == (1 << (7 * length)) - 1
+    return data, length, unknown
+
+
+def _elements(reader, start, end):
+    offset = start
+    while offset < end:
+        reader.count_element()
+        element_id, id_length, _ = _vint(reader, offset, is_id=True)
+        size, size_length, unknown = _vint(reader, offset + id_length, is_id=False)
+        data_start = offset + id_length + size_length
+        # unknown sizes (live streams) only make sense for masters; they run to the parent's end
+        data_end = end if unknown else data_start + size
+        if data_end > end:
+            raise ProbeError("Corrupt EBML element size.")
+        yield element_id, data_start, data_end
+        offset = data_end
+
+
+def _uint(reader, start, end):
+    return int.from_bytes(reader.read(start, end - start), 'big') if end > start else 0
+
+
+def _probe_matroska(reader):
+    doctype = 'matroska'
+    segment = None
+    for element_id, start, end in _elements(reader, 0, reader.size):
+        if element_id == int.from_bytes(EBML_MAGIC, 'big'):
+            for child_id, child_start, child_end in _elements(reader, start, end):
+                if child_id == EBML_DOCTYPE:
+                    doctype = reader.read(child_start, child_end - child_start).rstrip(b'\0').decode('ascii', 'replace')
+        elif element_id == SEGMENT:
+            segment = (start, end)
+            break
+    if segment is None or doctype not in ('webm', 'matroska'):
+        raise ProbeError("Not a WebM or Matroska file.")
+
+    scale, duration, width, height, codec = 1_000_000, None, 0, 0, ''
+    for element_id, start, end in _elements(reader, *segment):
+        if element_id == INFO:
+            for child_id, child_start, child_end in _elements(reader, start, end):
+                if child_id == TIMESTAMP_SCALE:
+                    scale = _uint(reader, child_start, child_end)
+                elif child_id == DURATION:
+                    fmt = {4: '>f', 8: '>d'}.get(child_end - child_start)
+                    if fmt is None:
+                        raise ProbeError("Corrupt Matroska duration.")
+                    duration, = struct.unpack(fmt, reader.read(child_start, child_end - child_start))
+        elif element_id == TRACKS:
+            for entry_id, entry_start, entry_end in _elements(reader, start, end):
+                if entry_id == TRACK_ENTRY and not codec:
+                    width, height, codec = _track_entry(reader, entry_start, entry_end)
+        elif element_id == CLUSTER:
+            # media data from here on; Info and Tracks come before it
+            break
+        if duration is not None and codec:
+            break
+    seconds = duration * scale / 1e9 if duration is not None else None
+    return VideoInfo(doctype, seconds, width, height, codec, 0)
+
+
+def _track_entry(reader, start, end):
+    kind, codec, width, height = 0, '', 0, 0
+    for element_id, child_start, child_end in _elements(reader, start, end):
+        if element_id == TRACK_TYPE:
+            kind = _uint(reader, child_start, child_end)
+        elif element_id == CODEC_ID:
+            codec = reader.read(child_start, child_end - child_start).rstrip(b'\0').decode('ascii', 'replace')
+        elif element_id == VIDEO:
+            for video_id, video_start, video_end in _elements(reader, child_start, child_end):
+                if video_id == PIXEL_WIDTH:
+                    width = _uint(reader, video_start, video_end)
+                elif video_id == PIXEL_HEIGHT:
+                    height = _uint(reader, video_start, video_end)
+    # track type 1 is video
+    return (width, height, codec) if kind == 1 else (0, 0, '')
@@ -1,40 +1,69 @@
 from rest_framework.permissions import AllowAny
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework import status
+from rest_framework import serializers, status
 from rest_framework.parsers import MultiPartParser, FormParser
 from django.core.files.storage import default_storage
-from django.core.files.base import ContentFile
-from .serializers import RegisterSerializer, LoginSerializer, BankDetailsSerializer
-from .models import User
-from .file_validators import validate_video_file
-import os
-import uuid
+from django.utils import timezone
+from django.core.exceptions import ValidationError
+from django.http import JsonResponse
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from asgiref.sync import sync_to_async
+from .serializers import (
+    RegisterSerializer, LoginSerializer, LoginCredentialsSerializer, TokenRefreshSerializer, BankDetailsSerializer, UploadSessionSerializer,
+    ProfilePictureUploadSerializer, InfluencerDiscoveryQuerySerializer, InfluencerPublicSerializer,
+    InfluencerSearchQuerySerializer, DirectUploadTicketSerializer, DirectUploadCompleteSerializer,
+    generate_tokens,
+)
+from .models import MAX_BIO_VIDEOS, User, UploadSession, Influencer
+from .pagination import InvalidCursor, KeysetPaginator
+from .file_validators import MAX_VIDEO_SIZE, validate_video_file
+from . import direct_uploads, hashing, media_store, upload_sessions
+from .search import get_backend
+from . import caching
+from core.admission import MULTIPART_OVERHEAD, UploadAdmissionMixin
+from core.cache import get_or_build
+from decimal import Decimal
+import json
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+def registration_payload(data):
+    user: User = data.get('user')
+    return {
+        "user": {
+            "id": user.pk,
+            "username": user.username,
+            "email": user.email,
+            "phone_number": user.phone_number,
+            "role": user.role
+        },
+        "access_token": data.get("access_token"),
+        "refresh_token": data.get("refresh_token")
+    }
+
+
+def login_payload(data):
+    return {
+        "message": "Login successful",
+        "access_token": data["access_token"],
+        "refresh_token": data["refresh_token"]
+    }
+
+
 class RegisterView(APIView):
     permission_classes = [AllowAny]
 
     def post(self, request):
-        logger.info(f"RegisterView received data: {request.data}")
+        logger.debug("RegisterView received data: %s", request.data)
         serializer = RegisterSerializer(data=request.data)
         if serializer.is_valid():
             data: dict = serializer.save()
-            user: User = data.get('user')
-            return Response({
-                "user": {
-                    "id": user.pk,
-                    "username": user.username,
-                    "email": user.email,
-                    "phone_number": user.phone_number,
-                    "role": user.role
-                },
-                "access_token": data.get("access_token"),
-                "refresh_token": data.get("refresh_token")
-            }, status=status.HTTP_201_CREATED)
+            return Response(registration_payload(data), status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 class LoginView(APIView):
@@ -44,17 +73,100 @@ class LoginView(APIView):
         serializer = LoginSerializer(data=request.data)
         if serializer.is_valid():
             data: dict = serializer.save()
-            return Response({
-                "message": "Login successful",
-                "access_token": data["access_token"],
-                "refresh_token": data["refresh_token"]
-            }, status=status.HTTP_200_OK)
+            return Response(login_payload(data), status=status.HTTP_200_OK)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
-    
 
-class ProfilePictureUploadView(APIView):
+
+class TokenRefreshView(APIView):
+    permission_classes = [AllowAny]
+
+    def post(self, request):
+        # invalid, expired or reused tokens raise InvalidToken (401)
+        serializer = TokenRefreshSerializer(data=request.data)
+        if serializer.is_valid():
+            return Response(serializer.save(), status=status.HTTP_200_OK)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+def _request_data(request):
+    if request.content_type == 'application/json':
+        return json.loads(request.body or b'{}')
+    return request.POST.dict()
+
+
+def _saturated_response(exc):
+    response = JsonResponse({"detail": "Server busy, please retry."}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+    response['Retry-After'] = str(exc.retry_after)
+    return response
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class AsyncRegisterView(View):
+    # same contract as RegisterView; hashing runs on the bounded pool in hashing.py (serve via asgi.py)
+
+    async def post(self, request):
+        try:
+            serializer = RegisterSerializer(data=_request_data(request))
+        except ValueError:
+            return JsonResponse({"detail": "Malformed request body."}, status=status.HTTP_400_BAD_REQUEST)
+        if not await sync_to_async(serializer.is_valid)():
+            return JsonResponse(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            password_hash = await hashing.hash_password(serializer.validated_data.get('password'))
+        except hashing.Saturated as e:
+            return _saturated_response(e)
+        try:
+            data = await sync_to_async(serializer.save)(password_hash=password_hash)
+        except serializers.ValidationError as e:
+            # a unique constraint caught a duplicate (see RegisterSerializer.create)
+            return JsonResponse(e.detail, status=status.HTTP_400_BAD_REQUEST)
+        return JsonResponse(registration_payload(data), status=status.HTTP_201_CREATED)
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class AsyncLoginView(View):
+    # same contract as LoginView; hashing runs on the bounded pool in hashing.py (serve via asgi.py)
+
+    async def post(self, request):
+        try:
+            serializer = LoginCredentialsSerializer(data=_request_data(request))
+        except ValueError:
+            return JsonResponse({"detail": "Malformed request body."}, status=status.HTTP_400_BAD_REQUEST)
+        if not serializer.is_valid():
+            return JsonResponse(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        credentials = serializer.validated_data
+
+        user = await User.objects.select_related('influencer_profile').filter(
+            phone_number=credentials['phone_number'],
+        ).afirst()
+        try:
+            if user is None:
+                # unknown users still pay for one hash, as ModelBackend does, so timing does not reveal them
+                await hashing.hash_password(credentials['password'])
+                verified = False
+            else:
+                verified, must_update = await hashing.verify(credentials['password'], user.password)
+            if verified and must_update:
+                user.password = await hashing.hash_password(credentials['password'])
+                await user.asave(update_fields=['password'])
+        except hashing.Saturated as e:
+            return _saturated_response(e)
+
+        try:
+            if not (user and verified and user.is_active):
+                raise serializers.ValidationError("Invalid credentials.")
+            LoginCredentialsSerializer.check_account(user, credentials['role'])
+        except serializers.ValidationError as e:
+            return JsonResponse(serializers.as_serializer_error(e), status=status.HTTP_400_BAD_REQUEST)
+
+        tokens = await sync_to_async(generate_tokens)(user)
+        return JsonResponse(login_payload(tokens), status=status.HTTP_200_OK)
+
+
+class ProfilePictureUploadView(UploadAdmissionMixin, APIView):
     permission_classes = [AllowAny]
     parser_classes = [MultiPartParser, FormParser]
+    upload_max_body = ProfilePictureUploadSerializer.MAX_SIZE + MULTIPART_OVERHEAD
 
     def post(self, request, *args, **kwargs):
         file_obj = request.FILES.get("profile_picture")
@@ -62,9 +174,25 @@ class ProfilePictureUploadView(APIView):
         if not file_obj:
             return Response({"error": "No file provided."}, status=status.HTTP_400_BAD_REQUEST)
 
-        # Save file manually to MEDIA_ROOT/influencer_profiles/
-        file_path = default_storage.save(f"influencer_profiles/{file_obj.name}", ContentFile(file_obj.read()))
-        file_url = request.build_absolute_uri(default_storage.url(file_path))
+        # logged-in influencers get the picture attached and resized variants rendered
+        if hasattr(request.user, 'influencer_profile'):
+            serializer = ProfilePictureUploadSerializer(data=request.data)
+            if not serializer.is_valid():
+                return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+            influencer = serializer.save(request.user)
+            return Response({
+                "profile_picture_url": request.build_absolute_uri(influencer.profile_picture.url),
+                "variants": {
+                    name: {key: request.build_absolute_uri(value) if key in ('webp', 'jpeg') else value
+                           for key, value in entry.items()}
+                    for name, entry in influencer.profile_picture_variant_urls.items()
+                },
+            }, status=status.HTTP_201_CREATED)
+
+        # Store by content hash under MEDIA_ROOT/influencer_profiles/; re-uploads are deduplicated.
+        # Nothing records an anonymous upload, so it takes no reference.
+        blob, _ = media_store.put(file_obj, "influencer_profiles", reference=False)
+        file_url = request.build_absolute_uri(default_storage.url(blob.path))
 
         return Response({"profile_picture_url": file_url}, status=status.HTTP_201_CREATED)
 
@@ -91,8 +219,9 @@ class InfluencerBankDetailsView(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
 
-class UploadBioVideosView(APIView):
+class UploadBioVideosView(UploadAdmissionMixin, APIView):
     permission_classes = [AllowAny]  # change to IsAuthenticated if only logged-in users can upload
+    upload_max_body = MAX_BIO_VIDEOS * MAX_VIDEO_SIZE + MULTIPART_OVERHEAD
 
     def post(self, request):
         # Expect files under "bio_videos" (multiple) or single "bio_videos"
@@ -100,29 +229,285 @@ class UploadBioVideosView(APIView):
         if not files:
             return Response({"detail": "No files provided."}, status=status.HTTP_400_BAD_REQUEST)
 
-        if len(files) > 5:
-            return Response({"detail": "Max 5 videos allowed."}, status=status.HTTP_400_BAD_REQUEST)
-
-        saved = []
-        for f in files:
-            try:
-                validate_video_file(f)
-            except Exception as e:
-                return Response({"detail": f"File validation failed for {f.name}: {str(e)}"}, status=status.HTTP_400_BAD_REQUEST)
+        if len(files) > MAX_BIO_VIDEOS:
+            return Response({"detail": f"Max {MAX_BIO_VIDEOS} videos allowed."}, status=status.HTTP_400_BAD_REQUEST)
 
-            # safe filename
-            ext = os.path.splitext(f.name)[1]
-            key = f"influencer_bio_videos/{uuid.uuid4().hex}{ext}"
+        # validated, hashed and stored by content hash (MEDIA_ROOT) concurrently; all files or none
+        try:
+            # the URLs are returned, not recorded, so no references are taken
+            stored = media_store.put_many(files, "influencer_bio_videos", validate=validate_video_file,
+                                          reference=False)
+        except media_store.BatchFailed as e:
+            return Response({"detail": f"File validation failed for {e.file.name}: {str(e.error)}"},
+                            status=status.HTTP_400_BAD_REQUEST)
 
-            # save using default_storage (MEDIA_ROOT)
-            path = default_storage.save(key, ContentFile(f.read()))
-            file_url = request.build_absolute_uri(default_storage.url(path))
+        saved = []
+        for f, (blob, _) in zip(files, stored):
+            file_url = request.build_absolute_uri(default_storage.url(blob.path))
 
             saved.append({
                 "filename": f.name,
-                "path": path,
+                "path": blob.path,
                 "url": file_url,
-                "size": f.size,
+                "size": blob.size,
+                "sha256": blob.sha256,
             })
 
-        return Response({"uploaded": saved}, status=status.HTTP_201_CREATED)
\ No newline at end of file
+        return Response({"uploaded": saved}, status=status.HTTP_201_CREATED)
+
+
+def _session_state(session):
+    received = upload_sessions.received_chunks(session)
+    return {
+        "upload_id": str(session.id),
+        "filename": session.filename,
+        "size": session.total_size,
+        "chunk_size": session.chunk_size,
+        "total_chunks": session.total_chunks,
+        "received": received,
+        "missing": upload_sessions.missing_chunks(session),
+        "expires_at": session.expires_at,
+    }
+
+
+class UploadSessionMixin:
+    def get_session(self, request, upload_id):
+        session = UploadSession.objects.filter(pk=upload_id, expires_at__gt=timezone.now()).first()
+        if session is None:
+            return None
+        # sessions opened by a logged-in user are only visible to that user
+        if session.user_id and session.user_id != request.user.pk:
+            return None
+        return session
+
+
+class BioVideoUploadSessionView(APIView):
+    permission_classes = [AllowAny]
+
+    def post(self, request):
+        serializer = UploadSessionSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            session = upload_sessions.create_session(request.user, **serializer.validated_data)
+        except ValidationError as e:
+            return Response({"detail": " ".join(e.messages)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(_session_state(session), status=status.HTTP_201_CREATED)
+
+
+class BioVideoUploadSessionDetailView(UploadSessionMixin, APIView):
+    permission_classes = [AllowAny]
+
+    def get(self, request, upload_id):
+        session = self.get_session(request, upload_id)
+        if session is None:
+            return Response({"detail": "Upload session not found."}, status=status.HTTP_404_NOT_FOUND)
+        return Response(_session_state(session), status=status.HTTP_200_OK)
+
+    def delete(self, request, upload_id):
+        session = self.get_session(request, upload_id)
+        if session is None:
+            return Response({"detail": "Upload session not found."}, status=status.HTTP_404_NOT_FOUND)
+        upload_sessions.discard_session(session)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class BioVideoUploadChunkView(UploadSessionMixin, UploadAdmissionMixin, APIView):
+    permission_classes = [AllowAny]
+    # a chunk is never larger than the whole video
+    upload_max_body = MAX_VIDEO_SIZE
+
+    def put(self, request, upload_id, index):
+        session = self.get_session(request, upload_id)
+        if session is None:
+            return Response({"detail": "Upload session not found."}, status=status.HTTP_404_NOT_FOUND)
+
+        # optional "Content-Range: bytes <start>-<end>/<total>" pins the chunk offset
+        offset = None
+        content_range = request.headers.get("Content-Range", "")
+        if content_range:
+            try:
+                offset = int(content_range.split()[1].split("-")[0])
+            except (IndexError, ValueError):
+                return Response({"detail": "Malformed Content-Range header."}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            written = upload_sessions.write_chunk(session, index, request.stream, offset=offset)
+        except upload_sessions.ChunkError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({"index": index, "size": written}, status=status.HTTP_200_OK)
+
+
+class BioVideoUploadSessionCompleteView(UploadSessionMixin, APIView):
+    permission_classes = [AllowAny]
+
+    def post(self, request, upload_id):
+        session = self.get_session(request, upload_id)
+        if session is None:
+            return Response({"detail": "Upload session not found."}, status=status.HTTP_404_NOT_FOUND)
+
+        missing = upload_sessions.missing_chunks(session)
+        if missing:
+            return Response({"detail": f"Upload incomplete; missing chunks: {missing[:20]}", "missing": missing},
+                            status=status.HTTP_409_CONFLICT)
+        # only one of several concurrent completions gets to assemble and store
+        if not upload_sessions.claim_session(session):
+            return Response({"detail": "Upload session not found."}, status=status.HTTP_404_NOT_FOUND)
+
+        try:
+            assembled = upload_sessions.assemble(session)
+            try:
+                validate_video_file(assembled)
+                blob, _ = media_store.put(assembled, "influencer_bio_videos", reference=False)
+            finally:
+                assembled.close()
+        except upload_sessions.ChunkError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_409_CONFLICT)
+        except ValidationError as e:
+            return Response({"detail": f"File validation failed for {session.filename}: {' '.join(e.messages)}"},
+                            status=status.HTTP_400_BAD_REQUEST)
+        finally:
+            upload_sessions.remove_session_dir(session)
+
+        return Response({
+            "filename": session.filename,
+            "path": blob.path,
+            "url": request.build_absolute_uri(default_storage.url(blob.path)),
+            "size": blob.size,
+            "sha256": blob.sha256,
+        }, status=status.HTTP_201_CREATED)
+
+
+class DirectUploadTicketView(APIView):
+    """Issue a signed ticket to PUT one file straight to the upload backend."""
+    permission_classes = [AllowAny]
+
+    def post(self, request):
+        if not hasattr(request.user, 'influencer_profile'):
+            return Response({"detail": "Only influencers can upload media."}, status=status.HTTP_403_FORBIDDEN)
+
+        serializer = DirectUploadTicketSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        data = serializer.validated_data
+        ticket, key = direct_uploads.issue_ticket(request.user, **data)
+        return Response({
+            "ticket": ticket,
+            "key": key,
+            "upload_url": request.build_absolute_uri(direct_uploads.get_backend().upload_url(ticket, key)),
+            "method": "PUT",
+            "headers": {"Content-Type": data['content_type']},
+            "max_size": data['size'],
+            "expires_in": direct_uploads.ticket_ttl(),
+        }, status=status.HTTP_201_CREATED)
+
+
+class DirectUploadCompleteView(APIView):
+    """Attach a directly uploaded file to the influencer once its bytes have arrived."""
+    permission_classes = [AllowAny]
+
+    def post(self, request):
+        if not hasattr(request.user, 'influencer_profile'):
+            return Response({"detail": "Only influencers can upload media."}, status=status.HTTP_403_FORBIDDEN)
+
+        serializer = DirectUploadCompleteSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        influencer = serializer.save(request.user)
+
+        if serializer.validated_data['ticket']['kind'] == 'profile_picture':
+            return Response({
+                "profile_picture_url": request.build_absolute_uri(influencer.profile_picture.url),
+            }, status=status.HTTP_201_CREATED)
+        return Response({
+            "bio_videos": [request.build_absolute_uri(url) for url in influencer.bio_videos],
+        }, status=status.HTTP_201_CREATED)
+
+
+class InfluencerListView(APIView):
+    # filters + keyset pagination: one indexed query per page at any depth
+    permission_classes = [AllowAny]
+
+    PUBLIC_FIELDS = [
+        'id', 'full_name', 'biography', 'category', 'profile_picture', 'profile_picture_variants', 'bio_videos',
+        'daily_price', 'weekly_price', 'instagram_acc_link', 'tiktok_acc_link', 'snapchat_acc_link',
+        'youtube_acc_link', 'status', 'user__username',
+    ]
+
+    def get(self, request):
+        params = InfluencerDiscoveryQuerySerializer(data=request.query_params, context={"request": request})
+        if not params.is_valid():
+            return Response(params.errors, status=status.HTTP_400_BAD_REQUEST)
+        filters = params.validated_data
+
+        queryset = Influencer.objects.filter(status=filters['status']).select_related('user').only(*self.PUBLIC_FIELDS)
+        if 'category' in filters:
+            queryset = queryset.filter(category=filters['category'])
+        for bound, lookup in (('min', 'gte'), ('max', 'lte')):
+            for price in ('daily_price', 'weekly_price'):
+                if f'{bound}_{price}' in filters:
+                    queryset = queryset.filter(**{f'{price}__{lookup}': filters[f'{bound}_{price}']})
+
+        def build_page():
+            paginator = KeysetPaginator(filters['ordering'], filters['page_size'], value_type=Decimal)
+            influencers, next_cursor = paginator.paginate(queryset, filters.get('cursor'))
+            next_url = None
+            if next_cursor:
+                query = request.query_params.copy()
+                query['cursor'] = next_cursor
+                next_url = request.build_absolute_uri(f"{request.path}?{query.urlencode()}")
+            return {
+                "results": [
+                    dict(item) for item in
+                    InfluencerPublicSerializer(influencers, many=True, context={"request": request}).data
+                ],
+                "next_cursor": next_cursor,
+                "next": next_url,
+            }
+
+        try:
+            payload, hit = get_or_build(
+                caching.list_key(request.get_host(), request.query_params.dict()), build_page, caching.list_timeout(),
+            )
+        except InvalidCursor as e:
+            return Response({"cursor": [str(e)]}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(payload, status=status.HTTP_200_OK, headers={"X-Cache": "HIT" if hit else "MISS"})
+
+
+class InfluencerDetailView(APIView):
+    permission_classes = [AllowAny]
+
+    def get(self, request, pk):
+        def build_profile():
+            influencer = (
+                Influencer.objects.filter(pk=pk, status='approved').select_related('user')
+                .only(*InfluencerListView.PUBLIC_FIELDS).first()
+            )
+            # unknown ids are cached too (as None) until the influencer changes
+            if influencer is None:
+                return None
+            return dict(InfluencerPublicSerializer(influencer, context={"request": request}).data)
+
+        profile, hit = get_or_build(caching.profile_key(pk, request.get_host()), build_profile,
+                                    caching.profile_timeout())
+        headers = {"X-Cache": "HIT" if hit else "MISS"}
+        if profile is None:
+            return Response({"detail": "Influencer not found."}, status=status.HTTP_404_NOT_FOUND, headers=headers)
+        return Response(profile, status=status.HTTP_200_OK, headers=headers)
+
+
+class InfluencerSearchView(APIView):
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        params = InfluencerSearchQuerySerializer(data=request.query_params, context={"request": request})
+        if not params.is_valid():
+            return Response(params.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        ids = get_backend().search(params.validated_data['q'], status=params.validated_data['status'],
+                                   limit=params.validated_data['limit'])
+        by_pk = Influencer.objects.select_related('user').only(*InfluencerListView.PUBLIC_FIELDS).in_bulk(ids)
+        influencers = [by_pk[pk] for pk in ids if pk in by_pk]
+        return Response({
+            "results": InfluencerPublicSerializer(influencers, many=True, context={"request": request}).data,
+        }, status=status.HTTP_200_OK)
@@ -0,0 +1,104 @@
+"""
+Login throughput and head-of-line blocking, sync view vs async view.
+
+Fires N logins at once, interleaved with cheap cached profile reads, and
+reports logins per second plus the latency of the cheap reads. The sync path
+runs on W worker threads like a threaded WSGI server, so profile reads wait
+behind PBKDF2; the async path runs everything on one event loop through the
+ASGI handler with the hashing pool sized to W:
+
+    python -m benchmarks.bench_async_login --logins 200 --workers 4
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .utils import Timer, setup_django
+
+PASSWORD = 'bench-password-1'
+
+
+def summarize(label, elapsed, logins, statuses, probe_latencies):
+    ok = statuses.count(200)
+    rejected = statuses.count(503)
+    probes = sorted(probe_latencies)
+    print(f'{label}\tlogins/s\t{ok / elapsed:.1f}\tok\t{ok}\trejected\t{rejected}'
+          f'\tprobe_p50_ms\t{statistics.median(probes) * 1000:.1f}'
+          f'\tprobe_max_ms\t{probes[-1] * 1000:.1f}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--logins', type=int, default=200)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--probe-every', type=int, default=10, help='one profile read per this many logins')
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+    from django.test import AsyncClient, Client
+
+    from authentication import hashing
+    from authentication.models import Influencer, User
+
+    settings.PASSWORD_HASHING_WORKERS = args.workers
+    settings.PASSWORD_HASHING_QUEUE_DEPTH = args.logins
+    hashing.get_pool.cache_clear()
+
+    user = User.objects.create_user(phone_number='0500000000', username='bench', email='bench@example.com',
+                                    password=PASSWORD, role='client')
+    influencer = Influencer.objects.create(
+        user=User.objects.create_user(phone_number='0500000001', username='star', email='star@example.com',
+                                      password=PASSWORD, role='influencer'),
+        full_name='Star', status='approved',
+    )
+    credentials = {'phone_number': user.phone_number, 'password': PASSWORD, 'role': 'client'}
+    profile_url = f'/api/influencers/{influencer.pk}/'
+    Client().get(profile_url)  # warm the profile cache
+
+    def requests():
+        # latency is measured from arrival, so time spent queued for a worker counts
+        for i in range(args.logins):
+            if i % args.probe_every == 0:
+                yield 'probe', time.perf_counter()
+            yield 'login', time.perf_counter()
+
+    # sync: W threads, each request occupies a worker until it completes
+    def sync_request(request):
+        kind, arrived = request
+        client = Client()
+        if kind == 'probe':
+            client.get(profile_url)
+            return kind, None, time.perf_counter() - arrived
+        return kind, client.post('/api/login/', credentials).status_code, None
+
+    with ThreadPoolExecutor(args.workers) as pool, Timer() as timer:
+        results = list(pool.map(sync_request, requests()))
+    summarize('sync', timer.elapsed, args.logins,
+              [status for kind, status, _ in results if kind == 'login'],
+              [latency for kind, _, latency in results if kind == 'probe'])
+
+    # async: one event loop, hashing on the bounded pool
+    async def run_async():
+        client = AsyncClient()
+
+        async def async_request(kind, arrived):
+            if kind == 'probe':
+                await client.get(profile_url)
+                return kind, None, time.perf_counter() - arrived
+            response = await client.post('/api/login/async/', credentials, content_type='application/json')
+            return kind, response.status_code, None
+
+        return await asyncio.gather(*(async_request(*request) for request in requests()))
+
+    with Timer() as timer:
+        results = asyncio.run(run_async())
+    summarize('async', timer.elapsed, args.logins,
+              [status for kind, status, _ in results if kind == 'login'],
+              [latency for kind, _, latency in results if kind == 'probe'])
+
+
+if __name__ == '__main__':
+    main()
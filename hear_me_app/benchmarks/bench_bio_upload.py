@@ -0,0 +1,100 @@
+"""
+Multi-file bio-video upload: the old sequential loop vs media_store.put_many.
+
+Each round stores the same number of fresh videos, as spooled temporary
+uploads, either one after another (validate, then media_store.put, per file)
+or with put_many. --storage-latency-ms adds a fixed delay to every storage
+write, standing in for a remote object store where the writes dominate:
+
+    python -m benchmarks.bench_bio_upload --files 5 --size-mb 20
+    python -m benchmarks.bench_bio_upload --storage-latency-ms 80
+"""
+import argparse
+import os
+import statistics
+import time
+
+from .utils import Timer, setup_django
+
+
+def make_files(count, size, round_number):
+    from django.core.files.uploadedfile import TemporaryUploadedFile
+
+    from authentication.testing import mp4_bytes
+
+    files = []
+    for i in range(count):
+        f = TemporaryUploadedFile(f'clip{i}.mp4', 'video/mp4', 0, None)
+        head = mp4_bytes(duration=60)
+        f.write(head)
+        # unique content per file and round so nothing deduplicates
+        f.write(round_number.to_bytes(4, 'big') + i.to_bytes(4, 'big'))
+        remaining = size - len(head) - 8
+        block = os.urandom(1024 * 1024)
+        while remaining > 0:
+            f.write(block[:remaining])
+            remaining -= len(block)
+        f.size = f.tell()
+        f.seek(0)
+        files.append(f)
+    return files
+
+
+def sequential(files):
+    from authentication import media_store
+    from authentication.file_validators import validate_video_file
+
+    for f in files:
+        validate_video_file(f)
+        media_store.put(f, 'influencer_bio_videos')
+
+
+def concurrent(files):
+    from authentication import media_store
+    from authentication.file_validators import validate_video_file
+
+    media_store.put_many(files, 'influencer_bio_videos', validate=validate_video_file)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--files', type=int, default=5)
+    parser.add_argument('--size-mb', type=float, default=20)
+    parser.add_argument('--rounds', type=int, default=5)
+    parser.add_argument('--storage-latency-ms', type=float, default=0)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+
+    from authentication import media_store
+
+    settings.DEBUG = False
+    if args.storage_latency_ms:
+        save = media_store.content_storage.save
+
+        def slow_save(name, content, **kwargs):
+            time.sleep(args.storage_latency_ms / 1000)
+            return save(name, content, **kwargs)
+
+        media_store.content_storage.save = slow_save
+
+    size = int(args.size_mb * 1024 * 1024)
+    print('mode\tfiles\tsize_mb\tp50_ms\tmin_ms')
+    round_number = 0
+    for name, store in (('sequential', sequential), ('concurrent', concurrent)):
+        timings = []
+        for _ in range(args.rounds):
+            round_number += 1
+            files = make_files(args.files, size, round_number)
+            with Timer() as timer:
+                store(files)
+            timings.append(timer.elapsed)
+            for f in files:
+                f.close()
+        print(name, args.files, args.size_mb, f'{statistics.median(timings) * 1000:.1f}',
+              f'{min(timings) * 1000:.1f}', sep='\t')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+"""
+Bulk approval of pending influencers, including notification delivery.
+
+Seeds N pending influencers, approves them with bulk_set_status() and then
+drains the email jobs with the locmem backend, reporting the query count and
+wall time of each phase:
+
+    python -m benchmarks.bench_bulk_status --influencers 10000
+"""
+import argparse
+
+from .utils import Timer, setup_django
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--influencers', type=int, default=10000)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+    from django.core import mail
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    from authentication.models import Influencer, User
+    from authentication.status import bulk_set_status
+    from core import jobs
+
+    settings.EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+    mail.outbox = []
+
+    users = User.objects.bulk_create([
+        User(phone_number=f'05{i:08d}', username=f'bench{i}', email=f'bench{i}@example.com',
+             role='influencer', password='!')
+        for i in range(args.influencers)
+    ], batch_size=1000)
+    Influencer.objects.bulk_create([Influencer(user=user) for user in users], batch_size=1000)
+
+    with CaptureQueriesContext(connection) as queries, Timer() as update_timer:
+        changed = bulk_set_status(Influencer.objects.filter(status='pending'), 'approved')
+    update_queries = len(queries)
+
+    with CaptureQueriesContext(connection) as queries, Timer() as send_timer:
+        jobs.run_pending(('email',))
+
+    print(f'approved\t{len(changed)}\tqueries\t{update_queries}\tseconds\t{update_timer.elapsed:.3f}')
+    print(f'emails\t{len(mail.outbox)}\tqueries\t{len(queries)}\tseconds\t{send_timer.elapsed:.3f}')
+
+
+if __name__ == '__main__':
+    main()
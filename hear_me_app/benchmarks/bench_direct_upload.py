@@ -0,0 +1,121 @@
+"""
+How long a bio-video upload keeps the API (Django) busy: multipart POST vs direct upload.
+
+Both paths go through the project's ASGI application in-process (see
+transports.ASGITransport). ``multipart`` posts the video to
+upload-bio-videos. ``direct`` asks for a ticket, PUTs the bytes to the
+upload_url (ReceiverApp, in front of Django) and completes the upload.
+``api_ms`` is the time spent inside Django for one upload; ``total_ms``
+includes the receiver:
+
+    python -m benchmarks.bench_direct_upload --size-mb 32 --rounds 5
+"""
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+
+from .utils import Timer, setup_django
+
+
+class TimedApplication:
+    """Wraps the Django ASGI app; adds up the time requests spend in it and keeps the last response body."""
+
+    def __init__(self, application):
+        self.application = application
+        self.elapsed = 0.0
+        self.body = b''
+
+    async def __call__(self, scope, receive, send):
+        async def capturing_send(message):
+            if message['type'] == 'http.response.body':
+                self.body = message.get('body', b'')
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            return await self.application(scope, receive, capturing_send)
+        finally:
+            self.elapsed += time.perf_counter() - start
+
+
+def make_video(size, round_number):
+    from authentication.testing import mp4_bytes
+
+    head = mp4_bytes(duration=60)
+    # unique per round so nothing deduplicates
+    return head + round_number.to_bytes(4, 'big') + os.urandom(max(0, size - len(head) - 4))
+
+
+def multipart(transport, django_app, video, headers):
+    from django.core.files.uploadedfile import SimpleUploadedFile
+    from django.test.client import BOUNDARY, MULTIPART_CONTENT, encode_multipart
+
+    body = encode_multipart(BOUNDARY, {'bio_videos': SimpleUploadedFile('clip.mp4', video, 'video/mp4')})
+    status = transport.request('POST', '/api/influencer/upload/bio-videos/', body, MULTIPART_CONTENT, headers)
+    assert status == 201, status
+
+
+def direct(transport, django_app, video, headers):
+    body = json.dumps({'kind': 'bio_video', 'filename': 'clip.mp4', 'size': len(video),
+                       'content_type': 'video/mp4'}).encode()
+    assert transport.request('POST', '/api/uploads/direct/', body, 'application/json', headers) == 201
+    ticket = json.loads(django_app.body)
+    upload_url = ticket['upload_url'].removeprefix('http://testserver')
+    assert transport.request('PUT', upload_url, video, 'video/mp4') == 201
+    body = json.dumps({'ticket': ticket['ticket']}).encode()
+    assert transport.request('POST', '/api/uploads/direct/complete/', body, 'application/json', headers) == 201
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--size-mb', type=float, default=32)
+    parser.add_argument('--rounds', type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    from authentication.models import Influencer, User
+
+    from .transports import ASGITransport
+
+    settings.DEBUG = False
+    settings.DIRECT_UPLOAD_ROOT = tempfile.mkdtemp(prefix='hear_me_bench_direct_')
+    transport = ASGITransport()
+    # hear_me_app.asgi.application is ReceiverApp in front of Django
+    django_app = TimedApplication(transport.application.application)
+    transport.application.application = django_app
+
+    user = User.objects.create_user(phone_number='0500000099', username='bench', email='bench@example.com',
+                                    password='pass12345', role='influencer')
+    influencer = Influencer.objects.create(user=user, full_name='Bench')
+    headers = {'Authorization': f'Bearer {AccessToken.for_user(user)}'}
+
+    size = int(args.size_mb * 1024 * 1024)
+    print('mode\tsize_mb\tapi_ms\ttotal_ms')
+    round_number = 0
+    try:
+        for name, upload in (('multipart', multipart), ('direct', direct)):
+            api, total = [], []
+            for _ in range(args.rounds):
+                round_number += 1
+                video = make_video(size, round_number)
+                # the influencer holds at most 5 bio videos
+                Influencer.objects.filter(pk=influencer.pk).update(bio_videos=[])
+                django_app.elapsed = 0.0
+                with Timer() as timer:
+                    upload(transport, django_app, video, headers)
+                api.append(django_app.elapsed)
+                total.append(timer.elapsed)
+            print(name, args.size_mb, f'{statistics.median(api) * 1000:.1f}',
+                  f'{statistics.median(total) * 1000:.1f}', sep='\t')
+    finally:
+        transport.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""
+Influencer discovery page latency by depth: keyset cursor vs OFFSET.
+
+Seeds N influencers, then times GET /api/influencers/ for pages at several
+depths using a cursor taken from the row just before that depth, next to
+the equivalent OFFSET query:
+
+    python -m benchmarks.bench_discovery --rows 1000000 --depths 0 1000 100000 900000
+"""
+import argparse
+import random
+import statistics
+import time
+
+from .utils import setup_django
+
+
+def seed(rows, batch=5000):
+    from authentication.models import Influencer, User
+
+    rng = random.Random(7)
+    categories = [choice for choice, _ in Influencer.CATEGORY_CHOICES]
+    for start in range(0, rows, batch):
+        users = User.objects.bulk_create([
+            User(phone_number=f'05{i:09d}', username=f'bench{i}', email=f'bench{i}@example.com',
+                 role='influencer', password='!')
+            for i in range(start, min(start + batch, rows))
+        ])
+        Influencer.objects.bulk_create([
+            Influencer(
+                user=user,
+                full_name=f'Influencer {user.pk}',
+                category=rng.choice(categories),
+                status='approved' if rng.random() < 0.9 else 'pending',
+                daily_price=rng.randint(50, 5000),
+                weekly_price=rng.randint(300, 30000),
+            )
+            for user in users
+        ])
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=200000)
+    parser.add_argument('--depths', type=int, nargs='+', default=[0, 1000, 10000, 100000])
+    parser.add_argument('--ordering', default='daily_price')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.db import connection
+    from django.test import Client
+    from django.test.utils import CaptureQueriesContext
+
+    from authentication.models import Influencer
+    from authentication.pagination import KeysetPaginator, encode_cursor
+
+    seed(args.rows)
+    client = Client()
+    paginator = KeysetPaginator(args.ordering, 20)
+    base = Influencer.objects.filter(status='approved')
+
+    print('depth\tkeyset_ms\toffset_ms\tqueries_per_page')
+    for depth in args.depths:
+        params = {'ordering': args.ordering, 'page_size': 20}
+        if depth:
+            anchor = base.order_by(*paginator.ordering)[depth - 1]
+            position = {'o': paginator.key, 'pk': anchor.pk}
+            if not paginator.by_pk:
+                position['v'] = str(getattr(anchor, paginator.field))
+            params['cursor'] = encode_cursor(position)
+
+        keyset_ms = timed(lambda: client.get('/api/influencers/', params), args.repeat)
+        offset_ms = timed(
+            lambda: list(base.select_related('user').order_by(*paginator.ordering)[depth:depth + 20]), args.repeat,
+        )
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get('/api/influencers/', params)
+        assert response.status_code == 200, response.content
+        print(f'{depth}\t{keyset_ms:.2f}\t{offset_ms:.2f}\t{len(queries)}')
+
+
+if __name__ == '__main__':
+    main()
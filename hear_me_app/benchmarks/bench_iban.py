@@ -0,0 +1,93 @@
+"""
+IBAN validation throughput: authentication.iban vs the previous implementation.
+
+Generates N random IBANs in the registry's formats (a share of them with a
+corrupted check digit or country shape) and reports validations per second
+for the old serializer routine, iban.is_valid() per value and
+iban.validate_many(). "hot" repeats a small set of values, the way bank
+details and re-imported rows repeat, so the memoized normalizer hits:
+
+    python -m benchmarks.bench_iban --count 1000000
+"""
+import argparse
+import random
+import re
+
+from .utils import Timer, setup_django
+
+
+def legacy_is_valid_iban(iban):
+    # the implementation that used to live in authentication/serializers.py
+    iban = re.sub(r'\s+', '', iban).upper()
+    if not re.match(r'^[A-Z]{2}[0-9]{2}[A-Z0-9]{1,30}$', iban):
+        return False
+    rearranged = iban[4:] + iban[:4]
+    converted = ''
+    for ch in rearranged:
+        if ch.isdigit():
+            converted += ch
+        else:
+            converted += str(ord(ch) - 55)
+    remainder = 0
+    for i in range(0, len(converted), 9):
+        part = str(remainder) + converted[i:i+9]
+        remainder = int(part) % 97
+    return remainder == 1
+
+
+def generate(count, invalid_share, rng):
+    from authentication.iban import BBAN_FORMATS, _TO_DIGITS
+
+    # alphanumeric account numbers are mostly digits in practice
+    charsets = {'n': '0123456789', 'a': 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'c': '0123456789' * 9 + 'ABCDEFGHIJ'}
+    specs = {country: re.findall(r'(\d+)([nac])', structure) for country, structure in BBAN_FORMATS.items()}
+    countries = sorted(specs)
+    values = []
+    for _ in range(count):
+        country = rng.choice(countries)
+        bban = ''.join(rng.choice(charsets[kind]) for count_, kind in specs[country] for _ in range(int(count_)))
+        check = 98 - int((bban + country + '00').translate(_TO_DIGITS)) % 97
+        iban = f'{country}{check:02d}{bban}'
+        if rng.random() < invalid_share:
+            iban = iban[:2] + f'{(check + 1) % 100:02d}' + iban[4:]
+        # half of the values come in the grouped form people type
+        if rng.random() < 0.5:
+            iban = ' '.join(iban[i:i + 4] for i in range(0, len(iban), 4)).lower()
+        values.append(iban)
+    return values
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--count', type=int, default=1000000)
+    parser.add_argument('--invalid-share', type=float, default=0.1)
+    parser.add_argument('--hot-set', type=int, default=1000)
+    args = parser.parse_args()
+
+    setup_django(test_db=False)
+    from authentication import iban
+
+    rng = random.Random(97)
+    cold = generate(args.count, args.invalid_share, rng)
+    hot = [rng.choice(cold[:args.hot_set]) for _ in range(args.count)]
+
+    for label, values in (('cold', cold), ('hot', hot)):
+        iban.clean.cache_clear()
+        with Timer() as legacy:
+            expected = [legacy_is_valid_iban(value) for value in values]
+        iban.clean.cache_clear()
+        with Timer() as single:
+            [iban.is_valid(value) for value in values]
+        iban.clean.cache_clear()
+        with Timer() as batch:
+            results = iban.validate_many(values)
+        # the registry only ever rejects more, never accepts what the checksum alone rejected
+        assert not any(result and not ok for result, ok in zip(results, expected))
+        print(f'{label}\tlegacy/s\t{len(values) / legacy.elapsed:,.0f}'
+              f'\tis_valid/s\t{len(values) / single.elapsed:,.0f}'
+              f'\tvalidate_many/s\t{len(values) / batch.elapsed:,.0f}'
+              f'\tvalid\t{sum(1 for r in results if r)}')
+
+
+if __name__ == '__main__':
+    main()
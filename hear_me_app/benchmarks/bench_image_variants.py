@@ -0,0 +1,64 @@
+"""
+Profile picture variant rendering throughput per core.
+
+Renders every variant (thumbnail/card/full in WebP and JPEG) for a set of
+synthetic photos with 1..N worker processes:
+
+    python -m benchmarks.bench_image_variants --images 24 --size 3000x2000
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image, ImageFilter
+
+from authentication.image_variants import render_variants
+
+from .utils import Timer
+
+
+def make_photo(path, width, height, seed):
+    # noise plus blur compresses roughly like a real photo, unlike a flat fill
+    rng = random.Random(seed)
+    small = Image.frombytes('RGB', (width // 8, height // 8), rng.randbytes(width // 8 * height // 8 * 3))
+    small.resize((width, height), Image.Resampling.BILINEAR).filter(ImageFilter.GaussianBlur(2)).save(path, 'JPEG', quality=90)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--images', type=int, default=24)
+    parser.add_argument('--size', default='3000x2000', help='source WIDTHxHEIGHT')
+    parser.add_argument('--workers', type=int, nargs='+', help='pool sizes to try (default 1..cpu_count)')
+    args = parser.parse_args()
+
+    width, height = (int(v) for v in args.size.split('x'))
+    workdir = tempfile.mkdtemp(prefix='hear_me_bench_variants_')
+    sources = []
+    for i in range(args.images):
+        path = os.path.join(workdir, f'src{i}.jpg')
+        make_photo(path, width, height, seed=i)
+        sources.append(path)
+
+    print('workers\timages_per_s\timages_per_s_per_core\tseconds')
+    for workers in args.workers or range(1, (os.cpu_count() or 1) + 1):
+        out_root = tempfile.mkdtemp(dir=workdir)
+        ctx = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+            # warm the workers so interpreter start-up is not measured
+            list(pool.map(abs, range(workers)))
+            with Timer() as timer:
+                list(pool.map(render_variants, sources, [out_root] * len(sources),
+                              [f'{i:064x}' for i in range(len(sources))]))
+        rate = len(sources) / timer.elapsed
+        print(f'{workers}\t{rate:.1f}\t{rate / workers:.1f}\t{timer.elapsed:.2f}')
+        shutil.rmtree(out_root)
+
+    shutil.rmtree(workdir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+"""
+Logging cost per register request, in the request thread.
+
+Each "request" logs the register payload twice, the way RegisterView and
+RegisterSerializer.validate did, to a file on disk:
+
+- ``sync_fstring``: the old code, INFO f-strings through a StreamHandler
+  that formats and writes in the calling thread
+- ``queue_info``: the same two records, ``%``-style, through core.log's
+  QueueHandler (redaction in the thread, JSON formatting and writes on the
+  listener); ``drain_ms`` is how long the listener needed afterwards
+- ``debug_lazy``: the current code, ``%``-style at DEBUG under an INFO
+  logger, so no record is made at all
+
+--sink-latency-ms delays every write, standing in for stdout piped to a
+log collector that is falling behind:
+
+    python -m benchmarks.bench_logging --requests 20000
+    python -m benchmarks.bench_logging --requests 2000 --sink-latency-ms 0.2
+"""
+import argparse
+import logging
+import os
+import tempfile
+import time
+
+from .utils import Timer, setup_django
+
+PAYLOAD = {
+    'role': 'influencer', 'username': 'sara', 'email': 'sara@example.com', 'phone_number': '0500000001',
+    'password': 'pass12345', 'full_name': 'Sara Travel', 'biography': 'travel vlogs ' * 10,
+}
+
+
+class SlowStream:
+    def __init__(self, stream, latency):
+        self.stream = stream
+        self.latency = latency
+
+    def write(self, data):
+        time.sleep(self.latency)
+        return self.stream.write(data)
+
+    def flush(self):
+        self.stream.flush()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--requests', type=int, default=20000)
+    parser.add_argument('--sink-latency-ms', type=float, default=0)
+    args = parser.parse_args()
+
+    setup_django(test_db=False)
+    from core import log
+
+    logger = logging.getLogger('benchmarks.logging')
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    fd, path = tempfile.mkstemp(prefix='hear_me_bench_log_')
+    os.close(fd)
+
+    def sync_fstring():
+        logger.info(f"RegisterView received data: {PAYLOAD}")
+        logger.info(f"Validating data: {PAYLOAD}")
+
+    def lazy_info():
+        logger.info("RegisterView received data: %s", PAYLOAD)
+        logger.info("Validating data: %s", PAYLOAD)
+
+    def lazy_debug():
+        logger.debug("RegisterView received data: %s", PAYLOAD)
+        logger.debug("Validating data: %s", PAYLOAD)
+
+    print('mode\tus_per_request\tdrain_ms')
+    with open(path, 'a') as stream:
+        if args.sink_latency_ms:
+            stream = SlowStream(stream, args.sink_latency_ms / 1000)
+        target = logging.StreamHandler(stream)
+        target.setFormatter(logging.Formatter('%(levelname)s %(name)s: %(message)s'))
+        logger.addHandler(target)
+        with Timer() as timer:
+            for _ in range(args.requests):
+                sync_fstring()
+        logger.removeHandler(target)
+        print('sync_fstring', f'{timer.elapsed / args.requests * 1e6:.1f}', '-', sep='\t')
+
+        target.setFormatter(log.JsonFormatter())
+        handler = log.QueueHandler([target], queue_size=2 * args.requests)
+        handler.addFilter(log.RedactingFilter())
+        logger.addHandler(handler)
+        handler.start()
+        with Timer() as timer:
+            for _ in range(args.requests):
+                lazy_info()
+        with Timer() as drain:
+            handler.flush()
+        handler.stop()
+        logger.removeHandler(handler)
+        print('queue_info', f'{timer.elapsed / args.requests * 1e6:.1f}', f'{drain.elapsed * 1000:.0f}', sep='\t')
+
+        logger.addHandler(target)
+        with Timer() as timer:
+            for _ in range(args.requests):
+                lazy_debug()
+        logger.removeHandler(target)
+        print('debug_lazy', f'{timer.elapsed / args.requests * 1e6:.2f}', '-', sep='\t')
+    os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+"""
+Media serving throughput and memory for large videos.
+
+Serves a large content-addressed video N times through three paths and
+writes the bytes to /dev/null:
+
+- ``static``: django.views.static.serve, the DEBUG-only helper used before
+- ``view``: core.views.MediaView, with the body read by Python in blocks
+- ``sendfile``: MediaView handed to an os.sendfile file wrapper, the way
+  gunicorn/uWSGI serve it through wsgi.file_wrapper
+
+It reports MB/s and peak Python allocations per request, then the request
+rate of 1 MB range requests, the kind of request a video player sends to seek:
+
+    python -m benchmarks.bench_media --size-mb 256 --requests 5
+"""
+import argparse
+import os
+import random
+import tracemalloc
+
+from .utils import Timer, setup_django
+
+RANGE_SIZE = 1024 * 1024
+
+
+def send(response, out_fd, sendfile):
+    """Write the response body to out_fd the way a WSGI server would."""
+    try:
+        file = getattr(response, 'file_to_stream', None)
+        if sendfile and file is not None and hasattr(file, 'fileno'):
+            fd = file.fileno()
+            offset = os.lseek(fd, 0, os.SEEK_CUR)
+            remaining = int(response['Content-Length'])
+            while remaining:
+                sent = os.sendfile(out_fd, fd, offset, remaining)
+                if not sent:
+                    break
+                offset += sent
+                remaining -= sent
+        else:
+            for chunk in response:
+                os.write(out_fd, chunk)
+    finally:
+        response.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--size-mb', type=int, default=256)
+    parser.add_argument('--requests', type=int, default=5)
+    parser.add_argument('--range-requests', type=int, default=200)
+    args = parser.parse_args()
+
+    setup_django(test_db=False)
+    from django.conf import settings
+    from django.test import RequestFactory
+    from django.views.static import serve
+
+    from core.views import MediaView
+
+    path = f'influencer_bio_videos/ab/{"ab" * 32}.mp4'
+    full_path = os.path.join(settings.MEDIA_ROOT, path)
+    os.makedirs(os.path.dirname(full_path))
+    with open(full_path, 'wb') as f:
+        block = os.urandom(1024 * 1024)
+        for _ in range(args.size_mb):
+            f.write(block)
+    size = os.path.getsize(full_path)
+
+    factory = RequestFactory()
+    view = MediaView.as_view()
+    modes = {
+        'static': (lambda request: serve(request, path, document_root=settings.MEDIA_ROOT), False),
+        'view': (lambda request: view(request, path=path), False),
+        'sendfile': (lambda request: view(request, path=path), True),
+    }
+    out_fd = os.open(os.devnull, os.O_WRONLY)
+    try:
+        print('mode\tMB/s\tpeak_python_kb\trange_req/s\trange_status')
+        for mode, (handler, sendfile) in modes.items():
+            with Timer() as timer:
+                for _ in range(args.requests):
+                    send(handler(factory.get('/media/' + path)), out_fd, sendfile)
+            throughput = args.requests * size / timer.elapsed / (1024 * 1024)
+
+            tracemalloc.start()
+            send(handler(factory.get('/media/' + path)), out_fd, sendfile)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+            # the static helper ignores Range and sends the whole file, so time fewer of them
+            requests = args.range_requests if mode != 'static' else max(1, args.requests)
+            with Timer() as timer:
+                for _ in range(requests):
+                    start = random.randrange(0, size - RANGE_SIZE)
+                    response = handler(factory.get('/media/' + path, headers={
+                        'Range': f'bytes={start}-{start + RANGE_SIZE - 1}'}))
+                    status = response.status_code
+                    send(response, out_fd, sendfile)
+            print(mode, f'{throughput:.0f}', f'{peak / 1024:.0f}', f'{requests / timer.elapsed:.1f}', status, sep='\t')
+    finally:
+        os.close(out_fd)
+
+
+if __name__ == '__main__':
+    main()
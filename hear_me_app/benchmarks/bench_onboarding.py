@@ -0,0 +1,75 @@
+"""
+Bulk onboarding import: rows per second and peak memory by file size.
+
+Writes a CSV of N influencer rows (a share of them invalid or duplicated),
+imports it with authentication.onboarding into an on-disk test database and
+reports throughput, queries and peak RSS growth, which should stay flat as
+N grows:
+
+    python -m benchmarks.bench_onboarding --rows 100000 --batch-size 500
+"""
+import argparse
+import csv
+import os
+import random
+import tempfile
+
+from .utils import Timer, peak_rss_mb, setup_django
+
+VALID_IBAN = 'SA0380000000608010167519'
+
+
+def write_csv(path, rows, bad_share, rng):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['phone_number', 'username', 'email', 'full_name', 'biography', 'category',
+                         'daily_price', 'weekly_price', 'bank_name', 'iban'])
+        for i in range(rows):
+            row = [f'05{i:08d}', f'agency{i}', f'agency{i}@example.com', f'Influencer {i}',
+                   'travel and food reviews', 'Travel', rng.randint(50, 5000), rng.randint(300, 30000),
+                   'Bank', VALID_IBAN]
+            if rng.random() < bad_share:
+                kind = rng.randrange(3)
+                if kind == 0:
+                    row[9] = 'SA0000000000000000000000'
+                elif kind == 1:
+                    row[0] = f'05{rng.randrange(max(i, 1)):08d}'  # duplicate of an earlier row
+                else:
+                    row[2] = 'not-an-email'
+            writer.writerow(row)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--batch-size', type=int, default=500)
+    parser.add_argument('--bad-share', type=float, default=0.02)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='hear_me_bench_import_')
+    setup_django(test_db_name=os.path.join(workdir, 'db.sqlite3'))
+    from django.conf import settings
+    from django.db import connection
+
+    from authentication.onboarding import import_influencers
+    from core.middleware import QueryUsage
+
+    # DEBUG keeps the last 9000 SQL statements in memory, which would look like growth
+    settings.DEBUG = False
+    path = os.path.join(workdir, 'influencers.csv')
+    write_csv(path, args.rows, args.bad_share, random.Random(3))
+
+    rss_before = peak_rss_mb()
+    usage = QueryUsage()
+    with open(path, 'rb') as stream, open(os.path.join(workdir, 'report.csv'), 'w', newline='') as report, \
+            connection.execute_wrapper(usage), Timer() as timer:
+        result = import_influencers(stream, 'csv', report=report, batch_size=args.batch_size)
+
+    print(f'rows\t{result.rows}\tcreated\t{result.created}\trejected\t{result.failed}'
+          f'\tseconds\t{timer.elapsed:.2f}\trows/s\t{result.rows / timer.elapsed:,.0f}'
+          f'\tqueries\t{usage.queries}'
+          f'\tpeak_rss_growth_mb\t{peak_rss_mb() - rss_before:.1f}')
+
+
+if __name__ == '__main__':
+    main()
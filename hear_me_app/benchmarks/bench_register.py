@@ -0,0 +1,71 @@
+"""
+Registration cost per request: latency and SQL queries, client vs influencer.
+
+Posts N registrations of each role to /api/register/ through the test client.
+PBKDF2 dominates real registrations, so by default the benchmark switches to
+a fast hasher to expose what the registration pipeline itself costs; pass
+--real-hasher to include it:
+
+    python -m benchmarks.bench_register --registrations 500
+"""
+import argparse
+import statistics
+
+from .utils import Timer, setup_django
+
+PHONE_PREFIXES = {'client': '051', 'influencer': '052'}
+
+
+def payload(role, i):
+    data = {
+        'role': role, 'username': f'{role}{i}', 'email': f'{role}{i}@example.com',
+        'phone_number': f'{PHONE_PREFIXES[role]}{i:07d}', 'password': 'bench-password-1',
+    }
+    if role == 'influencer':
+        data.update({
+            'full_name': f'Influencer {i}', 'biography': 'travel and food', 'category': 'Travel',
+            'daily_price': '100.00', 'weekly_price': '500.00', 'bank_name': 'Bank',
+            'iban': 'SA0380000000608010167519', 'instagram_acc_link': 'https://instagram.com/bench',
+        })
+    return data
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--registrations', type=int, default=500)
+    parser.add_argument('--real-hasher', action='store_true')
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+    from django.db import connection
+    from django.test import Client
+
+    from core.middleware import QueryUsage
+
+    if not args.real_hasher:
+        settings.PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+    settings.DEBUG = False
+    client = Client()
+
+    for role in ('client', 'influencer'):
+        latencies = []
+        usage = QueryUsage()
+        with connection.execute_wrapper(usage):
+            for i in range(args.registrations):
+                with Timer() as timer:
+                    response = client.post('/api/register/', payload(role, i), content_type='application/json')
+                assert response.status_code == 201, response.content
+                latencies.append(timer.elapsed)
+        latencies.sort()
+        print(f'{role}\tp50_ms\t{statistics.median(latencies) * 1000:.2f}'
+              f'\tp95_ms\t{latencies[int(len(latencies) * 0.95) - 1] * 1000:.2f}'
+              f'\tqueries/request\t{usage.queries / args.registrations:.1f}')
+
+    # a duplicate phone number must come back as a field error, not a 500
+    response = client.post('/api/register/', payload('client', 0), content_type='application/json')
+    print(f'duplicate\tstatus\t{response.status_code}\t{response.content.decode()[:120]}')
+
+
+if __name__ == '__main__':
+    main()
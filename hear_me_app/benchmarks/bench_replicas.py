@@ -0,0 +1,127 @@
+"""
+Read throughput under concurrent writes, primary only vs read replicas.
+
+Seeds a file-backed primary database, copies it to N replica files with
+SQLite's backup API (standing in for replication), then runs reader threads
+doing discovery-style queries against writer threads registering users, once
+with every read on the primary and once routed by core.db_router:
+
+    python -m benchmarks.bench_replicas --replicas 2 --readers 4 --writers 2 --seconds 5
+"""
+import argparse
+import os
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+
+from .utils import setup_django
+
+
+def copy_database(source, target):
+    with sqlite3.connect(source) as src, sqlite3.connect(target) as dst:
+        src.backup(dst)
+
+
+def run(seconds, readers, writers, offset):
+    from django.db import connections, transaction
+
+    from authentication.models import Influencer, User
+
+    stop = threading.Event()
+    read_latencies, write_counts, errors = [], [], []
+
+    def reader():
+        latencies = []
+        try:
+            while not stop.is_set():
+                start = time.perf_counter()
+                list(Influencer.objects.filter(status='approved', category='Travel')
+                     .order_by('daily_price', 'id').values('id', 'full_name', 'daily_price')[:20])
+                latencies.append(time.perf_counter() - start)
+        except Exception as e:
+            errors.append(e)
+        finally:
+            read_latencies.extend(latencies)
+            connections.close_all()
+
+    def writer(number):
+        count = 0
+        try:
+            while not stop.is_set():
+                i = offset + number * 1_000_000 + count
+                with transaction.atomic():
+                    user = User.objects.create(phone_number=f'{i:012d}', username=f'w{i}', email=f'w{i}@example.com',
+                                               role='influencer')
+                    Influencer.objects.create(user=user, full_name=f'Writer {i}', category='Travel')
+                count += 1
+        except Exception as e:
+            errors.append(e)
+        finally:
+            write_counts.append(count)
+            connections.close_all()
+
+    threads = [threading.Thread(target=reader) for _ in range(readers)]
+    threads += [threading.Thread(target=writer, args=(n,)) for n in range(writers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    if errors:
+        raise errors[0]
+    read_latencies.sort()
+    return {
+        'reads/s': len(read_latencies) / seconds,
+        'read_p50_ms': statistics.median(read_latencies) * 1000,
+        'read_p95_ms': read_latencies[int(len(read_latencies) * 0.95) - 1] * 1000,
+        'writes/s': sum(write_counts) / seconds,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--influencers', type=int, default=5000)
+    parser.add_argument('--replicas', type=int, default=2)
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--writers', type=int, default=2)
+    parser.add_argument('--seconds', type=float, default=5)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix='hear_me_bench_replicas_')
+    primary = os.path.join(directory, 'primary.sqlite3')
+    replicas = [os.path.join(directory, f'replica{n}.sqlite3') for n in range(1, args.replicas + 1)]
+    # read by settings.py to define the replica aliases
+    os.environ['HEAR_ME_DB_REPLICAS'] = ','.join(replicas)
+    setup_django(test_db_name=primary)
+    from django.conf import settings
+    from django.db import connections
+
+    from authentication.models import Influencer, User
+
+    settings.DEBUG = False
+    aliases = list(settings.DATABASE_REPLICAS)
+    users = User.objects.bulk_create(
+        User(phone_number=f'05{i:08d}', username=f'seed{i}', email=f'seed{i}@example.com', role='influencer')
+        for i in range(args.influencers)
+    )
+    Influencer.objects.bulk_create(
+        Influencer(user=user, full_name=f'Seed {i}', category=('Travel', 'Tech')[i % 2], status='approved',
+                   daily_price=100 + i % 500)
+        for i, user in enumerate(users)
+    )
+    connections.close_all()
+    for replica in replicas:
+        copy_database(primary, replica)
+
+    print('mode\treads/s\tread_p50_ms\tread_p95_ms\twrites/s')
+    for mode, routed_to in (('primary', []), ('replicas', aliases)):
+        settings.DATABASE_REPLICAS = routed_to
+        result = run(args.seconds, args.readers, args.writers, offset=len(routed_to) * 10_000_000)
+        print(mode, *(f'{value:.1f}' for value in result.values()), sep='\t')
+
+
+if __name__ == '__main__':
+    main()
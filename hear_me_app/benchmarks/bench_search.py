@@ -0,0 +1,84 @@
+"""
+Influencer full-text search: bulk rebuild time and query latency.
+
+Seeds N influencers with synthetic Arabic/English biographies (search signals
+are bypassed by bulk_create), rebuilds the index with the management command
+and times ranked prefix queries through GET /api/influencers/search/:
+
+    python -m benchmarks.bench_search --rows 1000000
+"""
+import argparse
+import random
+import statistics
+import time
+
+from .utils import Timer, setup_django
+
+WORDS = (
+    'سفر مغامرات طبخ رياضة تقنية ألعاب كوميديا موضة جمال صحة لياقة تصوير سيارات قهوة كتب موسيقى '
+    'travel food tech gaming comedy fashion beauty fitness photography cars coffee books music vlog review'
+).split()
+NAMES = 'أحمد محمد سارة نورة فهد ريم خالد ليلى Omar Sara Lina Adam Yousef Mona'.split()
+QUERIES = ['سفر', 'مغام', 'طبخ رياضة', 'أحمد', 'tech review', 'fit', 'قهوة كتب', 'Sara travel']
+
+
+def seed(rows, batch=5000):
+    from authentication.models import Influencer, User
+
+    rng = random.Random(11)
+    # biographies mix topic words (each in roughly 5-10% of rows) with a long tail of rare words
+    letters = 'ابتثجحخدذرزسشصضطظعغفقكلمنهوي'
+    tail = [''.join(rng.choices(letters, k=rng.randint(3, 7))) for _ in range(50000)]
+
+    def biography():
+        return ' '.join(
+            rng.choice(WORDS) if rng.random() < 0.15 else rng.choice(tail)
+            for _ in range(rng.randint(8, 30))
+        )
+    for start in range(0, rows, batch):
+        users = User.objects.bulk_create([
+            User(phone_number=f'05{i:09d}', username=f'bench{i}', email=f'bench{i}@example.com',
+                 role='influencer', password='!')
+            for i in range(start, min(start + batch, rows))
+        ])
+        Influencer.objects.bulk_create([
+            Influencer(
+                user=user,
+                status='approved',
+                full_name=f'{rng.choice(NAMES)} {rng.choice(NAMES)}',
+                biography=biography(),
+            )
+            for user in users
+        ])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.core.management import call_command
+    from django.test import Client
+
+    seed(args.rows)
+    with Timer() as rebuild:
+        call_command('rebuild_search_index', batch_size=5000, stdout=open('/dev/null', 'w'))
+    print(f'rebuild\t{args.rows} rows\t{rebuild.elapsed:.1f}s\t{args.rows / rebuild.elapsed:.0f} rows/s')
+
+    client = Client()
+    print('query\tp50_ms\tp95_ms\thits')
+    for query in QUERIES:
+        samples = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            response = client.get('/api/influencers/search/', {'q': query, 'limit': 20})
+            samples.append((time.perf_counter() - start) * 1000)
+        samples.sort()
+        hits = len(response.json()['results'])
+        print(f'{query}\t{statistics.median(samples):.2f}\t{samples[int(len(samples) * 0.95) - 1]:.2f}\t{hits}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""
+Refresh-token rotation: revocation checks, filter accuracy and refresh cost.
+
+Seeds N revoked tokens, then reports how fast the in-memory filter answers
+for unrevoked jtis, its measured false-positive rate (each one costs a
+lookup), and the latency and SQL queries of /api/token/refresh/:
+
+    python -m benchmarks.bench_token_refresh --revoked 100000
+"""
+import argparse
+import statistics
+import uuid
+from datetime import timedelta
+
+from .utils import Timer, setup_django
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--revoked', type=int, default=100_000)
+    parser.add_argument('--probes', type=int, default=100_000)
+    parser.add_argument('--refreshes', type=int, default=500)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+    from django.db import connection
+    from django.test import Client
+    from django.utils import timezone
+    from rest_framework_simplejwt.tokens import RefreshToken
+
+    from authentication import revocation
+    from authentication.models import RevokedToken, User
+    from core.middleware import QueryUsage
+
+    settings.DEBUG = False
+    expires_at = timezone.now() + timedelta(days=1)
+    RevokedToken.objects.bulk_create(
+        (RevokedToken(jti=uuid.uuid4().hex, expires_at=expires_at) for _ in range(args.revoked)), batch_size=5000,
+    )
+    with Timer() as load:
+        bloom = revocation.get_filter()
+    print(f'filter\tload_ms\t{load.elapsed * 1000:.1f}\tsize_kb\t{len(bloom.bits) / 1024:.0f}\thashes\t{bloom.hashes}')
+
+    probes = [uuid.uuid4().hex for _ in range(args.probes)]
+    with Timer() as timer:
+        false_positives = sum(jti in bloom for jti in probes)
+    print(f'probe\tns/check\t{timer.elapsed / args.probes * 1e9:.0f}'
+          f'\tfalse_positive_rate\t{false_positives / args.probes:.5f}')
+
+    user = User.objects.create_user(phone_number='0500000000', username='bench', email='bench@example.com',
+                                    password='bench-password-1')
+    client = Client()
+    token = str(RefreshToken.for_user(user))
+    latencies = []
+    usage = QueryUsage()
+    with connection.execute_wrapper(usage):
+        for _ in range(args.refreshes):
+            with Timer() as timer:
+                response = client.post('/api/token/refresh/', {'refresh_token': token}, content_type='application/json')
+            assert response.status_code == 200, response.content
+            token = response.json()['refresh_token']
+            latencies.append(timer.elapsed)
+    latencies.sort()
+    print(f'refresh\tp50_ms\t{statistics.median(latencies) * 1000:.2f}'
+          f'\tp95_ms\t{latencies[int(len(latencies) * 0.95) - 1] * 1000:.2f}'
+          f'\tqueries/request\t{usage.queries / args.refreshes:.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""
+Upload admission control (core.admission): its cost, and what it saves.
+
+1. ``admit_us``: admit() + release() for one request, i.e. the per-upload
+   overhead (a slot key taken and freed per limit, and a statvfs per upload
+   path).
+2. An anonymous profile-picture POST bigger than the view accepts, with
+   admission on (413 from Content-Length) and with the size cap lifted
+   (the body is parsed, spooled to disk and stored). Under WSGI the
+   rejected body is never read. Django's ASGI handler spools the whole
+   body before any view runs, so there only the parsing and storing are
+   saved; a front proxy limit is still needed to keep those bytes out:
+
+    python -m benchmarks.bench_upload_admission --size-mb 64
+"""
+import argparse
+import os
+
+from .utils import Timer, setup_django
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--size-mb', type=int, default=64)
+    parser.add_argument('--iterations', type=int, default=10000)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+    from django.contrib.auth.models import AnonymousUser
+    from django.core.files.uploadedfile import SimpleUploadedFile
+    from django.test import RequestFactory
+    from django.test.client import BOUNDARY, MULTIPART_CONTENT, encode_multipart
+
+    from authentication.views import ProfilePictureUploadView
+    from core import admission
+
+    from .transports import TRANSPORTS
+
+    settings.DEBUG = False
+    request = RequestFactory().post('/', b'x' * 1024, content_type='application/octet-stream')
+    request.user = AnonymousUser()
+    with Timer() as timer:
+        for _ in range(args.iterations):
+            admission.admit(request, 1024 * 1024).release()
+    print(f'admit_us\t{timer.elapsed / args.iterations * 1e6:.1f}')
+
+    # the file part only has to be big
+    body = encode_multipart(BOUNDARY, {
+        'profile_picture': SimpleUploadedFile('big.png', os.urandom(1024 * 1024) * args.size_mb, 'image/png'),
+    })
+    limit = ProfilePictureUploadView.upload_max_body
+    print('transport\tadmission\tsize_mb\tstatus\tms')
+    try:
+        for transport_class in TRANSPORTS.values():
+            transport = transport_class()
+            for name, max_body in (('on', limit), ('off', 2 ** 62)):
+                ProfilePictureUploadView.upload_max_body = max_body
+                with Timer() as timer:
+                    status = transport.request('POST', '/api/influencer/upload/profile-picture/', body,
+                                               MULTIPART_CONTENT)
+                print(transport.name, name, args.size_mb, status, f'{timer.elapsed * 1000:.1f}', sep='\t')
+            transport.close()
+    finally:
+        ProfilePictureUploadView.upload_max_body = limit
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+"""
+Peak RSS of a bio-video upload as a function of file size.
+
+Each size runs in a fresh interpreter so ru_maxrss reflects that upload alone.
+The multipart body is generated lazily, so the only large buffers are the ones
+the upload path itself creates. Compare ``--mode streaming`` (the current path)
+with ``--mode buffered`` (the old ``ContentFile(f.read())`` path):
+
+    python -m benchmarks.bench_upload_streaming --sizes 16 64 256
+"""
+import argparse
+import subprocess
+import sys
+
+from .utils import Timer, peak_rss_mb, setup_django
+
+BOUNDARY = 'BenchBoundary7MA4YWxkTrZu0gW'
+CHUNK = b'\0' * (1024 * 1024)
+
+
+class MultipartBody:
+    """A read()-able multipart body with a single file part of `size` bytes."""
+
+    def __init__(self, size, filename='bench.mp4'):
+        head = (
+            f'--{BOUNDARY}\r\n'
+            f'Content-Disposition: form-data; name="bio_videos"; filename="{filename}"\r\n'
+            'Content-Type: video/mp4\r\n\r\n'
+        ).encode()
+        tail = f'\r\n--{BOUNDARY}--\r\n'.encode()
+        self.length = len(head) + size + len(tail)
+        self._parts = iter([head, *self._payload(size), tail])
+        self._pending = b''
+
+    @staticmethod
+    def _payload(size):
+        while size > 0:
+            step = min(size, len(CHUNK))
+            yield CHUNK[:step]
+            size -= step
+
+    def read(self, size=-1):
+        while size < 0 or len(self._pending) < size:
+            part = next(self._parts, None)
+            if part is None:
+                break
+            self._pending += part
+        if size < 0:
+            size = len(self._pending)
+        data, self._pending = self._pending[:size], self._pending[size:]
+        return data
+
+
+def run_one(size_mb, mode):
+    setup_django()
+    from django.core.files.base import ContentFile
+    from django.core.files.storage import default_storage
+    from django.http.multipartparser import MultiPartParser
+    from django.http import HttpRequest
+
+    from authentication import media_store
+
+    body = MultipartBody(size_mb * 1024 * 1024)
+    meta = {
+        'CONTENT_TYPE': f'multipart/form-data; boundary={BOUNDARY}',
+        'CONTENT_LENGTH': str(body.length),
+    }
+    baseline = peak_rss_mb()
+    with Timer() as timer:
+        handlers = HttpRequest().upload_handlers
+        _, files = MultiPartParser(meta, body, handlers).parse()
+        f = files['bio_videos']
+        if mode == 'streaming':
+            media_store.put(f, 'influencer_bio_videos')
+        else:
+            default_storage.save('influencer_bio_videos/bench.mp4', ContentFile(f.read()))
+        f.close()
+    print(f'{size_mb}\t{mode}\t{peak_rss_mb():.1f}\t{peak_rss_mb() - baseline:.1f}\t{timer.elapsed:.3f}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[8, 32, 128], help='file sizes in MB')
+    parser.add_argument('--mode', choices=['streaming', 'buffered', 'both'], default='both')
+    parser.add_argument('--child', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child is not None:
+        run_one(args.child, args.mode)
+        return
+
+    modes = ['streaming', 'buffered'] if args.mode == 'both' else [args.mode]
+    print('size_mb\tmode\tpeak_rss_mb\tgrowth_mb\tseconds')
+    for mode in modes:
+        for size in args.sizes:
+            subprocess.run(
+                [sys.executable, '-m', 'benchmarks.bench_upload_streaming', '--child', str(size), '--mode', mode],
+                check=True,
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,235 @@
+"""
+HTTP benchmark suite for the register, login and upload endpoints.
+
+Runs each endpoint N times through the Django test client and through the
+ASGI application driven in-process (see transports.py), against a throwaway
+test database. Reports p50/p95/p99 latency, throughput, SQL queries per
+request (from core.middleware) and peak Python memory per request, then
+compares with benchmarks/baselines.json:
+
+    python -m benchmarks.http_suite                      # compare, exit 1 on regression
+    python -m benchmarks.http_suite --threshold 0.5      # tolerate +50% instead of +25%
+    python -m benchmarks.http_suite --update-baselines   # record this machine's numbers
+
+Latency and throughput baselines are only comparable on the machine that
+recorded them; query counts are exact everywhere.
+"""
+import argparse
+import io
+import json
+import os
+import statistics
+import sys
+import tracemalloc
+from dataclasses import dataclass
+from typing import Callable
+
+from .transports import TRANSPORTS
+from .utils import Timer, setup_django
+
+BASELINES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines.json')
+BOUNDARY = 'BenchBoundary'
+PASSWORD = 'bench-password-1'
+
+# metric -> True when a larger value is worse
+METRICS = {
+    'p50_ms': True,
+    'p95_ms': True,
+    'p99_ms': True,
+    'rps': False,
+    'queries': True,
+    'peak_kb': True,
+}
+
+
+@dataclass
+class Endpoint:
+    name: str
+    url_name: str
+    method: str
+    # i -> (body bytes, content type)
+    body: Callable[[int], tuple]
+    expected_status: int
+
+
+def json_body(data):
+    return json.dumps(data).encode(), 'application/json'
+
+
+def multipart_body(data):
+    from django.test.client import encode_multipart
+
+    return encode_multipart(BOUNDARY, data), f'multipart/form-data; boundary={BOUNDARY}'
+
+
+def registration(i):
+    # request numbers are unique across the whole run, so every registration is a new user
+    return json_body({
+        'role': 'client', 'username': f'user{i}', 'email': f'user{i}@example.com',
+        'phone_number': f'051{i:07d}', 'password': PASSWORD,
+    })
+
+
+def png(i, size=256):
+    from django.core.files.uploadedfile import SimpleUploadedFile
+    from PIL import Image
+
+    buffer = io.BytesIO()
+    # a different picture each time so content-addressed storage cannot deduplicate it
+    Image.new('RGB', (size, size), ((i * 7) % 256, (i * 13) % 256, (i * 29) % 256)).save(buffer, 'PNG')
+    return SimpleUploadedFile(f'avatar{i}.png', buffer.getvalue(), content_type='image/png')
+
+
+def video(i, size):
+    from django.core.files.uploadedfile import SimpleUploadedFile
+
+    from authentication.testing import mp4_bytes
+
+    # a valid MP4 of `size` bytes in total; uploads are probed (see video_probe)
+    media = i.to_bytes(8, 'big') + os.urandom(size - len(mp4_bytes()) - 8)
+    return SimpleUploadedFile(f'clip{i}.mp4', mp4_bytes(media=media), content_type='video/mp4')
+
+
+def endpoints(video_size):
+    login = {'phone_number': '0500000000', 'password': PASSWORD, 'role': 'client'}
+    return [
+        Endpoint('register', 'register', 'POST', registration, 201),
+        Endpoint('register-async', 'register-async', 'POST', registration, 201),
+        Endpoint('login', 'login', 'POST', lambda i: json_body(login), 200),
+        Endpoint('login-async', 'login-async', 'POST', lambda i: json_body(login), 200),
+        Endpoint('upload-profile-picture', 'upload-profile-picture', 'POST',
+                 lambda i: multipart_body({'profile_picture': png(i)}), 201),
+        Endpoint('upload-bio-videos', 'upload-bio-videos', 'POST',
+                 lambda i: multipart_body({'bio_videos': video(i, video_size)}), 201),
+    ]
+
+
+def percentile(sorted_values, fraction):
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def measure(transport, endpoint, path, iterations, offset):
+    from core import middleware
+
+    requests = [endpoint.body(offset + i) for i in range(iterations)]
+    latencies = []
+    middleware.reset_stats()
+    with Timer() as total:
+        for body, content_type in requests:
+            with Timer() as timer:
+                status = transport.request(endpoint.method, path, body, content_type)
+            if status != endpoint.expected_status:
+                raise RuntimeError(f'{endpoint.name} via {transport.name} returned {status}')
+            latencies.append(timer.elapsed)
+    recorded = middleware.stats().get(endpoint.url_name, {})
+    latencies.sort()
+    return {
+        'p50_ms': percentile(latencies, 0.50) * 1000,
+        'p95_ms': percentile(latencies, 0.95) * 1000,
+        'p99_ms': percentile(latencies, 0.99) * 1000,
+        'rps': iterations / total.elapsed,
+        'queries': recorded.get('queries', 0) / max(recorded.get('requests', 0), 1),
+    }
+
+
+def peak_memory_kb(transport, endpoint, path, iterations, offset):
+    # traced separately so the tracing overhead does not skew latency
+    peaks = []
+    for i in range(iterations):
+        body, content_type = endpoint.body(offset + i)
+        tracemalloc.start()
+        transport.request(endpoint.method, path, body, content_type)
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return statistics.median(peaks) / 1024
+
+
+def compare(results, baselines, threshold):
+    """Yields (transport, endpoint, metric, baseline, current) for every regression beyond `threshold`."""
+    for transport, by_endpoint in results.items():
+        for name, metrics in by_endpoint.items():
+            baseline = baselines.get(transport, {}).get(name)
+            if not baseline:
+                continue
+            for metric, larger_is_worse in METRICS.items():
+                if metric not in baseline:
+                    continue
+                old, new = baseline[metric], metrics[metric]
+                if metric == 'queries':
+                    regressed = new > old
+                elif larger_is_worse:
+                    regressed = new > old * (1 + threshold)
+                else:
+                    regressed = new < old / (1 + threshold)
+                if regressed:
+                    yield transport, name, metric, old, new
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--iterations', type=int, default=20)
+    parser.add_argument('--warmup', type=int, default=2)
+    parser.add_argument('--memory-iterations', type=int, default=3)
+    parser.add_argument('--transport', choices=sorted(TRANSPORTS), action='append',
+                        help='repeatable; defaults to all transports')
+    parser.add_argument('--endpoint', action='append', help='repeatable; defaults to all endpoints')
+    parser.add_argument('--video-size', type=int, default=1024 * 1024)
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='relative slowdown tolerated before flagging a regression')
+    parser.add_argument('--baselines', default=BASELINES_PATH)
+    parser.add_argument('--update-baselines', action='store_true')
+    args = parser.parse_args()
+
+    setup_django()
+    from django.urls import reverse
+
+    from authentication.models import User
+
+    User.objects.create_user(phone_number='0500000000', username='bench', email='bench@example.com',
+                             password=PASSWORD, role='client')
+
+    selected = [e for e in endpoints(args.video_size) if not args.endpoint or e.name in args.endpoint]
+    results = {}
+    offset = 0
+    print('transport\tendpoint\tp50_ms\tp95_ms\tp99_ms\trps\tqueries\tpeak_kb')
+    for transport_name in args.transport or sorted(TRANSPORTS):
+        transport = TRANSPORTS[transport_name]()
+        results[transport_name] = {}
+        for endpoint in selected:
+            path = reverse(endpoint.url_name)
+            for i in range(args.warmup):
+                transport.request(endpoint.method, path, *endpoint.body(offset + i))
+            offset += args.warmup
+            metrics = measure(transport, endpoint, path, args.iterations, offset)
+            offset += args.iterations
+            metrics['peak_kb'] = peak_memory_kb(transport, endpoint, path, args.memory_iterations, offset)
+            offset += args.memory_iterations
+            results[transport_name][endpoint.name] = {key: round(value, 2) for key, value in metrics.items()}
+            print(transport_name, endpoint.name, *(f'{metrics[m]:.2f}' for m in METRICS), sep='\t')
+        transport.close()
+
+    baselines = {}
+    if os.path.exists(args.baselines):
+        with open(args.baselines) as f:
+            baselines = json.load(f)
+
+    if args.update_baselines:
+        for transport_name, by_endpoint in results.items():
+            baselines.setdefault(transport_name, {}).update(by_endpoint)
+        with open(args.baselines, 'w') as f:
+            json.dump(baselines, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f'baselines written to {args.baselines}')
+        return
+
+    regressions = list(compare(results, baselines, args.threshold))
+    for transport_name, name, metric, old, new in regressions:
+        print(f'REGRESSION\t{transport_name}\t{name}\t{metric}\t{old} -> {new:.2f}')
+    if regressions:
+        sys.exit(1)
+    print('no regressions' if baselines else 'no baselines to compare against (use --update-baselines)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""
+Ways to send a request to the app without a network.
+
+Both transports take the same raw request (method, path, body bytes,
+content type, extra headers) and return the status code, so a benchmark can
+run the same workload through WSGI-style dispatch (the Django test client)
+and through the project's ASGI application (hear_me_app/asgi.py), driven
+in-process the way an ASGI server would.
+"""
+import asyncio
+
+BODY_CHUNK_SIZE = 64 * 1024
+
+
+class TestClientTransport:
+    name = 'client'
+
+    def __init__(self):
+        from django.test import Client
+
+        self.client = Client()
+
+    def request(self, method, path, body=b'', content_type='application/octet-stream', headers=None):
+        response = self.client.generic(method, path, data=body, content_type=content_type, headers=headers)
+        return response.status_code
+
+    def close(self):
+        pass
+
+
+class ASGITransport:
+    name = 'asgi'
+
+    def __init__(self):
+        from hear_me_app.asgi import application
+
+        self.application = application
+        self.loop = asyncio.new_event_loop()
+
+    def request(self, method, path, body=b'', content_type='application/octet-stream', headers=None):
+        return self.loop.run_until_complete(self.arequest(method, path, body, content_type, headers))
+
+    async def arequest(self, method, path, body=b'', content_type='application/octet-stream', headers=None):
+        path, _, query = path.partition('?')
+        raw_headers = [
+            (b'host', b'testserver'),
+            (b'content-type', content_type.encode()),
+            (b'content-length', str(len(body)).encode()),
+        ] + [(key.lower().encode(), value.encode()) for key, value in (headers or {}).items()]
+        scope = {
+            'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+            'method': method, 'scheme': 'http', 'path': path, 'raw_path': path.encode(),
+            'query_string': query.encode(), 'root_path': '', 'headers': raw_headers,
+            'client': ('127.0.0.1', 50000), 'server': ('testserver', 80),
+        }
+
+        # the body arrives in chunks like it would from a socket; after it, the client
+        # "disconnects" only once the response is complete
+        chunks = [body[i:i + BODY_CHUNK_SIZE] for i in range(0, len(body), BODY_CHUNK_SIZE)] or [b'']
+        done = asyncio.Event()
+        response = {}
+
+        async def receive():
+            if chunks:
+                chunk = chunks.pop(0)
+                return {'type': 'http.request', 'body': chunk, 'more_body': bool(chunks)}
+            await done.wait()
+            return {'type': 'http.disconnect'}
+
+        async def send(message):
+            if message['type'] == 'http.response.start':
+                response['status'] = message['status']
+            elif message['type'] == 'http.response.body' and not message.get('more_body'):
+                done.set()
+
+        await self.application(scope, receive, send)
+        done.set()
+        return response.get('status')
+
+    def close(self):
+        self.loop.close()
+
+
+TRANSPORTS = {transport.name: transport for transport in (TestClientTransport, ASGITransport)}
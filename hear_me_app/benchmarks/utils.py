@@ -0,0 +1,53 @@
+"""
+Shared setup for the offline benchmarks.
+
+Run any benchmark from the directory holding manage.py, e.g.
+``python -m benchmarks.bench_upload_streaming``.
+"""
+import os
+import resource
+import sys
+import tempfile
+import time
+
+
+def setup_django(test_db=True, test_db_name=None):
+    """
+    Configure Django against a throwaway test database and media directory.
+
+    The test database is in memory unless `test_db_name` gives a file path.
+    """
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'hear_me_app.settings')
+
+    import django
+    from django.conf import settings
+
+    django.setup()
+    settings.MEDIA_ROOT = tempfile.mkdtemp(prefix='hear_me_bench_media_')
+    settings.FILE_UPLOAD_TEMP_DIR = tempfile.mkdtemp(prefix='hear_me_bench_tmp_')
+    settings.ALLOWED_HOSTS = ['*']
+
+    if test_db:
+        from django.db import connection
+        from django.test.utils import setup_test_environment
+
+        setup_test_environment()
+        if test_db_name:
+            connection.settings_dict['TEST']['NAME'] = test_db_name
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB (ru_maxrss is KB on Linux)."""
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return usage / (1024 * 1024) if sys.platform == 'darwin' else usage / 1024
+
+
+class Timer:
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed = time.perf_counter() - self.start
@@ -1,3 +1,9 @@
 from django.contrib import admin
+from .models import Job
 
-# Register your models here.
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('task', 'queue', 'status', 'attempts', 'max_attempts', 'run_after', 'created_at')
+    list_filter = ('status', 'queue', 'task')
+    readonly_fields = ('locked_at', 'locked_by', 'last_error', 'created_at')
@@ -0,0 +1,212 @@
+"""
+Admission control for upload endpoints (see UploadAdmissionMixin).
+
+An upload is admitted or turned away after authentication but before its
+body is read, so a rejected request costs no disk and no parsing:
+
+- no usable Content-Length: 411; more than the view accepts: 413
+- less than UPLOAD_DISK_RESERVE bytes would be left free after the body
+  lands under MEDIA_ROOT, the upload temp dir or UPLOAD_SESSIONS_ROOT: 503
+- the user (or the client address, when anonymous) already has
+  UPLOAD_MAX_PER_USER uploads in flight: 429
+- UPLOAD_MAX_IN_FLIGHT uploads are in flight overall: 503
+
+429 and 503 carry Retry-After. A limit of N is N slot keys in the cache
+(``<key>:0`` to ``<key>:N-1``); an upload takes a free one with cache.add()
+and deletes it when done, so with a shared cache the limits hold across
+worker processes. Every slot key expires SLOT_TIMEOUT seconds after it was
+taken. A worker that dies holding a slot therefore loses only that slot,
+and only for a while, and no count can drift below zero or stay inflated.
+"""
+import shutil
+import tempfile
+import threading
+import uuid
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.exceptions import APIException, Throttled
+
+DEFAULT_MAX_IN_FLIGHT = 8
+DEFAULT_MAX_PER_USER = 2
+DEFAULT_DISK_RESERVE = 1024 * 1024 * 1024  # bytes
+DEFAULT_RETRY_AFTER = 5  # seconds
+SLOT_TIMEOUT = 30 * 60
+# multipart boundaries and part headers on top of the file bytes
+MULTIPART_OVERHEAD = 64 * 1024
+GLOBAL_KEY = 'uploads:in-flight'
+BODY_METHODS = ('POST', 'PUT', 'PATCH')
+
+_stats = Counter()
+_stats_lock = threading.Lock()
+
+
+class LengthRequired(APIException):
+    status_code = status.HTTP_411_LENGTH_REQUIRED
+    default_detail = "Content-Length required."
+    default_code = 'length_required'
+
+
+class BodyTooLarge(APIException):
+    status_code = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    default_detail = "Request body too large."
+    default_code = 'too_large'
+
+
+class UploadsSaturated(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = "Too many uploads in progress, try again later."
+    default_code = 'saturated'
+
+    def __init__(self, detail=None, wait=None):
+        super().__init__(detail)
+        # DRF's exception handler turns `wait` into Retry-After
+        self.wait = wait
+
+
+def _count(name):
+    with _stats_lock:
+        _stats[name] += 1
+
+
+def max_in_flight():
+    return getattr(settings, 'UPLOAD_MAX_IN_FLIGHT', DEFAULT_MAX_IN_FLIGHT)
+
+
+def max_per_user():
+    return getattr(settings, 'UPLOAD_MAX_PER_USER', DEFAULT_MAX_PER_USER)
+
+
+def stats():
+    """Admitted/rejected counters of this process, plus uploads in flight across processes."""
+    with _stats_lock:
+        counters = dict(_stats)
+    return {"in_flight": in_flight(GLOBAL_KEY, max_in_flight()), "counters": counters}
+
+
+def reset_stats():
+    with _stats_lock:
+        _stats.clear()
+
+
+def retry_after():
+    return getattr(settings, 'UPLOAD_RETRY_AFTER', DEFAULT_RETRY_AFTER)
+
+
+def upload_paths():
+    """Where an upload's bytes are written before they settle in storage."""
+    paths = [settings.MEDIA_ROOT, getattr(settings, 'FILE_UPLOAD_TEMP_DIR', None) or tempfile.gettempdir()]
+    sessions_root = getattr(settings, 'UPLOAD_SESSIONS_ROOT', None)
+    if sessions_root:
+        paths.append(sessions_root)
+    return paths
+
+
+def has_room(length, paths=None):
+    """True if `length` more bytes leave at least UPLOAD_DISK_RESERVE free on every path."""
+    reserve = getattr(settings, 'UPLOAD_DISK_RESERVE', DEFAULT_DISK_RESERVE)
+    for path in paths or upload_paths():
+        try:
+            free = shutil.disk_usage(path).free
+        except FileNotFoundError:
+            # not created yet; its parent is on the same filesystem in every layout we use
+            continue
+        if free - length < reserve:
+            return False
+    return True
+
+
+def slot_keys(key, limit):
+    return [f'{key}:{index}' for index in range(limit)]
+
+
+def in_flight(key, limit):
+    """How many of the `limit` slots of `key` are taken."""
+    return len(cache.get_many(slot_keys(key, limit)))
+
+
+def _acquire(key, limit):
+    """Take a free slot of `key`; returns ``(slot_key, token)``, or None if all `limit` are taken."""
+    token = uuid.uuid4().hex
+    for slot in slot_keys(key, limit):
+        if cache.add(slot, token, SLOT_TIMEOUT):
+            return slot, token
+    return None
+
+
+def _release(slot, token):
+    # past SLOT_TIMEOUT the slot may have expired and been taken by another upload; leave that one alone
+    if cache.get(slot) == token:
+        cache.delete(slot)
+
+
+class Slot:
+    """An admitted upload; release() once the request is done with its body."""
+
+    def __init__(self, *slots):
+        self.slots = slots
+
+    def release(self):
+        for slot, token in self.slots:
+            _release(slot, token)
+        self.slots = ()
+
+
+def client_key(request):
+    if request.user.is_authenticated:
+        return f'uploads:in-flight:user:{request.user.pk}'
+    return f"uploads:in-flight:addr:{request.META.get('REMOTE_ADDR', '')}"
+
+
+def admit(request, max_body):
+    """Return a Slot for this upload or raise the APIException that turns it away."""
+    length = request.META.get('CONTENT_LENGTH', '')
+    if not length.isdigit():
+        _count('rejected_length_required')
+        raise LengthRequired()
+    length = int(length)
+    if length > max_body:
+        _count('rejected_too_large')
+        raise BodyTooLarge(f"Request body too large. Max is {max_body} bytes.")
+    if not has_room(length):
+        _count('rejected_disk_full')
+        raise UploadsSaturated("Not enough storage space for this upload right now.", wait=retry_after())
+
+    user_slot = _acquire(client_key(request), max_per_user())
+    if user_slot is None:
+        _count('rejected_per_user')
+        raise Throttled(wait=retry_after(), detail="You have too many uploads in progress.")
+    global_slot = _acquire(GLOBAL_KEY, max_in_flight())
+    if global_slot is None:
+        _release(*user_slot)
+        _count('rejected_saturated')
+        raise UploadsSaturated(wait=retry_after())
+    _count('admitted')
+    return Slot(user_slot, global_slot)
+
+
+class UploadAdmissionMixin:
+    """
+    For APIViews that take upload bodies: requests with a body are admitted
+    (see admit()) after authentication and before the body is parsed, and
+    hold their slot until the view returns.
+    """
+    upload_max_body = None  # bytes, Content-Length included
+
+    def get_upload_max_body(self):
+        return self.upload_max_body
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method in BODY_METHODS:
+            self.upload_slot = admit(request, self.get_upload_max_body())
+
+    def dispatch(self, request, *args, **kwargs):
+        self.upload_slot = None
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        finally:
+            if self.upload_slot is not None:
+                self.upload_slot.release()
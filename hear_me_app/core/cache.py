@@ -0,0 +1,119 @@
+"""
+Read-through caching with versioned invalidation and stampede protection.
+
+Cached values live under keys that embed a version number, and invalidating
+a namespace just bumps its version. A rebuild that started before the bump
+therefore writes to a key nobody reads any more instead of resurrecting stale
+data. On a miss only one caller rebuilds: threads in a process wait on a
+local lock and other processes wait on a short-lived ``cache.add`` lock.
+"""
+import threading
+import time
+from collections import Counter
+
+from django.core.cache import cache
+
+_MISSING = object()
+LOCK_TIMEOUT = 10
+WAIT_TIMEOUT = 2.0
+WAIT_INTERVAL = 0.02
+
+_stats = Counter()
+_stats_lock = threading.Lock()
+_key_locks = {}
+_key_locks_lock = threading.Lock()
+
+
+def _count(name):
+    with _stats_lock:
+        _stats[name] += 1
+
+
+def stats():
+    """Hit/miss/rebuild counters of this process since start (or the last reset)."""
+    with _stats_lock:
+        return dict(_stats)
+
+
+def reset_stats():
+    with _stats_lock:
+        _stats.clear()
+
+
+def get_version(namespace):
+    return cache.get_or_set(f'version:{namespace}', 1, timeout=None)
+
+
+def bump_version(*namespaces):
+    for namespace in namespaces:
+        try:
+            cache.incr(f'version:{namespace}')
+        except ValueError:
+            # not cached yet (or evicted): any fresh value invalidates old keys
+            cache.set(f'version:{namespace}', int(time.time() * 1000), timeout=None)
+
+
+def versioned_key(namespace, key):
+    return f'{namespace}:v{get_version(namespace)}:{key}'
+
+
+def _local_lock(key):
+    with _key_locks_lock:
+        lock = _key_locks.get(key)
+        if lock is None:
+            lock = _key_locks[key] = threading.Lock()
+        return lock
+
+
+def _release_local_lock(key, lock):
+    with _key_locks_lock:
+        if _key_locks.get(key) is lock and not lock.locked():
+            del _key_locks[key]
+
+
+def get_or_build(key, builder, timeout=300):
+    """
+    Return the cached value for `key`, calling `builder()` once on a miss.
+
+    Returns ``(value, hit)``. Concurrent misses for the same key share one
+    rebuild; waiters fall back to building themselves if the rebuilding
+    caller takes longer than WAIT_TIMEOUT.
+    """
+    value = cache.get(key, _MISSING)
+    if value is not _MISSING:
+        _count('hits')
+        return value, True
+    _count('misses')
+
+    lock = _local_lock(key)
+    try:
+        with lock:
+            value = cache.get(key, _MISSING)
+            if value is not _MISSING:
+                _count('coalesced')
+                return value, False
+
+            lock_key = f'lock:{key}'
+            if cache.add(lock_key, 1, LOCK_TIMEOUT):
+                try:
+                    value = builder()
+                    cache.set(key, value, timeout)
+                    _count('rebuilds')
+                finally:
+                    cache.delete(lock_key)
+                return value, False
+
+            # another process is rebuilding; wait briefly for its result
+            deadline = time.monotonic() + WAIT_TIMEOUT
+            while time.monotonic() < deadline:
+                time.sleep(WAIT_INTERVAL)
+                value = cache.get(key, _MISSING)
+                if value is not _MISSING:
+                    _count('coalesced')
+                    return value, False
+            _count('rebuilds')
+            value = builder()
+            cache.set(key, value, timeout)
+            return value, False
+    finally:
+        _release_local_lock(key, lock)
@@ -0,0 +1,109 @@
+"""
+Primary/replica database routing.
+
+PrimaryReplicaRouter sends writes to ``default`` and reads to one of the
+aliases in DATABASE_REPLICAS, picked at random per query. Reads go to the
+primary instead when:
+
+- the primary has a transaction open (read-your-writes inside atomic()),
+- the code runs under ``use_primary()`` (a context manager and decorator),
+- the view sets ``use_primary = True`` (see PrimaryPinMiddleware), or
+- the request is not a safe method, or the client wrote something within
+  the last REPLICA_PIN_SECONDS. Replicas lag behind the primary, so after a
+  write PrimaryPinMiddleware sets a short-lived cookie that keeps that
+  client's reads on the primary until the replicas have caught up.
+
+With no replicas configured every query goes to ``default``, as before.
+"""
+import random
+from contextlib import ContextDecorator
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+PIN_COOKIE = 'primary_pin'
+DEFAULT_PIN_SECONDS = 5
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+class _RequestState:
+    def __init__(self, pinned=False):
+        self.pinned = pinned
+        self.wrote = False
+
+
+_request_state = ContextVar('db_router_request_state', default=None)
+_primary_depth = ContextVar('db_router_primary_depth', default=0)
+
+
+def replica_aliases():
+    return getattr(settings, 'DATABASE_REPLICAS', [])
+
+
+def pin_seconds():
+    return getattr(settings, 'REPLICA_PIN_SECONDS', DEFAULT_PIN_SECONDS)
+
+
+class use_primary(ContextDecorator):
+    """Route reads in this block (or decorated function) to the primary."""
+
+    # a counter rather than reset tokens, so one decorator instance can be entered concurrently
+    def __enter__(self):
+        _primary_depth.set(_primary_depth.get() + 1)
+        return self
+
+    def __exit__(self, *exc):
+        _primary_depth.set(_primary_depth.get() - 1)
+
+
+def reads_pinned():
+    state = _request_state.get()
+    return (
+        _primary_depth.get() > 0
+        or (state is not None and state.pinned)
+        or connections[DEFAULT_DB_ALIAS].in_atomic_block
+    )
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        replicas = replica_aliases()
+        if not replicas or reads_pinned():
+            return DEFAULT_DB_ALIAS
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        state = _request_state.get()
+        if state is not None:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        aliases = {DEFAULT_DB_ALIAS, *replica_aliases()}
+        return obj1._state.db in aliases and obj2._state.db in aliases
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # replicas get their schema from the primary
+        return db not in replica_aliases()
+
+
+class PrimaryPinMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        state = _RequestState(pinned=request.method not in SAFE_METHODS or PIN_COOKIE in request.COOKIES)
+        token = _request_state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _request_state.reset(token)
+        if state.wrote and replica_aliases():
+            response.set_cookie(PIN_COOKIE, '1', max_age=pin_seconds(), httponly=True, samesite='Lax')
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view_class = getattr(view_func, 'view_class', None)
+        if getattr(view_func, 'use_primary', False) or getattr(view_class, 'use_primary', False):
+            _request_state.get().pinned = True
@@ -0,0 +1,174 @@
+"""
+A small database-backed job queue.
+
+Register a task with ``@task("app.name")``, enqueue it with ``enqueue()`` from
+inside the transaction that makes it necessary, and drain the queue with
+``manage.py run_jobs`` (or ``run_pending()`` in tests). Failed jobs are retried
+with exponential backoff until ``max_attempts`` is reached and are then kept
+with status ``failed`` for inspection; finished jobs are deleted.
+"""
+import logging
+import os
+import random
+import socket
+import threading
+import traceback
+from datetime import timedelta
+
+from django.db import close_old_connections
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import autodiscover_modules
+
+from .db_router import use_primary
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+BACKOFF_BASE_SECONDS = 10
+BACKOFF_MAX_SECONDS = 60 * 60
+LOCK_TIMEOUT = timedelta(minutes=10)
+REQUEUE_INTERVAL_SECONDS = 60
+
+_registry = {}
+_discovered = False
+_discover_lock = threading.Lock()
+
+
+class UnknownTask(Exception):
+    pass
+
+
+def task(name, queue='default', max_attempts=5):
+    """Register the decorated function as a job handler called with the payload as kwargs."""
+    def decorator(func):
+        _registry[name] = {'func': func, 'queue': queue, 'max_attempts': max_attempts}
+        return func
+    return decorator
+
+
+def autodiscover():
+    # import every installed app's tasks module so its @task handlers register
+    global _discovered
+    with _discover_lock:
+        if not _discovered:
+            autodiscover_modules('tasks')
+            _discovered = True
+
+
+def _build(name, payload=None, delay=None):
+    autodiscover()
+    if name not in _registry:
+        raise UnknownTask(name)
+    spec = _registry[name]
+    return Job(
+        task=name,
+        queue=spec['queue'],
+        payload=payload or {},
+        max_attempts=spec['max_attempts'],
+        run_after=timezone.now() + (delay or timedelta()),
+    )
+
+
+def enqueue(name, payload=None, delay=None):
+    """Insert a job; call it inside the caller's transaction so both commit together."""
+    job = _build(name, payload, delay)
+    job.save()
+    return job
+
+
+def enqueue_many(name, payloads, batch_size=500):
+    """Insert one job per payload with batched INSERTs."""
+    return Job.objects.bulk_create([_build(name, payload) for payload in payloads], batch_size=batch_size)
+
+
+def worker_name():
+    return f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"
+
+
+# jobs are enqueued right after the writes they act on; a lagging replica may not have either yet
+@use_primary()
+def claim(queues=None, limit=1, worker_id=None):
+    """
+    Atomically move up to `limit` due jobs of `queues` (None: every queue) to
+    "running" and return them.
+
+    Each job is taken with a conditional UPDATE, so concurrent workers never
+    run the same job even on databases without SELECT ... SKIP LOCKED.
+    """
+    now = timezone.now()
+    worker_id = worker_id or worker_name()
+    due = Job.objects.filter(status='queued', run_after__lte=now)
+    if queues is not None:
+        due = due.filter(queue__in=queues)
+    candidates = list(due.order_by('run_after', 'pk').values_list('pk', flat=True)[:limit * 2])
+    claimed = []
+    for pk in candidates:
+        taken = Job.objects.filter(pk=pk, status='queued').update(
+            status='running', locked_at=now, locked_by=worker_id, attempts=F('attempts') + 1,
+        )
+        if taken:
+            claimed.append(pk)
+            if len(claimed) == limit:
+                break
+    return list(Job.objects.filter(pk__in=claimed).order_by('run_after', 'pk'))
+
+
+def backoff(attempts):
+    delay = min(BACKOFF_BASE_SECONDS * 2 ** (attempts - 1), BACKOFF_MAX_SECONDS)
+    # jitter spreads out retries of jobs that failed together
+    return timedelta(seconds=delay * random.uniform(0.5, 1.0))
+
+
+@use_primary()
+def run_job(job):
+    """Run one claimed job, then delete it or schedule its retry. Returns True on success."""
+    autodiscover()
+    try:
+        spec = _registry.get(job.task)
+        if spec is None:
+            raise UnknownTask(job.task)
+        spec['func'](**job.payload)
+    except Exception:
+        error = traceback.format_exc()
+        if job.attempts >= job.max_attempts:
+            logger.error("Job %s (%s) failed permanently after %s attempts", job.pk, job.task, job.attempts)
+            Job.objects.filter(pk=job.pk).update(status='failed', last_error=error, locked_at=None)
+        else:
+            retry_in = backoff(job.attempts)
+            logger.warning("Job %s (%s) failed on attempt %s; retrying in %ss",
+                           job.pk, job.task, job.attempts, int(retry_in.total_seconds()))
+            Job.objects.filter(pk=job.pk).update(
+                status='queued', last_error=error, locked_at=None, run_after=timezone.now() + retry_in,
+            )
+        return False
+    Job.objects.filter(pk=job.pk).delete()
+    return True
+
+
+def requeue_stale(timeout=LOCK_TIMEOUT):
+    """Return jobs whose worker died mid-run to the queue."""
+    return Job.objects.filter(status='running', locked_at__lt=timezone.now() - timeout).update(
+        status='queued', locked_at=None,
+    )
+
+
+def run_pending(queues=None, limit=None):
+    """Synchronously run every due job; handy in tests with the locmem email backend."""
+    done = 0
+    while limit is None or done < limit:
+        jobs = claim(queues, limit=1)
+        if not jobs:
+            break
+        run_job(jobs[0])
+        done += 1
+    return done
+
+
+def run_in_thread(job):
+    # worker threads hold their own connections; drop them if they went stale
+    close_old_connections()
+    try:
+        return run_job(job)
+    finally:
+        close_old_connections()
@@ -0,0 +1,180 @@
+"""
+Logging that stays off the request thread (see LOGGING in settings).
+
+Records go through QueueHandler, which keeps only the cheap part in the
+calling thread: sampling, redaction and the ``%`` interpolation of the
+message. Formatting and the writes happen on a QueueListener thread, in the
+`targets` handlers. The listener starts on the first record in
+each process, so forked workers get their own. The queue is bounded. When
+it is full, records are dropped and counted rather than blocking a request.
+
+- RedactingFilter replaces the values of sensitive keys (passwords,
+  tokens, IBANs) in mapping arguments and ``extra`` fields.
+- SamplingFilter keeps a fraction of the records of chatty loggers, e.g.
+  ``{'django.request': 0.1}``. Each kept record carries its sample_rate.
+- JsonFormatter writes one JSON object per line, ``extra`` fields included.
+
+Log with ``%`` placeholders, ``logger.info("... %s", value)``, not
+f-strings. A record a level or filter rejects is then never formatted, and
+its arguments can still be redacted.
+"""
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import threading
+
+DEFAULT_QUEUE_SIZE = 10_000
+REDACTED = '[REDACTED]'
+SENSITIVE_KEYS = frozenset({
+    'password', 'password_hash', 'access_token', 'refresh_token', 'token', 'ticket', 'iban',
+    'authorization', 'secret', 'api_key',
+})
+MAX_REDACT_DEPTH = 4
+
+# attributes every LogRecord has; anything else came in through `extra`
+_RECORD_ATTRS = frozenset(vars(logging.makeLogRecord({}))) | {'message', 'asctime', 'taskName'}
+
+
+def redact(value, depth=0):
+    """A copy of `value` with the values of sensitive keys replaced, nested containers included."""
+    if depth >= MAX_REDACT_DEPTH:
+        return value
+    if isinstance(value, dict):
+        return {key: REDACTED if str(key).lower() in SENSITIVE_KEYS else redact(item, depth + 1)
+                for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return type(value)(redact(item, depth + 1) for item in value)
+    return value
+
+
+class RedactingFilter(logging.Filter):
+    def filter(self, record):
+        if isinstance(record.args, dict):
+            record.args = redact(record.args)
+        elif record.args:
+            record.args = tuple(redact(arg) for arg in record.args)
+        for key in record.__dict__.keys() - _RECORD_ATTRS:
+            value = record.__dict__[key]
+            if key.lower() in SENSITIVE_KEYS:
+                record.__dict__[key] = REDACTED
+            elif isinstance(value, (dict, list, tuple)):
+                record.__dict__[key] = redact(value)
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps `rates[name]` of the records of logger `name` and its children, up to `max_level`."""
+
+    def __init__(self, rates=None, max_level=logging.WARNING):
+        super().__init__()
+        self.rates = dict(rates or {})
+        self.max_level = max_level if isinstance(max_level, int) else logging.getLevelName(max_level)
+        self._resolved = {}
+
+    def rate_for(self, name):
+        rate = self._resolved.get(name)
+        if rate is None:
+            rate, prefix = 1.0, name
+            while prefix:
+                if prefix in self.rates:
+                    rate = self.rates[prefix]
+                    break
+                prefix = prefix.rpartition('.')[0]
+            self._resolved[name] = rate
+        return rate
+
+    def filter(self, record):
+        if record.levelno > self.max_level:
+            return True
+        rate = self.rate_for(record.name)
+        if rate >= 1.0:
+            return True
+        if random.random() >= rate:
+            return False
+        record.sample_rate = rate
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for key in record.__dict__.keys() - _RECORD_ATTRS:
+            entry[key] = record.__dict__[key]
+        if record.exc_info:
+            entry['exc_info'] = self.formatException(record.exc_info)
+        if record.stack_info:
+            entry['stack_info'] = self.formatStack(record.stack_info)
+        return json.dumps(entry, default=str)
+
+
+class QueueHandler(logging.handlers.QueueHandler):
+    """
+    Hands records to a listener thread that writes them to `targets`. In a
+    dictConfig, name them as ``'cfg://handlers.<name>'``.
+    """
+
+    def __init__(self, targets, queue_size=DEFAULT_QUEUE_SIZE):
+        # indexing, not iteration, is what makes dictConfig resolve the cfg:// references
+        self.targets = [targets[i] for i in range(len(targets))]
+        for target in self.targets:
+            if not isinstance(target, logging.Handler):
+                # dictConfig retries handlers that fail with this message once the others exist
+                raise TypeError(f'target not configured yet: {target!r}')
+        super().__init__(queue.Queue(queue_size))
+        self.dropped = 0
+        self._listener = None
+        self._pid = None
+        self._start_lock = threading.Lock()
+
+    def start(self):
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            if self._pid is not None:
+                # forked: the parent's listener thread did not come along, nor should its backlog
+                self.queue = queue.Queue(self.queue.maxsize)
+            self._listener = logging.handlers.QueueListener(self.queue, *self.targets, respect_handler_level=True)
+            self._listener.start()
+            self._pid = os.getpid()
+            atexit.register(self.stop)
+
+    def stop(self):
+        with self._start_lock:
+            if self._listener is not None and self._pid == os.getpid():
+                self._listener.stop()
+            self._listener = None
+            self._pid = None
+
+    def flush(self):
+        """Wait until every record queued so far has been written."""
+        if self._pid == os.getpid():
+            self.queue.join()
+
+    def prepare(self, record):
+        # interpolate now: the caller may change the arguments once we return.
+        # exc_info stays on the record, so tracebacks are formatted on the listener thread.
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def emit(self, record):
+        if self._pid != os.getpid():
+            self.start()
+        super().emit(record)
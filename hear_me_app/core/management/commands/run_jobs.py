@@ -0,0 +1,64 @@
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from django.core.management.base import BaseCommand
+
+from core import jobs
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = "Drain the database job queue with retries, backoff and a concurrency limit."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--queue', action='append', dest='queues', help="Queue to work (repeatable; default: all).")
+        parser.add_argument('--concurrency', type=int, default=4, help="Jobs run at the same time.")
+        parser.add_argument('--poll-interval', type=float, default=1.0, help="Seconds to sleep when the queue is empty.")
+        parser.add_argument('--burst', action='store_true', help="Exit once no job is due instead of polling.")
+
+    def handle(self, *args, **options):
+        queues = tuple(options['queues']) if options['queues'] else None
+        concurrency = max(1, options['concurrency'])
+        jobs.autodiscover()
+        last_requeue = None
+
+        processed = failed = 0
+        running = set()
+        worker_id = jobs.worker_name()
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='run_jobs') as pool:
+            try:
+                while True:
+                    # jobs of workers that died while this one is up come back too, not just at startup
+                    if last_requeue is None or time.monotonic() - last_requeue >= jobs.REQUEUE_INTERVAL_SECONDS:
+                        jobs.requeue_stale()
+                        last_requeue = time.monotonic()
+
+                    free = concurrency - len(running)
+                    if free:
+                        for job in jobs.claim(queues, limit=free, worker_id=worker_id):
+                            running.add(pool.submit(jobs.run_in_thread, job))
+
+                    if not running:
+                        if options['burst']:
+                            break
+                        time.sleep(options['poll_interval'])
+                        continue
+
+                    finished, running = wait(running, timeout=options['poll_interval'], return_when=FIRST_COMPLETED)
+                    running = set(running)
+                    for future in finished:
+                        processed += 1
+                        try:
+                            failed += not future.result()
+                        except Exception:
+                            # run_job() could not even record the outcome (e.g. the database went away);
+                            # the job stays claimed until requeue_stale() hands it out again
+                            logger.exception("Running a job failed outside its handler")
+                            failed += 1
+            except KeyboardInterrupt:
+                self.stdout.write("Stopping; waiting for running jobs to finish.")
+                wait(running)
+
+        self.stdout.write(self.style.SUCCESS(f"Processed {processed} job(s); {failed} failed or rescheduled."))
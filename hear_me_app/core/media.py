@@ -0,0 +1,160 @@
+"""
+Helpers for serving uploaded media (see core.views.MediaView).
+
+Only files under MEDIA_SERVE_PREFIXES are served. Responses carry an ETag
+(size and mtime) and Last-Modified, so repeat requests revalidate to a 304.
+A single ``Range: bytes=...`` is honoured with a 206, which is what video
+players send to seek. Files whose path contains a sha256, the
+content-addressed names media_store and image_variants write, can never
+change under the same name and are sent as immutable for a year.
+
+The file is handed to the server as a file object with the exact
+Content-Length. WSGI servers that provide wsgi.file_wrapper (gunicorn,
+uWSGI) then send it with os.sendfile, so the data never passes through
+Python. Other servers read it in MEDIA_BLOCK_SIZE blocks.
+"""
+import mimetypes
+import os
+import re
+from stat import S_ISREG
+
+from django.conf import settings
+from django.http import FileResponse
+from django.utils.http import http_date, parse_http_date_safe
+
+DEFAULT_PREFIXES = ('influencer_profiles/', 'influencer_bio_videos/')
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+REVALIDATE_CACHE_CONTROL = 'public, no-cache'
+MEDIA_BLOCK_SIZE = 256 * 1024
+
+_RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+_CONTENT_KEYED_RE = re.compile(r'(^|/)[0-9a-f]{64}(\.|/|$)')
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def serve_prefixes():
+    return tuple(getattr(settings, 'MEDIA_SERVE_PREFIXES', DEFAULT_PREFIXES))
+
+
+def is_content_keyed(path):
+    return _CONTENT_KEYED_RE.search(path) is not None
+
+
+def etag_for(stat):
+    return f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+
+
+def content_type_for(path):
+    content_type, encoding = mimetypes.guess_type(path)
+    if encoding or not content_type:
+        return 'application/octet-stream'
+    return content_type
+
+
+def parse_range(header, size):
+    """
+    Return the inclusive ``(start, end)`` of a single byte range, or None to
+    send the whole file (no header, several ranges, or one we don't parse).
+    Raises RangeNotSatisfiable for ranges that start past the end.
+    """
+    match = _RANGE_RE.match(header.strip()) if header else None
+    if match is None:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            raise RangeNotSatisfiable
+        return max(0, size - length), size - 1
+    start = int(first)
+    if start >= size:
+        raise RangeNotSatisfiable
+    end = min(int(last), size - 1) if last else size - 1
+    if end < start:
+        return None
+    return start, end
+
+
+def if_range_matches(request, etag, mtime):
+    """If-Range lets a client resume only while the file is unchanged."""
+    value = request.headers.get('If-Range')
+    if value is None:
+        return True
+    if value.startswith(('"', 'W/')):
+        return value == etag
+    date = parse_http_date_safe(value)
+    return date is not None and int(mtime) <= date
+
+
+class FileRange:
+    """A read()-able window onto `file`; fileno() stays available for sendfile."""
+
+    def __init__(self, file, start, length):
+        file.seek(start)
+        self.file = file
+        self.remaining = length
+        self.name = file.name
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size) if size else b''
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def close(self):
+        self.file.close()
+
+
+class MediaFileResponse(FileResponse):
+    block_size = MEDIA_BLOCK_SIZE
+
+
+def file_response(full_path, stat, byte_range=None):
+    file = open(full_path, 'rb')
+    if byte_range is None:
+        response = MediaFileResponse(file, content_type=content_type_for(full_path))
+    else:
+        start, end = byte_range
+        # FileRange has no tell()/seek(), so Content-Length is ours to set
+        response = MediaFileResponse(FileRange(file, start, end - start + 1), content_type=content_type_for(full_path),
+                                     status=206)
+        response['Content-Length'] = str(end - start + 1)
+        response['Content-Range'] = f'bytes {start}-{end}/{stat.st_size}'
+    return response
+
+
+def set_cache_headers(response, path, stat):
+    response['ETag'] = etag_for(stat)
+    response['Last-Modified'] = http_date(stat.st_mtime)
+    response['Accept-Ranges'] = 'bytes'
+    response['Cache-Control'] = IMMUTABLE_CACHE_CONTROL if is_content_keyed(path) else REVALIDATE_CACHE_CONTROL
+    return response
+
+
+def resolve(path):
+    """The file under MEDIA_ROOT for `path` and its stat, or None if it may not be served."""
+    if '\0' in path:
+        return None
+    root = os.path.realpath(settings.MEDIA_ROOT)
+    full_path = os.path.realpath(os.path.join(root, path))
+    # checked after resolving, so ../ and symlinks cannot leave the served directories
+    relative = os.path.relpath(full_path, root).replace(os.sep, '/')
+    if not relative.startswith(serve_prefixes()):
+        return None
+    try:
+        stat = os.stat(full_path)
+    except OSError:
+        return None
+    if not S_ISREG(stat.st_mode):
+        return None
+    return full_path, stat
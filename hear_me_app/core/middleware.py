@@ -0,0 +1,96 @@
+"""
+Per-endpoint SQL query accounting.
+
+QueryBudgetMiddleware wraps every database connection for the duration of a
+request, counts the queries and their total time, and aggregates them per
+resolved URL name (see stats()). A request that goes over its entry in
+QUERY_BUDGETS logs a warning and gets X-Query-* headers; with
+QUERY_BUDGET_HEADERS (default: DEBUG) every response carries them.
+"""
+import logging
+import threading
+import time
+from collections import defaultdict
+from contextlib import ExitStack
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+_stats = defaultdict(lambda: {'requests': 0, 'queries': 0, 'db_time_ms': 0.0, 'max_queries': 0, 'over_budget': 0})
+_stats_lock = threading.Lock()
+
+
+def budget_for(view_name):
+    return getattr(settings, 'QUERY_BUDGETS', {}).get(view_name, getattr(settings, 'QUERY_BUDGET_DEFAULT', None))
+
+
+def stats():
+    """Per-view query totals of this process since start (or the last reset)."""
+    with _stats_lock:
+        return {name: dict(entry) for name, entry in _stats.items()}
+
+
+def reset_stats():
+    with _stats_lock:
+        _stats.clear()
+
+
+@dataclass
+class QueryUsage:
+    view_name: str = None
+    queries: int = 0
+    db_time: float = 0.0  # seconds
+    budget: int = None
+
+    @property
+    def over_budget(self):
+        return self.budget is not None and self.queries > self.budget
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.db_time += time.perf_counter() - start
+
+
+class QueryBudgetMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        usage = QueryUsage()
+        with ExitStack() as stack:
+            for connection in connections.all(initialized_only=False):
+                stack.enter_context(connection.execute_wrapper(usage))
+            response = self.get_response(request)
+
+        match = getattr(request, 'resolver_match', None)
+        if match is None:
+            return response
+        usage.view_name = match.view_name
+        usage.budget = budget_for(usage.view_name)
+        # kept on the response for core.testing.QueryBudgetTestMixin
+        response.query_usage = usage
+
+        with _stats_lock:
+            entry = _stats[usage.view_name]
+            entry['requests'] += 1
+            entry['queries'] += usage.queries
+            entry['db_time_ms'] += usage.db_time * 1000
+            entry['max_queries'] = max(entry['max_queries'], usage.queries)
+            entry['over_budget'] += usage.over_budget
+
+        if usage.over_budget:
+            logger.warning("%s %s ran %d queries (budget %d) in %.1f ms", request.method, usage.view_name,
+                           usage.queries, usage.budget, usage.db_time * 1000)
+        if usage.over_budget or getattr(settings, 'QUERY_BUDGET_HEADERS', settings.DEBUG):
+            response['X-Query-Count'] = str(usage.queries)
+            response['X-Query-Time-Ms'] = f'{usage.db_time * 1000:.1f}'
+            if usage.budget is not None:
+                response['X-Query-Budget'] = str(usage.budget)
+        return response
@@ -1,3 +1,98 @@
+import copy
+
 from django.db import models
+from django.db.models import DEFERRED
+from django.utils import timezone
+
+
+class ChangeTrackingMixin:
+    """
+    Remember the field values a row was loaded with so saves can tell what
+    changed without reading the row again.
+
+    Values are snapshotted in from_db() and refreshed after every save; fields
+    that were deferred or never loaded are simply not tracked.
+    """
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = {
+            name: copy.deepcopy(value) if isinstance(value, (dict, list)) else value
+            for name, value in zip(field_names, values)
+            if value is not DEFERRED
+        }
+        return instance
+
+    def _snapshot(self, attnames=None):
+        loaded = self.__dict__.setdefault('_loaded_values', {})
+        for field in self._meta.concrete_fields:
+            if (attnames is None or field.attname in attnames) and field.attname in self.__dict__:
+                value = self.__dict__[field.attname]
+                loaded[field.attname] = copy.deepcopy(value) if isinstance(value, (dict, list)) else value
+
+    def is_tracked(self, field_name):
+        return self._meta.get_field(field_name).attname in self.__dict__.get('_loaded_values', {})
+
+    def loaded_value(self, field_name, default=None):
+        """The value `field_name` had when the row was loaded or last saved."""
+        return self.__dict__.get('_loaded_values', {}).get(self._meta.get_field(field_name).attname, default)
+
+    @property
+    def changed_fields(self):
+        """Names of tracked fields whose current value differs from the loaded one."""
+        loaded = self.__dict__.get('_loaded_values', {})
+        return {
+            field.name for field in self._meta.concrete_fields
+            if field.attname in loaded and field.attname in self.__dict__
+            and self.__dict__[field.attname] != loaded[field.attname]
+        }
+
+    def has_changed(self, field_name):
+        return field_name in self.changed_fields
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # post_save receivers have already seen the old snapshot at this point
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            update_fields = {self._meta.get_field(name).attname for name in update_fields}
+        self._snapshot(update_fields)
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        super().refresh_from_db(using=using, fields=fields, from_queryset=from_queryset)
+        self._snapshot({self._meta.get_field(name).attname for name in fields} if fields else None)
+
+
+class Job(models.Model):
+    """
+    A unit of background work in the database-backed queue (see core.jobs).
+
+    Jobs are inserted in the same transaction as the change that caused them,
+    so a rolled-back save never leaves a job behind (outbox pattern).
+    """
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('failed', 'Failed'),
+    ]
+
+    queue = models.CharField(max_length=50, default='default')
+    task = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued')
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_at = models.DateTimeField(blank=True, null=True)
+    locked_by = models.CharField(max_length=100, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'queue', 'run_after'], name='core_job_claim_idx'),
+        ]
 
-# Create your models here.
+    def __str__(self):
+        return f"{self.task} #{self.pk} ({self.status})"
@@ -0,0 +1,28 @@
+"""Test helpers for the budgets enforced by core.middleware.QueryBudgetMiddleware."""
+
+
+class QueryBudgetTestMixin:
+    """
+    Mix into a TestCase to assert responses stay within QUERY_BUDGETS.
+
+    Every response that went through QueryBudgetMiddleware carries its usage,
+    so tests only need to make the request and call assertWithinQueryBudget().
+    """
+
+    def assertWithinQueryBudget(self, response):
+        usage = getattr(response, 'query_usage', None)
+        if usage is None:
+            self.fail("Response has no query usage; is core.middleware.QueryBudgetMiddleware installed "
+                      "and did the URL resolve?")
+        if usage.budget is None:
+            self.fail(f"No QUERY_BUDGETS entry for '{usage.view_name}'.")
+        self.assertLessEqual(
+            usage.queries, usage.budget,
+            f"'{usage.view_name}' ran {usage.queries} queries, over its budget of {usage.budget}.",
+        )
+        return usage
+
+    def assertRoutesCovered(self, urlpatterns, exercised):
+        names = {pattern.name for pattern in urlpatterns if pattern.name}
+        missing = names - set(exercised)
+        self.assertFalse(missing, f"Routes without a query budget check: {sorted(missing)}")
@@ -1,3 +1,185 @@
-from django.test import TestCase
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+from unittest import mock
+
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from django.views import View
+
+from authentication.models import User
+
+from . import log
+from .db_router import PIN_COOKIE, PrimaryPinMiddleware, PrimaryReplicaRouter, use_primary
+
+
+@override_settings(DATABASE_REPLICAS=['replica1'], REPLICA_PIN_SECONDS=5)
+class PrimaryReplicaRouterTests(SimpleTestCase):
+    router = PrimaryReplicaRouter()
+
+    def dispatch(self, request, view=None, write=False):
+        # runs a request through the middleware and records where a read would go
+        routed = {}
+
+        def view_func(request):
+            if write:
+                self.router.db_for_write(User)
+            routed['read'] = self.router.db_for_read(User)
+            return HttpResponse()
+
+        def get_response(request):
+            middleware.process_view(request, view or view_func, (), {})
+            return view_func(request)
+
+        middleware = PrimaryPinMiddleware(get_response)
+        response = middleware(request)
+        return routed['read'], response
+
+    def test_reads_go_to_replicas_and_writes_to_the_primary(self):
+        self.assertEqual(self.router.db_for_read(User), 'replica1')
+        self.assertEqual(self.router.db_for_write(User), 'default')
+        with use_primary():
+            self.assertEqual(self.router.db_for_read(User), 'default')
+        self.assertEqual(self.router.db_for_read(User), 'replica1')
+
+    def test_a_write_pins_the_client_to_the_primary(self):
+        factory = RequestFactory()
+        read, response = self.dispatch(factory.post('/'), write=True)
+        self.assertEqual(read, 'default')
+        self.assertEqual(response.cookies[PIN_COOKIE]['max-age'], 5)
+
+        read, _ = self.dispatch(factory.get('/'))
+        self.assertEqual(read, 'replica1')
+        factory.cookies[PIN_COOKIE] = '1'
+        read, _ = self.dispatch(factory.get('/'))
+        self.assertEqual(read, 'default')
+
+    def test_view_override(self):
+        class PrimaryView(View):
+            use_primary = True
+
+        read, response = self.dispatch(RequestFactory().get('/'), view=PrimaryView.as_view())
+        self.assertEqual(read, 'default')
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+
+
+class MediaViewTests(SimpleTestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        overrides = override_settings(MEDIA_ROOT=media_root)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        self.data = bytes(range(256)) * 40
+        self.keyed = f'influencer_bio_videos/ab/{"ab" * 32}.mp4'
+        for name in (self.keyed, 'influencer_profiles/avatar.png', 'onboarding_reports/report.csv'):
+            os.makedirs(os.path.dirname(os.path.join(media_root, name)), exist_ok=True)
+            with open(os.path.join(media_root, name), 'wb') as f:
+                f.write(self.data)
+
+    def get(self, path, **headers):
+        return self.client.get(f'/media/{path}', headers=headers)
+
+    def test_full_file_with_validators(self):
+        response = self.get(self.keyed)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), self.data)
+        self.assertEqual(response['Content-Type'], 'video/mp4')
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertEqual(self.get('influencer_profiles/avatar.png')['Cache-Control'], 'public, no-cache')
+
+        self.assertEqual(self.get(self.keyed, if_none_match=response['ETag']).status_code, 304)
+        self.assertEqual(self.get(self.keyed, if_modified_since=response['Last-Modified']).status_code, 304)
+
+    def test_byte_ranges(self):
+        response = self.get(self.keyed, range='bytes=100-199')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], f'bytes 100-199/{len(self.data)}')
+        self.assertEqual(b''.join(response.streaming_content), self.data[100:200])
+
+        response = self.get(self.keyed, range='bytes=-10')
+        self.assertEqual(b''.join(response.streaming_content), self.data[-10:])
+        self.assertEqual(self.get(self.keyed, range=f'bytes={len(self.data)}-').status_code, 416)
+        # a stale If-Range gets the whole (changed) file
+        self.assertEqual(self.get(self.keyed, range='bytes=0-9', if_range='"stale"').status_code, 200)
+
+    def test_only_served_directories(self):
+        for path in ('onboarding_reports/report.csv', 'influencer_bio_videos/../onboarding_reports/report.csv',
+                     'influencer_profiles/missing.png', 'influencer_profiles/'):
+            with self.subTest(path=path):
+                self.assertEqual(self.get(path).status_code, 404)
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        record.thread_name = threading.current_thread().name
+        self.records.append(record)
+
+
+class LoggingTests(SimpleTestCase):
+    def setUp(self):
+        self.logger = logging.getLogger('core.tests.logging')
+        self.logger.propagate = False
+        self.addCleanup(setattr, self.logger, 'propagate', True)
+        self.target = ListHandler()
+        self.target.setFormatter(log.JsonFormatter())
+
+    def attach(self, handler):
+        self.logger.addHandler(handler)
+        self.addCleanup(self.logger.removeHandler, handler)
+        return handler
+
+    def queue_handler(self, **kwargs):
+        handler = log.QueueHandler([self.target], **kwargs)
+        handler.addFilter(log.RedactingFilter())
+        self.addCleanup(handler.stop)
+        return self.attach(handler)
+
+    def test_records_are_written_off_the_calling_thread(self):
+        handler = self.queue_handler()
+        data = {'username': 'sara', 'password': 'pass12345', 'profile': {'iban': 'SA0380000000608010167519'}}
+        self.logger.warning("Received %s", data, extra={'refresh_token': 'abc', 'user_id': 7})
+        # interpolated before it was queued, so later changes don't show
+        data['username'] = 'changed'
+        handler.flush()
+
+        record, = self.target.records
+        self.assertNotEqual(record.thread_name, threading.current_thread().name)
+        entry = json.loads(self.target.format(record))
+        self.assertEqual(entry['message'], "Received {'username': 'sara', 'password': '[REDACTED]', "
+                                           "'profile': {'iban': '[REDACTED]'}}")
+        self.assertEqual((entry['refresh_token'], entry['user_id'], entry['level']), ('[REDACTED]', 7, 'WARNING'))
+
+    def test_full_queue_drops_instead_of_blocking(self):
+        handler = log.QueueHandler([self.target], queue_size=2)
+        self.addCleanup(handler.stop)
+        # not started, so nothing drains the queue
+        for i in range(5):
+            handler.enqueue(handler.prepare(self.logger.makeRecord(
+                self.logger.name, logging.INFO, __file__, 0, "record %s", (i,), None)))
+        self.assertEqual(handler.dropped, 3)
+
+    def test_sampling_by_logger_prefix(self):
+        sampler = log.SamplingFilter({'core.tests': 0.0, 'core.tests.logging.kept': 1.0})
+        self.attach(self.target)
+        self.target.addFilter(sampler)
+        self.logger.info("dropped")
+        self.logger.getChild('kept').info("kept")
+        self.logger.error("errors are never sampled")
+        self.assertEqual([record.getMessage() for record in self.target.records],
+                         ["kept", "errors are never sampled"])
+
+        half = log.SamplingFilter({'core': 0.5})
+        with mock.patch('core.log.random.random', return_value=0.25):
+            record = logging.makeLogRecord({'name': 'core.jobs', 'levelno': logging.INFO})
+            self.assertTrue(half.filter(record))
+        self.assertEqual(record.sample_rate, 0.5)
 
-# Create your tests here.
@@ -1,3 +1,69 @@
-from django.shortcuts import render
+import os
 
-# Create your views here.
+from django.http import Http404, HttpResponse
+from django.utils.cache import get_conditional_response
+from django.views import View
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from . import admission, cache, media, middleware
+
+
+class CacheStatsView(APIView):
+    # counters are per worker process; the pid tells samples from different workers apart
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response({"pid": os.getpid(), "cache": cache.stats()})
+
+
+class QueryStatsView(APIView):
+    # per-URL-name query totals recorded by QueryBudgetMiddleware in this worker process
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response({"pid": os.getpid(), "views": middleware.stats()})
+
+
+class UploadStatsView(APIView):
+    # uploads in flight (all workers, via the cache) and this worker's admitted/rejected counters
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response({"pid": os.getpid(), "uploads": admission.stats()})
+
+
+class MediaView(View):
+    # uploaded media with Range, conditional GET and cache headers; see core/media.py
+
+    def get(self, request, path):
+        resolved = media.resolve(path)
+        if resolved is None:
+            raise Http404("Media file not found.")
+        full_path, stat = resolved
+        etag = media.etag_for(stat)
+
+        response = get_conditional_response(request, etag=etag, last_modified=int(stat.st_mtime))
+        if response is not None:
+            # 304 Not Modified or 412 Precondition Failed
+            return media.set_cache_headers(response, path, stat)
+
+        byte_range = None
+        if media.if_range_matches(request, etag, stat.st_mtime):
+            try:
+                byte_range = media.parse_range(request.headers.get('Range'), stat.st_size)
+            except media.RangeNotSatisfiable:
+                response = HttpResponse(status=416)
+                response['Content-Range'] = f'bytes */{stat.st_size}'
+                return media.set_cache_headers(response, path, stat)
+
+        if request.method == 'HEAD':
+            response = HttpResponse(content_type=media.content_type_for(full_path), status=206 if byte_range else 200)
+            start, end = byte_range or (0, stat.st_size - 1)
+            response['Content-Length'] = str(end - start + 1)
+            if byte_range:
+                response['Content-Range'] = f'bytes {start}-{end}/{stat.st_size}'
+        else:
+            response = media.file_response(full_path, stat, byte_range)
+        return media.set_cache_headers(response, path, stat)
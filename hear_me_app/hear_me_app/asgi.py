@@ -14,3 +14,8 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'hear_me_app.settings')
 
 application = get_asgi_application()
+
+# signed direct-upload PUTs are received here, before Django's request handling
+from authentication.direct_uploads import ReceiverApp  # noqa: E402  (needs the app registry)
+
+application = ReceiverApp(application)
@@ -48,7 +48,7 @@ INSTALLED_APPS = [
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'authentication.backends.CachedJWTAuthentication',
     ),
     # 'DEFAULT_PERMISSION_CLASSES': (
     #     'rest_framework.permissions.IsAuthenticated',
@@ -65,7 +65,13 @@ SIMPLE_JWT = {
     'BLACKLIST_AFTER_ROTATION': True,
 }
 
+# in-memory filter of revoked refresh tokens, per process (authentication.revocation)
+TOKEN_REVOCATION_FILTER_CAPACITY = 100_000
+TOKEN_REVOCATION_FILTER_ERROR_RATE = 0.001
+
 MIDDLEWARE = [
+    'core.middleware.QueryBudgetMiddleware',
+    'core.db_router.PrimaryPinMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -111,6 +117,68 @@ DATABASES = {
     }
 }
 
+# Read replicas (core.db_router): HEAR_ME_DB_REPLICAS is a comma-separated list of SQLite files kept
+# in sync with the primary outside Django. Tests mirror them onto the test database.
+for index, name in enumerate(filter(None, os.environ.get('HEAR_ME_DB_REPLICAS', '').split(',')), start=1):
+    DATABASES[f'replica{index}'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': name.strip(),
+        'TEST': {'MIRROR': 'default'},
+    }
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+DATABASE_ROUTERS = ['core.db_router.PrimaryReplicaRouter']
+# after a write, the client's reads stay on the primary this long (replica lag allowance)
+REPLICA_PIN_SECONDS = 5
+
+
+# Local-memory cache per process; point this at a shared backend (e.g. Redis) in production
+# so invalidation and stampede protection span all workers.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'hear-me',
+    }
+}
+
+INFLUENCER_PROFILE_CACHE_TIMEOUT = 300  # seconds
+INFLUENCER_LIST_CACHE_TIMEOUT = 60
+AUTH_USER_CACHE_TIMEOUT = 60  # authenticated user + role profile, see authentication.backends
+
+
+# Bounded pool for the async login/register views (authentication.hashing); requests beyond
+# workers + queue depth get 503 with Retry-After instead of waiting.
+PASSWORD_HASHING_WORKERS = None  # defaults to os.cpu_count()
+PASSWORD_HASHING_QUEUE_DEPTH = 32
+PASSWORD_HASHING_RETRY_AFTER = 1  # seconds
+
+
+# Max SQL queries per request by URL name (core.middleware.QueryBudgetMiddleware); going over logs
+# a warning and adds X-Query-* headers. authentication.tests checks every route against these.
+QUERY_BUDGETS = {
+    'register': 6,  # transaction + user and profile INSERTs + influencer search entry + uploaded media references
+    'register-async': 5,
+    'login': 2,  # authenticate() + lazy influencer_profile
+    'login-async': 1,
+    'token-refresh': 5,  # auth user cache miss + claiming INSERT in its own transaction + first-use filter load
+    # auth cache miss + new blob (UPDATE miss, INSERT in a transaction) + locked row read and UPDATE
+    # + releasing the replaced picture (locked blob read, DELETE) in its own transaction
+    'upload-profile-picture': 13,
+    'influencer-bank': 2,  # auth cache miss + UPDATE
+    'upload-bio-videos': 4,  # existing-blob SELECT + one INSERT in a transaction for any file count
+    'bio-video-upload-sessions': 2,
+    'bio-video-upload-session': 1,
+    'bio-video-upload-chunk': 1,
+    'bio-video-upload-complete': 6,  # session + new blob (UPDATE miss, INSERT in a transaction) + session delete
+    'direct-upload-ticket': 1,  # auth cache miss; nothing is stored until completion
+    'direct-upload-complete': 13,  # as upload-profile-picture; a bio video releases nothing and stays within 9
+    'influencer-list': 1,
+    'influencer-search': 2,
+    'influencer-detail': 1,
+    'media': 0,
+}
+QUERY_BUDGET_DEFAULT = None  # routes not listed above are recorded but never flagged
+QUERY_BUDGET_HEADERS = DEBUG  # X-Query-Count / X-Query-Time-Ms on every response
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -154,30 +222,88 @@ STATIC_URL = 'static/'
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 
+# Records are sampled and redacted in the request thread, then formatted and written by a
+# listener thread (core.log.QueueHandler). HEAR_ME_LOG_FORMAT=text gives plain lines.
+LOG_FORMAT = os.environ.get('HEAR_ME_LOG_FORMAT', 'json')
+# fraction of records (WARNING and below) kept per logger and its children; bursts of
+# rejected requests would otherwise log one django.request warning each
+LOG_SAMPLING = {'django.request': 0.1}
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
+    'filters': {
+        'sample': {'()': 'core.log.SamplingFilter', 'rates': LOG_SAMPLING},
+        'redact': {'()': 'core.log.RedactingFilter'},
+    },
     'formatters': {
         'simple': {'format': '%(levelname)s %(name)s: %(message)s'},
+        'json': {'()': 'core.log.JsonFormatter'},
     },
     'handlers': {
         'console': {
             'class': 'logging.StreamHandler',
-            'formatter': 'simple',
+            'formatter': 'json' if LOG_FORMAT == 'json' else 'simple',
             'stream': 'ext://sys.stdout',
         },
+        'queue': {
+            '()': 'core.log.QueueHandler',
+            'targets': ['cfg://handlers.console'],
+            'filters': ['sample', 'redact'],
+        },
     },
     'root': {                          # root logger for everything else
-        'handlers': ['console'],
+        'handlers': ['queue'],
         'level': 'INFO',
     },
 }
 
+# Influencer full-text search; SQLiteFTS5Backend needs SQLite, use SimpleBackend elsewhere
+INFLUENCER_SEARCH_BACKEND = 'authentication.search.SQLiteFTS5Backend'
+
 # Media config
 MEDIA_URL = "/media/"
 MEDIA_ROOT = os.path.join(BASE_DIR, "media")
+# "pool": profile picture variants render in a process pool; "sync": in the request
+# after its commit; "off": not at all (authentication.image_variants)
+IMAGE_VARIANTS_MODE = 'pool'
+# served by core.views.MediaView; nothing else under MEDIA_ROOT is public
+MEDIA_SERVE_PREFIXES = ("influencer_profiles/", "influencer_bio_videos/")
+
+# Uploads are hashed chunk by chunk while the body is parsed; anything above
+# FILE_UPLOAD_MAX_MEMORY_SIZE is spooled to a temp file and later moved, not copied.
+FILE_UPLOAD_HANDLERS = [
+    'authentication.upload_handlers.ChecksumMemoryFileUploadHandler',
+    'authentication.upload_handlers.ChecksumTemporaryFileUploadHandler',
+]
 
-
+# Resumable bio-video uploads: chunk data lives here until the session is
+# completed or expires (expired sessions are purged on new session creation
+# and by `manage.py purge_upload_sessions`)
+UPLOAD_SESSIONS_ROOT = os.path.join(BASE_DIR, "upload_sessions")
+UPLOAD_CHUNK_SIZE = 5 * 1024 * 1024
+UPLOAD_SESSION_TTL = timedelta(hours=24)
+
+# Admission control for the upload views (core.admission): uploads beyond these
+# are turned away with 429/503 and Retry-After before their body is read
+UPLOAD_MAX_IN_FLIGHT = 8  # across all workers when the cache is shared
+UPLOAD_MAX_PER_USER = 2  # per user, or per client address when anonymous
+UPLOAD_DISK_RESERVE = 1024 * 1024 * 1024  # bytes that must stay free after an upload lands
+UPLOAD_RETRY_AFTER = 5  # seconds
+
+# Direct uploads (authentication.direct_uploads): clients PUT media to a signed
+# upload_url instead of posting it to the API. LocalUploadBackend receives the
+# bytes in hear_me_app/asgi.py at DIRECT_UPLOAD_URL and keeps them under
+# DIRECT_UPLOAD_ROOT until the completion request attaches them. Run
+# `manage.py purge_direct_uploads` periodically to drop what was never completed.
+DIRECT_UPLOAD_BACKEND = 'authentication.direct_uploads.LocalUploadBackend'
+DIRECT_UPLOAD_ROOT = os.path.join(BASE_DIR, "direct_uploads")
+DIRECT_UPLOAD_URL = '/direct-upload/'
+DIRECT_UPLOAD_TICKET_TTL = 300  # seconds
+
+
+# Status emails are queued as jobs on the "email" queue; `manage.py run_jobs` sends them
+# (it works every queue unless given --queue).
 # Development: print emails to console
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
 DEFAULT_FROM_EMAIL = 'no-reply@example.com'
@@ -15,18 +15,16 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 from django.contrib import admin
-from django.urls import path, include
-from django.contrib.staticfiles.urls import static
+from django.urls import path, include, re_path
 from django.conf import settings
+from core.views import CacheStatsView, MediaView, QueryStatsView, UploadStatsView
 
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('api/admin/cache-stats/', CacheStatsView.as_view(), name='cache-stats'),
+    path('api/admin/query-stats/', QueryStatsView.as_view(), name='query-stats'),
+    path('api/admin/upload-stats/', UploadStatsView.as_view(), name='upload-stats'),
+    re_path(rf'^{settings.MEDIA_URL.lstrip("/")}(?P<path>.+)$', MediaView.as_view(), name='media'),
     path('', include('authentication.urls'))
 ]
-
-
-
-
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)